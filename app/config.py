@@ -23,6 +23,7 @@ class OpenAIConfig(BaseSettings):
     """OpenAI configuration."""
     api_key: Optional[str] = Field(None, env="OPENAI_API_KEY")
     model: str = Field("gpt-4o-mini", env="OPENAI_MODEL")
+    base_url: Optional[str] = Field(None, env="OPENAI_BASE_URL")
     
     class Config:
         env_prefix = ""
@@ -68,53 +69,235 @@ class AppConfig:
             with open(config_file, 'r', encoding='utf-8') as f:
                 yaml_config = yaml.safe_load(f)
                 
-                # RSSHub configuration
-                self.rsshub_base = yaml_config.get('rsshub_base', 'https://rsshub.app')
+                # RSSHub configuration (a single base URL or a list of mirrors)
+                rsshub_base = yaml_config.get('rsshub_base', 'https://rsshub.app')
+                self.rsshub_bases = rsshub_base if isinstance(rsshub_base, list) else [rsshub_base]
+                self.rsshub_base = self.rsshub_bases[0]
+                
+                # RSSHub mirror pool configuration
+                rsshub_config = yaml_config.get('rsshub', {})
+                self.rsshub_cooldown_seconds = rsshub_config.get('cooldown_seconds', 300)
+                self.rsshub_failures_before_eject = rsshub_config.get('failures_before_eject', 2)
+                self.rsshub_max_attempts = rsshub_config.get('max_attempts', 3)
                 
                 # Fetch configuration
                 fetch_config = yaml_config.get('fetch', {})
                 self.fetch_timeout = fetch_config.get('request_timeout_seconds', 12)
                 self.user_agent = fetch_config.get('user_agent', 'content-tools-bot/1.0')
+                self.fetch_concurrency = fetch_config.get('max_concurrency', 20)
+                self.fetch_per_host_limit = fetch_config.get('per_host_limit', 10)
+                self.fetch_parse_workers = fetch_config.get('parse_workers', 2)
+                self.fetch_max_bytes = fetch_config.get('max_feed_bytes', 2 * 1024 * 1024)
+                self.fetch_max_entries = fetch_config.get('max_entries', 50)
                 
                 # Scheduler configuration
                 scheduler_config = yaml_config.get('scheduler', {})
                 self.ingest_cron = scheduler_config.get('ingest_cron', '0 * * * *')
                 self.transform_cron = scheduler_config.get('transform_cron', '5 * * * *')
+                self.media_cron = scheduler_config.get('media_cron', '7 * * * *')
                 self.publish_cron = scheduler_config.get('publish_cron', '10 * * * *')
                 
+                # Adaptive polling configuration
+                polling_config = scheduler_config.get('adaptive_polling', {})
+                self.polling_enabled = polling_config.get('enabled', False)
+                self.polling_tick_seconds = polling_config.get('tick_seconds', 60)
+                self.polling_min_interval_minutes = polling_config.get('min_interval_minutes', 5)
+                self.polling_max_interval_minutes = polling_config.get('max_interval_minutes', 1440)
+                self.polling_half_life_hours = polling_config.get('half_life_hours', 72)
+                self.polling_target_posts_per_poll = polling_config.get('target_posts_per_poll', 1)
+                
                 # NLP configuration
                 nlp_config = yaml_config.get('nlp', {})
                 self.nlp_provider = nlp_config.get('provider', 'openai')
+                self.nlp_concurrency = nlp_config.get('concurrency', 8)
+                adaptive_config = nlp_config.get('adaptive_concurrency', {})
+                self.nlp_adaptive_concurrency_enabled = adaptive_config.get('enabled', True)
+                self.nlp_adaptive_concurrency_min = adaptive_config.get('min', 1)
+                self.nlp_adaptive_concurrency_max = adaptive_config.get('max', 64)
+                self.nlp_adaptive_concurrency_latency_target_seconds = adaptive_config.get('latency_target_seconds', 20)
+                claim_config = nlp_config.get('claim', {})
+                self.nlp_claim_batch_size = claim_config.get('batch_size', 100)
+                self.nlp_claim_lease_minutes = claim_config.get('lease_minutes', 30)
+                breaker_config = nlp_config.get('circuit_breaker', {})
+                self.nlp_breaker_failure_threshold = breaker_config.get('failure_threshold', 5)
+                self.nlp_breaker_reset_seconds = breaker_config.get('reset_seconds', 60)
+                self.nlp_fallbacks = nlp_config.get('fallbacks', [])
+                self.nlp_source_type_providers = nlp_config.get('source_type_providers', {})
+                extractive_config = nlp_config.get('extractive', {})
+                self.nlp_extractive_max_sentences = extractive_config.get('max_sentences', 3)
+                self.nlp_extractive_max_chars = extractive_config.get('max_chars', 400)
+                hedging_config = nlp_config.get('hedging', {})
+                self.nlp_hedging_enabled = hedging_config.get('enabled', True)
+                self.nlp_hedging_percentile = hedging_config.get('percentile', 0.95)
+                self.nlp_hedging_min_delay_seconds = hedging_config.get('min_delay_seconds', 2)
+                self.nlp_hedging_max_delay_seconds = hedging_config.get('max_delay_seconds', 20)
+                self.nlp_hedging_min_samples = hedging_config.get('min_samples', 20)
+                rate_limit_config = nlp_config.get('rate_limit', {})
+                self.nlp_requests_per_minute = rate_limit_config.get('requests_per_minute', 500)
+                self.nlp_tokens_per_minute = rate_limit_config.get('tokens_per_minute', 200000)
+                self.nlp_max_retries = rate_limit_config.get('max_retries', 5)
+                cache_config = nlp_config.get('cache', {})
+                self.nlp_cache_enabled = cache_config.get('enabled', True)
+                self.nlp_cache_ttl_days = cache_config.get('ttl_days', 30)
+                self.nlp_cache_max_entries = cache_config.get('max_entries', 100000)
+                self.nlp_cache_memory_entries = cache_config.get('memory_entries', 1000)
+                preprocess_config = nlp_config.get('preprocess', {})
+                self.nlp_preprocess_enabled = preprocess_config.get('enabled', True)
+                self.nlp_tokenizer = preprocess_config.get('tokenizer', 'o200k_base')
+                self.nlp_max_input_tokens = preprocess_config.get('max_input_tokens', 1500)
+                self.nlp_boilerplate_sample_posts = preprocess_config.get('boilerplate_sample_posts', 30)
+                self.nlp_boilerplate_min_share = preprocess_config.get('boilerplate_min_share', 0.5)
+                self.nlp_boilerplate_min_posts = preprocess_config.get('boilerplate_min_posts', 5)
+                packing_config = nlp_config.get('packing', {})
+                self.nlp_packing_enabled = packing_config.get('enabled', False)
+                self.nlp_packing_max_posts = packing_config.get('max_posts', 10)
+                self.nlp_packing_token_budget = packing_config.get('token_budget', 8000)
+                batch_config = nlp_config.get('batch', {})
+                self.nlp_batch_enabled = batch_config.get('enabled', False)
+                self.nlp_batch_source_types = batch_config.get('source_types', [])
+                self.nlp_batch_max_posts = batch_config.get('max_posts', 5000)
+                self.nlp_batch_completion_window = batch_config.get('completion_window', '24h')
                 self.summary_prompt_template = nlp_config.get('summary_prompt_template', 
                     'Сожми текст в 2–3 предложения новостного формата на русском, без воды.\n'
                     'Выдели факт/событие и итог для читателя.\n'
                     'Текст:\n{text}')
                 
+                # Hashtag configuration
+                hashtags_config = yaml_config.get('hashtags', {})
+                self.hashtags_vocabulary_file = hashtags_config.get('vocabulary_file')
+                self.hashtags_max = hashtags_config.get('max_hashtags', 5)
+                
+                # Near-duplicate detection configuration
+                dedup_config = yaml_config.get('dedup', {})
+                self.dedup_enabled = dedup_config.get('enabled', True)
+                self.dedup_max_distance = dedup_config.get('max_hamming_distance', 8)
+                self.dedup_window_hours = dedup_config.get('window_hours', 48)
+                self.dedup_action = dedup_config.get('action', 'skip')
+                
+                # Media configuration
+                media_config = yaml_config.get('media', {})
+                self.media_enabled = media_config.get('enabled', True)
+                self.media_cache_dir = media_config.get('cache_dir', 'media_cache')
+                self.media_cache_max_bytes = media_config.get('cache_max_bytes', 1024 * 1024 * 1024)
+                self.media_concurrency = media_config.get('concurrency', 8)
+                self.media_timeout_seconds = media_config.get('timeout_seconds', 30)
+                self.media_max_download_bytes = media_config.get('max_download_bytes', 50 * 1024 * 1024)
+                self.media_photo_max_side = media_config.get('photo_max_side', 2560)
+                self.media_photo_max_bytes = media_config.get('photo_max_bytes', 10 * 1024 * 1024)
+                self.media_jpeg_quality = media_config.get('jpeg_quality', 85)
+                
                 # Telegram configuration
                 telegram_config = yaml_config.get('telegram', {})
                 self.telegram_parse_mode = telegram_config.get('parse_mode', 'HTML')
                 self.telegram_disable_preview = telegram_config.get('disable_web_page_preview', False)
+                self.telegram_max_concurrent_chats = telegram_config.get('max_concurrent_chats', 20)
+                flood_config = telegram_config.get('flood_control', {})
+                self.telegram_messages_per_second = flood_config.get('messages_per_second', 30)
+                self.telegram_chat_messages_per_minute = flood_config.get('chat_messages_per_minute', 20)
+                self.telegram_chat_burst = flood_config.get('chat_burst', 3)
+                self.telegram_flood_max_retries = flood_config.get('max_retries', 3)
+                self.telegram_flood_max_wait_seconds = flood_config.get('max_wait_seconds', 60)
                 
                 # Publish configuration
                 publish_config = yaml_config.get('publish', {})
                 self.publish_default_type = publish_config.get('default_type', 'text')
+                self.publish_album_window_seconds = publish_config.get('album_window_seconds', 0)
+                file_id_cache_config = publish_config.get('file_id_cache', {})
+                self.publish_file_id_cache_enabled = file_id_cache_config.get('enabled', True)
         else:
             # Default values if no config file exists
-            self.rsshub_base = 'https://rsshub.app'
+            self.rsshub_bases = ['https://rsshub.app']
+            self.rsshub_base = self.rsshub_bases[0]
+            self.rsshub_cooldown_seconds = 300
+            self.rsshub_failures_before_eject = 2
+            self.rsshub_max_attempts = 3
             self.fetch_timeout = 12
             self.user_agent = 'content-tools-bot/1.0'
+            self.fetch_concurrency = 20
+            self.fetch_per_host_limit = 10
+            self.fetch_parse_workers = 2
+            self.fetch_max_bytes = 2 * 1024 * 1024
+            self.fetch_max_entries = 50
             self.ingest_cron = '0 * * * *'
             self.transform_cron = '5 * * * *'
+            self.media_cron = '7 * * * *'
             self.publish_cron = '10 * * * *'
+            self.polling_enabled = False
+            self.polling_tick_seconds = 60
+            self.polling_min_interval_minutes = 5
+            self.polling_max_interval_minutes = 1440
+            self.polling_half_life_hours = 72
+            self.polling_target_posts_per_poll = 1
             self.nlp_provider = 'openai'
+            self.nlp_concurrency = 8
+            self.nlp_adaptive_concurrency_enabled = True
+            self.nlp_adaptive_concurrency_min = 1
+            self.nlp_adaptive_concurrency_max = 64
+            self.nlp_adaptive_concurrency_latency_target_seconds = 20
+            self.nlp_claim_batch_size = 100
+            self.nlp_claim_lease_minutes = 30
+            self.nlp_breaker_failure_threshold = 5
+            self.nlp_breaker_reset_seconds = 60
+            self.nlp_fallbacks = []
+            self.nlp_source_type_providers = {}
+            self.nlp_extractive_max_sentences = 3
+            self.nlp_extractive_max_chars = 400
+            self.nlp_hedging_enabled = True
+            self.nlp_hedging_percentile = 0.95
+            self.nlp_hedging_min_delay_seconds = 2
+            self.nlp_hedging_max_delay_seconds = 20
+            self.nlp_hedging_min_samples = 20
+            self.nlp_requests_per_minute = 500
+            self.nlp_tokens_per_minute = 200000
+            self.nlp_max_retries = 5
+            self.nlp_cache_enabled = True
+            self.nlp_cache_ttl_days = 30
+            self.nlp_cache_max_entries = 100000
+            self.nlp_cache_memory_entries = 1000
+            self.nlp_preprocess_enabled = True
+            self.nlp_tokenizer = 'o200k_base'
+            self.nlp_max_input_tokens = 1500
+            self.nlp_boilerplate_sample_posts = 30
+            self.nlp_boilerplate_min_share = 0.5
+            self.nlp_boilerplate_min_posts = 5
+            self.nlp_packing_enabled = False
+            self.nlp_packing_max_posts = 10
+            self.nlp_packing_token_budget = 8000
+            self.nlp_batch_enabled = False
+            self.nlp_batch_source_types = []
+            self.nlp_batch_max_posts = 5000
+            self.nlp_batch_completion_window = '24h'
             self.summary_prompt_template = (
                 'Сожми текст в 2–3 предложения новостного формата на русском, без воды.\n'
                 'Выдели факт/событие и итог для читателя.\n'
                 'Текст:\n{text}'
             )
+            self.hashtags_vocabulary_file = None
+            self.hashtags_max = 5
+            self.dedup_enabled = True
+            self.dedup_max_distance = 8
+            self.dedup_window_hours = 48
+            self.dedup_action = 'skip'
+            self.media_enabled = True
+            self.media_cache_dir = 'media_cache'
+            self.media_cache_max_bytes = 1024 * 1024 * 1024
+            self.media_concurrency = 8
+            self.media_timeout_seconds = 30
+            self.media_max_download_bytes = 50 * 1024 * 1024
+            self.media_photo_max_side = 2560
+            self.media_photo_max_bytes = 10 * 1024 * 1024
+            self.media_jpeg_quality = 85
             self.telegram_parse_mode = 'HTML'
             self.telegram_disable_preview = False
+            self.telegram_max_concurrent_chats = 20
+            self.telegram_messages_per_second = 30
+            self.telegram_chat_messages_per_minute = 20
+            self.telegram_chat_burst = 3
+            self.telegram_flood_max_retries = 3
+            self.telegram_flood_max_wait_seconds = 60
             self.publish_default_type = 'text'
+            self.publish_album_window_seconds = 0
+            self.publish_file_id_cache_enabled = True
 
 
 # Global config instance
@@ -5,6 +5,7 @@ RSS ingest job runner.
 import asyncio
 import logging
 from app.services.rss_ingest import RSSIngestService
+from app.config import config
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +15,7 @@ async def main():
     try:
         logger.info("Starting RSS ingest job")
         service = RSSIngestService()
-        result = await service.ingest_all_sources()
+        result = await service.ingest_all_sources(due_only=config.polling_enabled)
         logger.info(f"RSS ingest job completed: {result}")
         return result
     except Exception as e:
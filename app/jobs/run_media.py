@@ -0,0 +1,26 @@
+"""
+Media preparation job runner.
+"""
+
+import asyncio
+import logging
+from app.services.media.service import MediaPrepareService
+
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """Run media preparation job."""
+    try:
+        logger.info("Starting media preparation job")
+        service = MediaPrepareService()
+        result = await service.prepare_posts()
+        logger.info(f"Media preparation job completed: {result}")
+        return result
+    except Exception as e:
+        logger.error(f"Media preparation job failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
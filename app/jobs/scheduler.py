@@ -2,9 +2,11 @@
 APScheduler configuration and job management.
 """
 
+import asyncio
 import logging
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from app.config import config
 
 logger = logging.getLogger(__name__)
@@ -15,7 +17,7 @@ def run_ingest_job():
     try:
         logger.info("Starting scheduled RSS ingest")
         from app.jobs.run_ingest import main
-        main()
+        asyncio.run(main())
     except Exception as e:
         logger.error(f"Scheduled RSS ingest failed: {str(e)}")
 
@@ -25,17 +27,27 @@ def run_transform_job():
     try:
         logger.info("Starting scheduled NLP transform")
         from app.jobs.run_transform import main
-        main()
+        asyncio.run(main())
     except Exception as e:
         logger.error(f"Scheduled NLP transform failed: {str(e)}")
 
 
+def run_media_job():
+    """Run media preparation job."""
+    try:
+        logger.info("Starting scheduled media preparation")
+        from app.jobs.run_media import main
+        asyncio.run(main())
+    except Exception as e:
+        logger.error(f"Scheduled media preparation failed: {str(e)}")
+
+
 def run_publish_job():
     """Run publish job."""
     try:
         logger.info("Starting scheduled publish")
         from app.jobs.run_publish import main
-        main()
+        asyncio.run(main())
     except Exception as e:
         logger.error(f"Scheduled publish failed: {str(e)}")
 
@@ -46,10 +58,16 @@ def main():
     
     scheduler = BlockingScheduler()
     
+    # With adaptive polling the ingest job ticks often and only fetches due sources
+    if config.polling_enabled:
+        ingest_trigger = IntervalTrigger(seconds=config.polling_tick_seconds)
+    else:
+        ingest_trigger = CronTrigger.from_crontab(config.ingest_cron)
+    
     # Add cron jobs
     scheduler.add_job(
         run_ingest_job,
-        CronTrigger.from_crontab(config.ingest_cron),
+        ingest_trigger,
         id='rss_ingest',
         name='RSS Ingest Job',
         replace_existing=True
@@ -63,6 +81,14 @@ def main():
         replace_existing=True
     )
     
+    scheduler.add_job(
+        run_media_job,
+        CronTrigger.from_crontab(config.media_cron),
+        id='media',
+        name='Media Preparation Job',
+        replace_existing=True
+    )
+    
     scheduler.add_job(
         run_publish_job,
         CronTrigger.from_crontab(config.publish_cron),
@@ -72,8 +98,12 @@ def main():
     )
     
     logger.info(f"Scheduler configured with jobs:")
-    logger.info(f"  - RSS Ingest: {config.ingest_cron}")
+    if config.polling_enabled:
+        logger.info(f"  - RSS Ingest: adaptive, every {config.polling_tick_seconds}s")
+    else:
+        logger.info(f"  - RSS Ingest: {config.ingest_cron}")
     logger.info(f"  - NLP Transform: {config.transform_cron}")
+    logger.info(f"  - Media Preparation: {config.media_cron}")
     logger.info(f"  - Publish: {config.publish_cron}")
     
     try:
@@ -12,7 +12,9 @@ from app.db import get_db
 from app.models import Post, Source, OurChannel
 from app.services.rss_ingest import RSSIngestService
 from app.services.nlp_transform.service import NLPTransformService
+from app.services.media.service import MediaPrepareService
 from app.services.publisher.telegram_publisher import TelegramPublisherService
+from app.services.utils.rss import shutdown_parse_executor
 from app.config import config
 
 # Configure logging
@@ -26,6 +28,12 @@ app = FastAPI(
 )
 
 
+@app.on_event("shutdown")
+def shutdown_workers():
+    """Stop the feed parsing worker processes."""
+    shutdown_parse_executor()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -60,6 +68,20 @@ async def run_transform():
         raise HTTPException(status_code=500, detail=f"NLP transform failed: {str(e)}")
 
 
+@app.post("/run/media")
+async def run_media():
+    """Manually trigger media preparation."""
+    try:
+        logger.info("Starting manual media preparation")
+        media_service = MediaPrepareService()
+        result = await media_service.prepare_posts()
+        logger.info(f"Media preparation completed: {result}")
+        return {"status": "success", "message": f"Prepared media of {result.get('prepared', 0)} posts"}
+    except Exception as e:
+        logger.error(f"Media preparation failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Media preparation failed: {str(e)}")
+
+
 @app.post("/run/publish")
 async def run_publish():
     """Manually trigger publishing."""
@@ -76,7 +98,7 @@ async def run_publish():
 
 @app.get("/posts")
 async def get_posts(
-    status: Optional[str] = Query(None, description="Filter by status: new, ready, sent, error"),
+    status: Optional[str] = Query(None, description="Filter by status: new, processing, batched, ready, sent, error, duplicate"),
     limit: int = Query(50, description="Number of posts to return"),
     offset: int = Query(0, description="Number of posts to skip"),
     db: Session = Depends(get_db)
@@ -147,6 +169,7 @@ async def get_channels(db: Session = Depends(get_db)):
                 "id": str(channel.id),
                 "name": channel.name,
                 "tg_chat_id_or_username": channel.tg_chat_id_or_username,
+                "album_window_seconds": channel.album_window_seconds,
                 "status": channel.status,
                 "created_at": channel.created_at.isoformat() if channel.created_at else None
             }
@@ -0,0 +1,25 @@
+"""Add HTTP cache validators to sources
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('sources', sa.Column('etag', sa.Text(), nullable=True))
+    op.add_column('sources', sa.Column('last_modified', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('sources', 'last_modified')
+    op.drop_column('sources', 'etag')
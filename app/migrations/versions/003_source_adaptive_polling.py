@@ -0,0 +1,31 @@
+"""Add adaptive polling state to sources
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('sources', sa.Column('post_rate', sa.Float(), nullable=True))
+    op.add_column('sources', sa.Column('rate_updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('sources', sa.Column('last_entry_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('sources', sa.Column('next_poll_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_sources_next_poll_at'), 'sources', ['next_poll_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sources_next_poll_at'), table_name='sources')
+    op.drop_column('sources', 'next_poll_at')
+    op.drop_column('sources', 'last_entry_at')
+    op.drop_column('sources', 'rate_updated_at')
+    op.drop_column('sources', 'post_rate')
@@ -0,0 +1,30 @@
+"""Add SimHash fingerprints and duplicate links to posts
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('simhash', sa.BigInteger(), nullable=True))
+    op.add_column('posts', sa.Column('duplicate_of_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key('fk_posts_duplicate_of_id', 'posts', 'posts', ['duplicate_of_id'], ['id'])
+    op.create_index(op.f('ix_posts_created_at'), 'posts', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_posts_created_at'), table_name='posts')
+    op.drop_constraint('fk_posts_duplicate_of_id', 'posts', type_='foreignkey')
+    op.drop_column('posts', 'duplicate_of_id')
+    op.drop_column('posts', 'simhash')
@@ -0,0 +1,37 @@
+"""Add summary cache table
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('summary_cache',
+        sa.Column('key', sa.Text(), nullable=False),
+        sa.Column('model', sa.Text(), nullable=False),
+        sa.Column('summary_text', sa.Text(), nullable=False),
+        sa.Column('hashtags', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('hits', sa.BigInteger(), server_default='0', nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_summary_cache_created_at'), 'summary_cache', ['created_at'], unique=False)
+    op.create_index(op.f('ix_summary_cache_last_used_at'), 'summary_cache', ['last_used_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_summary_cache_last_used_at'), table_name='summary_cache')
+    op.drop_index(op.f('ix_summary_cache_created_at'), table_name='summary_cache')
+    op.drop_table('summary_cache')
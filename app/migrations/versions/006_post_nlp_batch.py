@@ -0,0 +1,25 @@
+"""Add Batch API job ids to posts
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('nlp_batch_id', sa.Text(), nullable=True))
+    op.create_index(op.f('ix_posts_nlp_batch_id'), 'posts', ['nlp_batch_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_posts_nlp_batch_id'), table_name='posts')
+    op.drop_column('posts', 'nlp_batch_id')
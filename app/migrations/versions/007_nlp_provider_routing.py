@@ -0,0 +1,25 @@
+"""Add per-source and per-channel NLP provider selection
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('our_channels', sa.Column('nlp_provider', sa.Text(), nullable=True))
+    op.add_column('sources', sa.Column('nlp_provider', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('sources', 'nlp_provider')
+    op.drop_column('our_channels', 'nlp_provider')
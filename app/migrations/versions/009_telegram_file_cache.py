@@ -0,0 +1,33 @@
+"""Add Telegram file_id cache table
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('telegram_file_cache',
+        sa.Column('key', sa.Text(), nullable=False),
+        sa.Column('media_type', sa.Text(), nullable=False),
+        sa.Column('file_id', sa.Text(), nullable=False),
+        sa.Column('hits', sa.BigInteger(), server_default='0', nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_telegram_file_cache_last_used_at'), 'telegram_file_cache', ['last_used_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_telegram_file_cache_last_used_at'), table_name='telegram_file_cache')
+    op.drop_table('telegram_file_cache')
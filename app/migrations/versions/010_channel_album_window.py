@@ -0,0 +1,23 @@
+"""Add per-channel album batching window
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('our_channels', sa.Column('album_window_seconds', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('our_channels', 'album_window_seconds')
@@ -0,0 +1,26 @@
+"""Add feed publication times to posts
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('published_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE posts SET published_at = created_at")
+    op.create_index(op.f('ix_posts_published_at'), 'posts', ['published_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_posts_published_at'), table_name='posts')
+    op.drop_column('posts', 'published_at')
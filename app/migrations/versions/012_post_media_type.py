@@ -0,0 +1,23 @@
+"""Add prepared media types to posts
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('media_type', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'media_type')
@@ -4,9 +4,10 @@ SQLAlchemy models for the content-tools-server application.
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, Text, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy import Column, String, Boolean, Text, DateTime, Float, Integer, BigInteger, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from app.db import Base
 
 
@@ -18,6 +19,8 @@ class OurChannel(Base):
     name = Column(Text, nullable=False)
     tg_chat_id_or_username = Column(Text, nullable=False)  # "@mychannel" or numeric id
     status = Column(Text, default="active")
+    nlp_provider = Column(Text)  # NLP provider for this channel's posts, e.g. "extractive"; null = default
+    album_window_seconds = Column(Integer)  # Media posts this close together are sent as albums; null = default, 0 = off
     created_at = Column(DateTime(timezone=True), server_default=datetime.utcnow())
     updated_at = Column(DateTime(timezone=True), server_default=datetime.utcnow(), onupdate=datetime.utcnow())
     
@@ -38,6 +41,13 @@ class Source(Base):
     source_type = Column(Text)  # "news" | "commerce"
     enabled = Column(Boolean, default=True)
     last_guid = Column(Text)  # last successfully published guid
+    nlp_provider = Column(Text)  # NLP provider for this source's posts; overrides the channel's
+    etag = Column(Text)  # ETag of the last fetched feed, sent as If-None-Match
+    last_modified = Column(Text)  # Last-Modified of the last fetched feed, sent as If-Modified-Since
+    post_rate = Column(Float)  # exponentially-decayed posting rate, posts per hour
+    rate_updated_at = Column(DateTime(timezone=True))  # when post_rate was last updated
+    last_entry_at = Column(DateTime(timezone=True))  # newest entry timestamp seen
+    next_poll_at = Column(DateTime(timezone=True), index=True)  # when adaptive polling fetches next
     created_at = Column(DateTime(timezone=True), server_default=datetime.utcnow())
     updated_at = Column(DateTime(timezone=True), server_default=datetime.utcnow(), onupdate=datetime.utcnow())
     
@@ -56,10 +66,16 @@ class Post(Base):
     original_text = Column(Text)
     summary_text = Column(Text)
     media_url = Column(Text)
+    media_type = Column(Text)  # "photo"|"video" once the media job prepared the media, "unknown" if it is neither; null until prepared
     extra_text = Column(Text)
     hashtags = Column(JSONB)  # array of strings
-    status = Column(Text, default="new", index=True)  # "new"|"ready"|"sent"|"error"
-    created_at = Column(DateTime(timezone=True), server_default=datetime.utcnow())
+    simhash = Column(BigInteger)  # SimHash of original_text for near-duplicate detection
+    duplicate_of_id = Column(UUID(as_uuid=True), ForeignKey("posts.id"))  # set when status is "duplicate"
+    nlp_batch_id = Column(Text, index=True)  # Batch API job summarizing the post, set when status is "batched"
+    claimed_at = Column(DateTime(timezone=True))  # start of a transform worker's lease, set when status is "processing"
+    status = Column(Text, default="new", index=True)  # "new"|"processing"|"batched"|"ready"|"sent"|"error"|"duplicate"
+    published_at = Column(DateTime(timezone=True), index=True)  # feed entry time, increasing in feed order; posts are processed in this order
+    created_at = Column(DateTime(timezone=True), server_default=datetime.utcnow(), index=True)
     updated_at = Column(DateTime(timezone=True), server_default=datetime.utcnow(), onupdate=datetime.utcnow())
     sent_at = Column(DateTime(timezone=True))
     
@@ -70,3 +86,28 @@ class Post(Base):
     __table_args__ = (
         UniqueConstraint('source_id', 'guid', name='uq_source_guid'),
     )
+
+
+class SummaryCache(Base):
+    """Cached NLP summaries keyed by a hash of text, prompt template and model."""
+    __tablename__ = "summary_cache"
+    
+    key = Column(Text, primary_key=True)  # sha256 hex digest
+    model = Column(Text, nullable=False)
+    summary_text = Column(Text, nullable=False)
+    hashtags = Column(JSONB)  # array of strings
+    hits = Column(BigInteger, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class TelegramFileCache(Base):
+    """Telegram file_ids of uploaded media, keyed by media URL or content hash."""
+    __tablename__ = "telegram_file_cache"
+    
+    key = Column(Text, primary_key=True)
+    media_type = Column(Text, nullable=False)  # "photo"|"video"
+    file_id = Column(Text, nullable=False)
+    hits = Column(BigInteger, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
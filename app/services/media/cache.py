@@ -0,0 +1,152 @@
+"""
+Content-addressed disk cache for prepared media.
+Files are stored under their SHA-256 and evicted least recently used
+first once the cache grows past its size limit.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedMedia:
+    """Prepared media file ready for upload."""
+    media_type: str  # "photo"|"video"
+    sha256: str
+    path: Path
+    
+    @property
+    def file_name(self) -> str:
+        """File name sent with the upload."""
+        return self.path.name
+    
+    def read(self) -> bytes:
+        """Read the file contents."""
+        return self.path.read_bytes()
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Write to a temporary file first, so readers never see partial files
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+class MediaCache:
+    """
+    Disk cache of prepared media.
+    
+    objects/ holds the files named by content hash, so media found under
+    several URLs is stored once; urls/ maps each source URL to its object.
+    Reads refresh a file's modification time, which orders eviction.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.objects = self.directory / "objects"
+        self.urls = self.directory / "urls"
+    
+    def get(self, url: str) -> Optional[CachedMedia]:
+        """
+        Look up the prepared media of a URL.
+        
+        Args:
+            url: Source media URL
+            
+        Returns:
+            Cached media, or None if missing or evicted
+        """
+        index = self.urls / f"{_url_key(url)}.json"
+        try:
+            entry = json.loads(index.read_text())
+            path = self.objects / entry["sha256"][:2] / entry["file_name"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return CachedMedia(entry["media_type"], entry["sha256"], path)
+    
+    def put(self, url: str, data: bytes, media_type: str, extension: str) -> CachedMedia:
+        """
+        Store prepared media for a URL.
+        
+        Args:
+            url: Source media URL
+            data: Prepared file contents
+            media_type: "photo" or "video"
+            extension: File extension without the dot, e.g. "jpg"
+            
+        Returns:
+            Cached media
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.objects / sha256[:2] / f"{sha256}.{extension}"
+        if path.exists():
+            os.utime(path)
+        else:
+            _write_atomic(path, data)
+            
+        entry = {"sha256": sha256, "media_type": media_type, "file_name": path.name}
+        _write_atomic(self.urls / f"{_url_key(url)}.json", json.dumps(entry).encode("utf-8"))
+        return CachedMedia(media_type, sha256, path)
+    
+    def evict(self) -> int:
+        """
+        Delete least recently used files until the cache fits max_bytes.
+        
+        Returns:
+            Number of deleted files
+        """
+        files = []
+        total = 0
+        for path in self.objects.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+            
+        deleted = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            deleted += 1
+            
+        if deleted:
+            self._prune_urls()
+            logger.info(f"Evicted {deleted} media files, cache is {total} bytes")
+        return deleted
+    
+    def _prune_urls(self) -> None:
+        """Delete URL entries whose file was evicted."""
+        for index in self.urls.glob("*.json"):
+            try:
+                entry = json.loads(index.read_text())
+                if not (self.objects / entry["sha256"][:2] / entry["file_name"]).exists():
+                    index.unlink()
+            except (OSError, ValueError, KeyError):
+                continue
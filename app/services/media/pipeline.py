@@ -0,0 +1,231 @@
+"""
+Media preparation for publishing.
+Downloads post media, detects its type from magic bytes and fits images
+to Telegram's limits before they are cached on disk for upload.
+"""
+
+import asyncio
+import io
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+import aiohttp
+from PIL import Image, ImageOps
+
+from app.config import config
+from app.services.media.cache import CachedMedia, MediaCache
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 64 * 1024
+
+# Telegram accepts photos up to 10 MB whose width and height sum to at
+# most 10000 pixels; larger sides are downscaled by Telegram anyway
+PHOTO_MAX_DIMENSIONS_SUM = 10000
+PHOTO_MAX_ASPECT_RATIO = 20
+PHOTO_FORMATS = {"jpeg": "jpg", "png": "png"}
+
+# ISO base media file brands of still images (HEIF/AVIF)
+_IMAGE_BRANDS = {b"avif", b"avis", b"heic", b"heix", b"mif1", b"msf1"}
+
+# ISO base media file brands of MP4 video; other brands such as M4A audio
+# or 3GP are not sent as video
+_VIDEO_BRANDS = {
+    b"isom", b"iso2", b"iso4", b"iso5", b"iso6", b"mp41", b"mp42",
+    b"avc1", b"dash", b"M4V ", b"M4VH", b"M4VP"
+}
+
+
+def sniff_media(data: bytes) -> Optional[Tuple[str, str]]:
+    """
+    Detect the media type of a file from its magic bytes.
+    
+    Args:
+        data: File contents, or at least its first 16 bytes
+        
+    Returns:
+        Tuple of (media_type, format), e.g. ("photo", "jpeg"), or None if
+        the data is not a supported image or video
+    """
+    if data.startswith(b"\xff\xd8\xff"):
+        return "photo", "jpeg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "photo", "png"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "photo", "gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "photo", "webp"
+    if data.startswith((b"BM", b"II*\x00", b"MM\x00*")):
+        return "photo", "bitmap"
+    if data[4:8] == b"ftyp":
+        if data[8:12] in _IMAGE_BRANDS:
+            return "photo", "heif"
+        if data[8:12] in _VIDEO_BRANDS:
+            return "video", "mp4"
+        return None
+    if data.startswith(b"\x1a\x45\xdf\xa3"):
+        return "video", "webm"
+    return None
+
+
+def fit_photo(data: bytes, image_format: str, max_side: int, max_bytes: int, quality: int) -> Tuple[bytes, str]:
+    """
+    Fit an image to Telegram's photo limits.
+    
+    JPEG and PNG files within the limits are kept as they are; anything
+    else is downscaled to max_side and re-encoded as JPEG, lowering the
+    quality until it fits max_bytes.
+    
+    Args:
+        data: Image file contents
+        image_format: Format found by sniff_media
+        max_side: Longest allowed side in pixels
+        max_bytes: Largest allowed file size
+        quality: Initial JPEG quality
+        
+    Returns:
+        Tuple of (file contents, file extension)
+        
+    Raises:
+        ValueError: If the image cannot be decoded or has an extreme aspect ratio
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        width, height = image.size
+    except Exception as e:
+        raise ValueError(f"Cannot decode {image_format} image: {str(e)}")
+    if max(width, height) > PHOTO_MAX_ASPECT_RATIO * min(width, height):
+        raise ValueError(f"Image aspect ratio {width}x{height} is not accepted by Telegram")
+        
+    if (
+        image_format in PHOTO_FORMATS
+        and len(data) <= max_bytes
+        and max(width, height) <= max_side
+        and width + height <= PHOTO_MAX_DIMENSIONS_SUM
+    ):
+        return data, PHOTO_FORMATS[image_format]
+        
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_side, max_side))
+    if image.mode != "RGB":
+        # Flatten transparency onto white, as Telegram would show it
+        rgba = image.convert("RGBA")
+        image = Image.new("RGB", rgba.size, (255, 255, 255))
+        image.paste(rgba, mask=rgba.getchannel("A"))
+        
+    while True:
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+        if output.tell() <= max_bytes or quality <= 40:
+            return output.getvalue(), "jpg"
+        quality -= 15
+
+
+def get_media_url(post) -> Optional[str]:
+    """
+    Get the media URL a post is published with.
+    
+    Posts without media get the source's default image when the
+    default publish type is "photo".
+    
+    Args:
+        post: Post model instance
+        
+    Returns:
+        Media URL, or None for a text message
+    """
+    if not post.media_url and config.publish_default_type == "photo":
+        return post.source.default_image_url
+    return post.media_url
+
+
+class MediaPipeline:
+    """Downloads and prepares post media into the disk cache."""
+    
+    def __init__(self, cache: Optional[MediaCache] = None):
+        self.cache = cache or MediaCache(config.media_cache_dir, config.media_cache_max_bytes)
+    
+    async def prepare_many(self, urls: Iterable[str]) -> Dict[str, Optional[CachedMedia]]:
+        """
+        Prepare media of many URLs with bounded concurrency.
+        
+        Args:
+            urls: Media URLs
+            
+        Returns:
+            Dictionary mapping URLs to prepared media, or to None if the URL
+            is not an image or video; URLs that failed to download are left out
+        """
+        urls = set(urls)
+        semaphore = asyncio.Semaphore(config.media_concurrency)
+        results: Dict[str, Optional[CachedMedia]] = {}
+        
+        async def prepare(session: aiohttp.ClientSession, url: str) -> None:
+            async with semaphore:
+                try:
+                    results[url] = await self.prepare(session, url)
+                except Exception as e:
+                    logger.warning(f"Failed to prepare media {url}: {str(e)}")
+                    
+        if urls:
+            timeout = aiohttp.ClientTimeout(total=config.media_timeout_seconds)
+            headers = {"User-Agent": config.user_agent}
+            async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
+                await asyncio.gather(*(prepare(session, url) for url in urls))
+            await asyncio.to_thread(self.cache.evict)
+            
+        return results
+    
+    async def prepare(self, session: aiohttp.ClientSession, url: str) -> Optional[CachedMedia]:
+        """
+        Prepare the media of a URL, from the cache if it was prepared before.
+        
+        Args:
+            session: HTTP session
+            url: Media URL
+            
+        Returns:
+            Prepared media, or None if the URL is not an image or video
+        """
+        # Cache files are read and written off the event loop
+        cached = await asyncio.to_thread(self.cache.get, url)
+        if cached is not None:
+            return cached
+            
+        data = await self._download(session, url)
+        sniffed = sniff_media(data[:16])
+        if sniffed is None:
+            logger.info(f"Media {url} is not an image or video")
+            return None
+            
+        media_type, media_format = sniffed
+        if media_type == "photo":
+            loop = asyncio.get_running_loop()
+            data, extension = await loop.run_in_executor(
+                None,
+                fit_photo,
+                data,
+                media_format,
+                config.media_photo_max_side,
+                config.media_photo_max_bytes,
+                config.media_jpeg_quality
+            )
+        else:
+            extension = media_format
+            
+        return await asyncio.to_thread(self.cache.put, url, data, media_type, extension)
+    
+    async def _download(self, session: aiohttp.ClientSession, url: str) -> bytes:
+        """
+        Download a media file, refusing files larger than Telegram accepts.
+        
+        Raises:
+            ValueError: If the file exceeds media.max_download_bytes
+        """
+        async with session.get(url) as response:
+            response.raise_for_status()
+            buffer = bytearray()
+            async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                buffer += chunk
+                if len(buffer) > config.media_max_download_bytes:
+                    raise ValueError(f"Media exceeds {config.media_max_download_bytes} bytes")
+        return bytes(buffer)
@@ -0,0 +1,79 @@
+"""
+Media preparation service.
+Downloads and prepares the media of posts waiting to be published.
+"""
+
+import logging
+from typing import Dict, Any
+from sqlalchemy.orm import joinedload
+
+from app.db import SessionLocal
+from app.models import Post
+from app.config import config
+from app.services.media.pipeline import MediaPipeline, get_media_url
+
+logger = logging.getLogger(__name__)
+
+# Posts that are ingested but not published yet
+PENDING_STATUSES = ("new", "processing", "batched", "ready")
+
+
+class MediaPrepareService:
+    """Service for preparing post media between ingest and publish."""
+    
+    def __init__(self):
+        self.db = SessionLocal()
+        self.pipeline = MediaPipeline()
+    
+    async def prepare_posts(self) -> Dict[str, Any]:
+        """
+        Prepare the media of all unpublished posts that lack it.
+        
+        Each prepared post gets the media_type of its media, or "unknown"
+        if the URL is not an image or video, so the publisher uploads it
+        from the disk cache. Posts whose media failed to download are
+        retried by the next run; until then they are published by URL.
+        
+        Returns:
+            Dictionary with processing results
+        """
+        try:
+            if not config.media_enabled:
+                logger.info("Media preparation is disabled")
+                return {"prepared": 0, "failed": 0}
+                
+            query = self.db.query(Post).options(joinedload(Post.source)).filter(
+                Post.status.in_(PENDING_STATUSES),
+                Post.media_type.is_(None)
+            )
+            if config.publish_default_type != "photo":
+                query = query.filter(Post.media_url.isnot(None))
+            posts = [post for post in query.all() if get_media_url(post)]
+            
+            if not posts:
+                logger.info("No post media to prepare")
+                return {"prepared": 0, "failed": 0}
+                
+            media = await self.pipeline.prepare_many(get_media_url(post) for post in posts)
+            
+            prepared = 0
+            failed = 0
+            for post in posts:
+                media_url = get_media_url(post)
+                if media_url not in media:
+                    failed += 1
+                    continue
+                cached = media[media_url]
+                post.media_type = cached.media_type if cached else "unknown"
+                prepared += 1
+            self.db.commit()
+            
+            logger.info(f"Media preparation completed: {prepared} posts prepared, {failed} failed")
+            return {"prepared": prepared, "failed": failed}
+            
+        except Exception as e:
+            logger.error(f"Media preparation failed: {str(e)}")
+            self.db.rollback()
+            raise
+        finally:
+            self.db.close()
@@ -2,13 +2,24 @@
 Base NLP provider interface.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Tuple, List
+from typing import Dict, Tuple, List, Union
 
 
 class BaseNLPProvider(ABC):
     """Abstract base class for NLP providers."""
     
+    @property
+    def model_id(self) -> str:
+        """
+        Identifier of the model behind the provider.
+        
+        Part of summary cache keys, so it must change whenever the
+        provider would produce different summaries for the same input.
+        """
+        return type(self).__name__
+    
     @abstractmethod
     async def summarize(self, text: str, template: str) -> Tuple[str, List[str]]:
         """
@@ -22,3 +33,28 @@ class BaseNLPProvider(ABC):
             Tuple of (summary_text, hashtags_list)
         """
         pass
+    
+    async def summarize_many(
+        self,
+        items: List[Tuple[str, str]],
+        template: str
+    ) -> Dict[str, Union[Tuple[str, List[str]], Exception]]:
+        """
+        Generate summaries for several texts.
+        
+        Providers that can handle several texts per request override this;
+        by default every text is summarized separately.
+        
+        Args:
+            items: (item_id, text) pairs
+            template: Prompt template for summarization
+            
+        Returns:
+            Dictionary mapping item_id to (summary_text, hashtags_list),
+            or to the exception raised for that item
+        """
+        results = await asyncio.gather(
+            *(self.summarize(text, template) for _, text in items),
+            return_exceptions=True
+        )
+        return {item_id: result for (item_id, _), result in zip(items, results)}
@@ -0,0 +1,283 @@
+"""
+Content-addressed summary cache for NLP providers.
+"""
+
+import asyncio
+import hashlib
+import logging
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple, Union
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import SummaryCache
+from app.services.nlp_transform.base import BaseNLPProvider
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for cache keys.
+    
+    Unicode is NFKC-normalized and all whitespace runs collapse to single
+    spaces, so re-ingested copies that differ only in formatting share a key.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Normalized text
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def summary_cache_key(text: str, template: str, model_id: str) -> str:
+    """
+    Build the cache key for a summary.
+    
+    Args:
+        text: Input text
+        template: Prompt template
+        model_id: Provider model identifier
+        
+    Returns:
+        sha256 hex digest of the normalized text, template and model
+    """
+    digest = hashlib.sha256()
+    for part in (model_id, template, normalize_text(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class CachedNLPProvider(BaseNLPProvider):
+    """
+    Caching wrapper around another NLP provider.
+    
+    Summaries are stored in the summary_cache table, with an optional
+    in-process LRU in front. Entries older than the TTL are ignored and
+    purged by evict(), which also trims the table to its size limit.
+    Concurrent requests for the same key share one provider call.
+    """
+    
+    def __init__(
+        self,
+        provider: BaseNLPProvider,
+        db: Session,
+        ttl: timedelta,
+        max_entries: int,
+        memory_entries: int = 0
+    ):
+        self.provider = provider
+        self.db = db
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.memory: "OrderedDict[str, Tuple[str, List[str], datetime]]" = OrderedDict()
+        self.inflight: Dict[str, asyncio.Future] = {}
+        
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+    
+    @property
+    def model_id(self) -> str:
+        """Identifier of the wrapped provider's model."""
+        return self.provider.model_id
+    
+    async def summarize(self, text: str, template: str) -> Tuple[str, List[str]]:
+        """
+        Return a cached summary, or generate and cache one.
+        
+        Args:
+            text: Input text to summarize
+            template: Prompt template for summarization
+            
+        Returns:
+            Tuple of (summary_text, hashtags_list)
+        """
+        key = summary_cache_key(text, template, self.model_id)
+        
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+            
+        if key in self.inflight:
+            return await self.inflight[key]
+            
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            self.misses += 1
+            summary, hashtags = await self.provider.summarize(text, template)
+            self._put(key, summary, hashtags)
+            future.set_result((summary, hashtags))
+            return summary, hashtags
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters get the exception; make sure it is retrieved once
+            future.exception()
+            raise
+        finally:
+            del self.inflight[key]
+    
+    async def summarize_many(
+        self,
+        items: List[Tuple[str, str]],
+        template: str
+    ) -> Dict[str, Union[Tuple[str, List[str]], Exception]]:
+        """
+        Serve cached summaries and generate the rest in one provider call.
+        
+        Args:
+            items: (item_id, text) pairs
+            template: Prompt template for summarization
+            
+        Returns:
+            Dictionary mapping item_id to (summary_text, hashtags_list) or an exception
+        """
+        results: Dict[str, Union[Tuple[str, List[str]], Exception]] = {}
+        misses = []
+        for item_id, text in items:
+            cached = self.lookup(text, template)
+            if cached is None:
+                misses.append((item_id, text))
+            else:
+                results[item_id] = cached
+                
+        if misses:
+            self.misses += len(misses)
+            generated = await self.provider.summarize_many(misses, template)
+            for item_id, text in misses:
+                result = generated.get(item_id, KeyError(item_id))
+                if isinstance(result, tuple):
+                    self.store(text, template, *result)
+                results[item_id] = result
+                
+        return results
+    
+    def lookup(self, text: str, template: str) -> Optional[Tuple[str, List[str]]]:
+        """
+        Return a cached summary without calling the provider.
+        
+        Args:
+            text: Input text
+            template: Prompt template
+            
+        Returns:
+            Tuple of (summary_text, hashtags_list) or None on a miss
+        """
+        return self._get(summary_cache_key(text, template, self.model_id))
+    
+    def store(self, text: str, template: str, summary: str, hashtags: List[str]) -> None:
+        """
+        Cache a summary produced outside summarize(), e.g. by a batch job.
+        
+        Args:
+            text: Input text
+            template: Prompt template
+            summary: Summary text
+            hashtags: Hashtags list
+        """
+        self._put(summary_cache_key(text, template, self.model_id), summary, hashtags)
+    
+    def _get(self, key: str) -> Optional[Tuple[str, List[str]]]:
+        """Look up a key in the LRU, then in the database."""
+        now = datetime.now(timezone.utc)
+        
+        if key in self.memory:
+            summary, hashtags, created_at = self.memory[key]
+            if created_at >= now - self.ttl:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return summary, hashtags
+            del self.memory[key]
+            
+        entry = self.db.get(SummaryCache, key)
+        if entry is None or (entry.created_at and entry.created_at < now - self.ttl):
+            return None
+            
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_used_at = now
+        self.db.commit()
+        self.db_hits += 1
+        
+        self._remember(key, entry.summary_text, entry.hashtags or [], entry.created_at or now)
+        return entry.summary_text, entry.hashtags or []
+    
+    def _put(self, key: str, summary: str, hashtags: List[str]) -> None:
+        """Store a summary in the database and the LRU."""
+        now = datetime.now(timezone.utc)
+        values = {
+            "key": key,
+            "model": self.model_id,
+            "summary_text": summary,
+            "hashtags": hashtags,
+            "hits": 0,
+            "created_at": now,
+            "last_used_at": now
+        }
+        stmt = insert(SummaryCache).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={name: stmt.excluded[name] for name in values if name != "key"}
+        )
+        self.db.execute(stmt)
+        self.db.commit()
+        
+        self._remember(key, summary, hashtags, now)
+    
+    def _remember(self, key: str, summary: str, hashtags: List[str], created_at: datetime) -> None:
+        """Put an entry into the in-process LRU."""
+        if self.memory_entries <= 0:
+            return
+            
+        self.memory[key] = (summary, hashtags, created_at)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+    
+    def evict(self) -> int:
+        """
+        Delete expired entries and trim the table to max_entries.
+        
+        Least recently used entries are removed first.
+        
+        Returns:
+            Number of deleted entries
+        """
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        deleted = self.db.query(SummaryCache).filter(
+            SummaryCache.created_at < cutoff
+        ).delete(synchronize_session=False)
+        
+        overflow = (
+            self.db.query(SummaryCache.key)
+            .order_by(SummaryCache.last_used_at.desc())
+            .offset(self.max_entries)
+            .scalar_subquery()
+        )
+        deleted += self.db.query(SummaryCache).filter(
+            SummaryCache.key.in_(overflow)
+        ).delete(synchronize_session=False)
+        
+        self.db.commit()
+        if deleted:
+            logger.info(f"Evicted {deleted} summary cache entries")
+        return deleted
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get hit/miss counters.
+        
+        Returns:
+            Dictionary with memory_hits, db_hits and misses
+        """
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,222 @@
+"""
+Adaptive concurrency and circuit breaking for NLP provider calls.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+import openai
+
+# Called for every failed attempt of the provider call in progress, so
+# retries hidden inside a provider still reach the caller's limiter
+_overload_listener: ContextVar[Optional[Callable[[], None]]] = ContextVar("nlp_overload_listener", default=None)
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """
+    Check whether an error means the provider is overloaded or down.
+    
+    Such errors say nothing about the post itself, so the post should be
+    retried later rather than marked as failed.
+    
+    Args:
+        error: Exception raised by a provider
+        
+    Returns:
+        True for 429s, 5xx responses, timeouts and connection errors
+    """
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError, openai.APIConnectionError))
+
+
+@contextmanager
+def overload_listener(callback: Callable[[], None]):
+    """
+    Route overloads reported by provider calls in this context to a callback.
+    
+    Args:
+        callback: Called once per report_overload, e.g. to cut a limiter
+    """
+    token = _overload_listener.set(callback)
+    try:
+        yield
+    finally:
+        _overload_listener.reset(token)
+
+
+def report_overload(error: BaseException) -> None:
+    """
+    Report a failed provider attempt that may be retried.
+    
+    Args:
+        error: Exception raised by the attempt; only provider failures are reported
+    """
+    callback = _overload_listener.get()
+    if callback is not None and is_provider_failure(error):
+        callback()
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit with additive increase and multiplicative decrease.
+    
+    Every healthy response raises the limit by increase / limit, about
+    increase per round of requests; an overload response multiplies it by
+    decrease. Overloads from requests started before the last cut do not
+    cut again, so one burst of 429s halves the limit once.
+    """
+    
+    def __init__(
+        self,
+        initial: float,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_target: Optional[float] = None
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.epoch = 0
+        self.in_flight = 0
+        self._loop = None
+        self._condition = None
+    
+    def _get_condition(self) -> asyncio.Condition:
+        # Jobs run in a fresh event loop each time; the learned limit
+        # carries over, the waiters do not
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._condition = asyncio.Condition()
+            self.in_flight = 0
+        return self._condition
+    
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one concurrency slot.
+        
+        Yields:
+            Epoch to pass to on_success or on_overload
+        """
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < max(1, int(self.limit)))
+            self.in_flight += 1
+        try:
+            yield self.epoch
+        finally:
+            async with condition:
+                self.in_flight -= 1
+                condition.notify_all()
+    
+    def on_success(self, epoch: int, latency: float) -> None:
+        """
+        Record a healthy response.
+        
+        Args:
+            epoch: Epoch yielded by slot()
+            latency: Response time in seconds
+        """
+        if self.latency_target is not None and latency > self.latency_target:
+            return
+        self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+    
+    def on_overload(self, epoch: int) -> None:
+        """
+        Record a 429, 5xx or timeout.
+        
+        Args:
+            epoch: Epoch yielded by slot()
+        """
+        if epoch < self.epoch:
+            return
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self.epoch += 1
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over consecutive provider failures.
+    
+    After failure_threshold failures in a row the circuit opens and
+    requests are refused; after reset_seconds it half-opens, and the next
+    result closes or reopens it.
+    """
+    
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 60,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+    
+    def allow(self) -> bool:
+        """Check whether a request may go to the provider."""
+        if self.state == "open" and self.clock() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+        return self.state != "open"
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = "closed"
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = self.clock()
+
+
+# Limiters and breakers outlive a single transform run, so the learned
+# limit and an open circuit carry over to the next scheduled run
+_limiters = {}
+_breakers = {}
+
+
+def get_concurrency_limiter(key: str, **kwargs) -> AIMDLimiter:
+    """
+    Get the process-wide concurrency limiter for a provider.
+    
+    Args:
+        key: Provider identifier
+        **kwargs: AIMDLimiter arguments, used when the limiter is created
+        
+    Returns:
+        Shared AIMDLimiter instance
+    """
+    if key not in _limiters:
+        _limiters[key] = AIMDLimiter(**kwargs)
+    return _limiters[key]
+
+
+def get_circuit_breaker(key: str, **kwargs) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker for a provider.
+    
+    Args:
+        key: Provider identifier
+        **kwargs: CircuitBreaker arguments, used when the breaker is created
+        
+    Returns:
+        Shared CircuitBreaker instance
+    """
+    if key not in _breakers:
+        _breakers[key] = CircuitBreaker(**kwargs)
+    return _breakers[key]
@@ -0,0 +1,245 @@
+"""
+Hedged requests and failover across several NLP providers.
+"""
+
+import asyncio
+import bisect
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.services.nlp_transform.base import BaseNLPProvider
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds, 50 ms to about 2 minutes
+LATENCY_BUCKETS = tuple(round(0.05 * 1.25 ** index, 3) for index in range(36))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram."""
+    
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+    
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+    
+    def percentile(self, share: float) -> Optional[float]:
+        """
+        Estimate a latency percentile.
+        
+        Args:
+            share: Percentile as a share, e.g. 0.95
+            
+        Returns:
+            Upper bound of the bucket holding the percentile, or None without samples
+        """
+        if not self.count:
+            return None
+            
+        rank = share * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[min(index, len(self.buckets) - 1)]
+        return self.buckets[-1]
+
+
+class ProviderStats:
+    """Latency and outcome counters of one provider."""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.wins = 0
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "p50_seconds": self.latency.percentile(0.50),
+            "p95_seconds": self.latency.percentile(0.95)
+        }
+
+
+class HedgedNLPProvider(BaseNLPProvider):
+    """
+    Composite provider with hedged requests and failover.
+    
+    Requests go to the first provider. When it has not answered within its
+    observed latency percentile, the same request is sent to the next
+    provider and whichever answer arrives first wins; the others are
+    cancelled. A provider that fails hands the request to the next one.
+    """
+    
+    def __init__(
+        self,
+        providers: List[BaseNLPProvider],
+        hedging: bool = True,
+        percentile: float = 0.95,
+        min_delay: float = 2.0,
+        max_delay: float = 20.0,
+        min_samples: int = 20,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if not providers:
+            raise ValueError("HedgedNLPProvider needs at least one provider")
+        self.providers = providers
+        self.hedging = hedging
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.clock = clock
+        
+        names = []
+        for position, provider in enumerate(providers, 1):
+            name = provider.model_id
+            names.append(f"{name}#{position}" if name in names else name)
+        self.provider_stats = [ProviderStats(name) for name in names]
+    
+    @property
+    def model_id(self) -> str:
+        """Identifier of the primary provider's model."""
+        return self.providers[0].model_id
+    
+    async def summarize(self, text: str, template: str) -> Tuple[str, List[str]]:
+        """
+        Generate summary and hashtags, hedging slow and failed requests.
+        
+        Args:
+            text: Input text to summarize
+            template: Prompt template for summarization
+            
+        Returns:
+            Tuple of (summary_text, hashtags_list)
+        """
+        return await self._summarize_with(list(range(len(self.providers))), text, template)
+    
+    async def summarize_many(
+        self,
+        items: List[Tuple[str, str]],
+        template: str
+    ) -> Dict[str, Union[Tuple[str, List[str]], Exception]]:
+        """
+        Generate summaries with the primary provider, failing items over to the others.
+        
+        Args:
+            items: (item_id, text) pairs
+            template: Prompt template for summarization
+            
+        Returns:
+            Dictionary mapping item_id to (summary_text, hashtags_list) or an exception
+        """
+        results = await self.providers[0].summarize_many(items, template)
+        failed = [(item_id, text) for item_id, text in items if not isinstance(results.get(item_id), tuple)]
+        if not failed or len(self.providers) == 1:
+            return results
+            
+        logger.warning(f"{len(failed)} of {len(items)} summaries failed on the primary provider, failing over")
+        self.provider_stats[0].errors += len(failed)
+        fallbacks = list(range(1, len(self.providers)))
+        retried = await asyncio.gather(
+            *(self._summarize_with(fallbacks, text, template) for _, text in failed),
+            return_exceptions=True
+        )
+        for (item_id, _), result in zip(failed, retried):
+            results[item_id] = result
+        return results
+    
+    def hedge_delay(self, index: int) -> float:
+        """
+        How long to wait for a provider before hedging.
+        
+        Args:
+            index: Provider index
+            
+        Returns:
+            The provider's latency percentile, clamped to the configured
+            bounds; the upper bound until enough samples are recorded
+        """
+        latency = self.provider_stats[index].latency
+        if latency.count < self.min_samples:
+            return self.max_delay
+        return min(self.max_delay, max(self.min_delay, latency.percentile(self.percentile)))
+    
+    async def _summarize_with(self, indexes: List[int], text: str, template: str) -> Tuple[str, List[str]]:
+        """
+        Run a request against providers in order, hedging and failing over.
+        
+        Args:
+            indexes: Provider indexes in order of preference
+            text: Input text to summarize
+            template: Prompt template for summarization
+            
+        Returns:
+            Tuple of (summary_text, hashtags_list) of the first successful provider
+        """
+        remaining = list(indexes)
+        pending: Dict[asyncio.Task, Tuple[int, float]] = {}
+        last_error: Optional[Exception] = None
+        
+        def start() -> int:
+            index = remaining.pop(0)
+            self.provider_stats[index].requests += 1
+            task = asyncio.ensure_future(self.providers[index].summarize(text, template))
+            pending[task] = (index, self.clock())
+            return index
+            
+        try:
+            start()
+            while pending:
+                # Hedge once the most recently started request is overdue
+                timeout = None
+                if self.hedging and remaining:
+                    index, started = pending[next(reversed(pending))]
+                    timeout = max(0.0, self.hedge_delay(index) - (self.clock() - started))
+                    
+                done, _ = await asyncio.wait(list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    index = start()
+                    self.provider_stats[index].hedges += 1
+                    logger.info(f"Hedging slow request with {self.provider_stats[index].name}")
+                    continue
+                    
+                for task in done:
+                    index, started = pending.pop(task)
+                    stats = self.provider_stats[index]
+                    stats.latency.observe(self.clock() - started)
+                    if task.exception() is None:
+                        stats.wins += 1
+                        return task.result()
+                        
+                    stats.errors += 1
+                    last_error = task.exception()
+                    logger.warning(f"NLP provider {stats.name} failed: {str(last_error)}")
+                    
+                if not pending and remaining:
+                    start()
+                    
+            raise last_error
+        finally:
+            # Losing requests count with their time so far, so slow
+            # providers keep a realistic tail in their histogram
+            for task, (index, started) in pending.items():
+                task.cancel()
+                self.provider_stats[index].latency.observe(self.clock() - started)
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-provider counters and latency percentiles.
+        
+        Returns:
+            Dictionary mapping provider names to their stats
+        """
+        return {stats.name: stats.as_dict() for stats in self.provider_stats}
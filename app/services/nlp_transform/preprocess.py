@@ -0,0 +1,195 @@
+"""
+Input preprocessing for NLP providers.
+Cleans post text and fits it into a token budget before summarization.
+"""
+
+import logging
+import re
+from collections import Counter
+from typing import Iterable, Optional, Set
+from urllib.parse import urlparse
+
+from app.services.nlp_transform.rate_limit import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+URL_RE = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
+EMOJI = "\U0001F000-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF\uFE0F\u200D"
+EMOJI_RUN_RE = re.compile(f"([{EMOJI}])[{EMOJI}\\s]*[{EMOJI}]")
+SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s+")
+
+# Local tokenizers by encoding name, loaded on first use; None once loading has failed
+_encodings = {}
+
+
+def _get_encoding(name: str):
+    """Load a tiktoken encoding, or return None if tiktoken is unavailable."""
+    if name not in _encodings:
+        try:
+            import tiktoken
+            _encodings[name] = tiktoken.get_encoding(name)
+        except Exception as e:
+            logger.warning(f"tiktoken encoding {name} unavailable, estimating token counts: {str(e)}")
+            _encodings[name] = None
+    return _encodings[name]
+
+
+def count_tokens(text: str, encoding_name: str = "o200k_base") -> int:
+    """
+    Count tokens in text with the local tokenizer.
+    
+    Falls back to estimate_tokens when tiktoken is not installed.
+    
+    Args:
+        text: Input text
+        encoding_name: tiktoken encoding name
+        
+    Returns:
+        Token count
+    """
+    encoding = _get_encoding(encoding_name)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def normalize_whitespace(text: str) -> str:
+    """
+    Collapse whitespace within lines and runs of blank lines.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Text with single spaces and at most one blank line between paragraphs
+    """
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    text = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def collapse_emoji(text: str) -> str:
+    """Replace runs of emoji with their first emoji."""
+    return EMOJI_RUN_RE.sub(r"\1", text)
+
+
+def strip_links(text: str) -> str:
+    """
+    Drop lines that hold nothing but links and shorten inline URLs to their host.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Text without link lists
+    """
+    lines = []
+    for line in text.splitlines():
+        rest = URL_RE.sub("", line)
+        if URL_RE.search(line) and not re.search(r"\w", rest):
+            continue
+        lines.append(URL_RE.sub(lambda match: _url_host(match.group(0)), line))
+    return "\n".join(lines)
+
+
+def _url_host(url: str) -> str:
+    if not url.lower().startswith("http"):
+        url = f"http://{url}"
+    return urlparse(url).hostname or ""
+
+
+def learn_boilerplate(texts: Iterable[str], min_share: float, min_posts: int) -> Set[str]:
+    """
+    Find lines a source repeats in most of its posts.
+    
+    Signatures, subscription links and promotional footers show up as the
+    same line in many posts of one channel.
+    
+    Args:
+        texts: Recent post texts of one source
+        min_share: Share of posts a line must appear in
+        min_posts: Minimum number of posts needed to learn anything
+        
+    Returns:
+        Set of normalized boilerplate lines
+    """
+    texts = [text for text in texts if text]
+    if len(texts) < min_posts:
+        return set()
+        
+    counts = Counter()
+    for text in texts:
+        counts.update({line for line in normalize_whitespace(text).splitlines() if line})
+        
+    threshold = max(2, min_share * len(texts))
+    return {line for line, count in counts.items() if count >= threshold}
+
+
+def truncate_to_tokens(text: str, max_tokens: int, encoding_name: str = "o200k_base") -> str:
+    """
+    Truncate text to a token budget at a sentence boundary.
+    
+    A first sentence longer than the budget is cut at a word boundary.
+    
+    Args:
+        text: Input text
+        max_tokens: Token budget
+        encoding_name: tiktoken encoding name
+        
+    Returns:
+        Text of at most max_tokens tokens
+    """
+    if count_tokens(text, encoding_name) <= max_tokens:
+        return text
+        
+    kept = ""
+    for sentence in SENTENCE_END_RE.split(text):
+        candidate = f"{kept} {sentence}" if kept else sentence
+        if count_tokens(candidate, encoding_name) > max_tokens:
+            break
+        kept = candidate
+        
+    if kept:
+        return kept
+        
+    # Binary search for the longest word prefix within the budget
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:middle]), encoding_name) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return " ".join(words[:low])
+
+
+def preprocess_text(
+    text: str,
+    boilerplate: Optional[Set[str]] = None,
+    max_tokens: Optional[int] = None,
+    encoding_name: str = "o200k_base"
+) -> str:
+    """
+    Prepare post text for summarization.
+    
+    Args:
+        text: Original post text
+        boilerplate: Lines to drop, from learn_boilerplate
+        max_tokens: Token budget for the result
+        encoding_name: tiktoken encoding name
+        
+    Returns:
+        Cleaned text; the normalized original if cleaning leaves nothing
+    """
+    normalized = normalize_whitespace(text)
+    cleaned = normalized
+    if boilerplate:
+        cleaned = "\n".join(line for line in cleaned.splitlines() if line not in boilerplate)
+    cleaned = normalize_whitespace(collapse_emoji(strip_links(cleaned)))
+    
+    if not cleaned:
+        cleaned = normalized
+    if max_tokens:
+        cleaned = truncate_to_tokens(cleaned, max_tokens, encoding_name)
+    return cleaned
@@ -0,0 +1,155 @@
+"""
+Local extractive summarization provider.
+Picks the most central sentences of a post with TextRank over TF-IDF
+vectors; runs offline without API calls.
+"""
+
+import re
+from typing import List, Tuple
+import numpy as np
+from app.services.nlp_transform.base import BaseNLPProvider
+from app.services.utils.hashtag import extract_hashtags
+from app.config import config
+
+SENTENCE_RE = re.compile(r"(?<=[.!?…])[\"»)]*\s+|\n+")
+WORD_RE = re.compile(r"[^\W\d_]{3,}")
+
+# Words are cut to this many characters, a crude stemmer that merges
+# most Russian and English inflections
+STEM_LENGTH = 6
+
+STOP_WORDS = frozenset("""
+    это этот эта эти того тому том тем при для про над под без или если что чтобы
+    как так также его её ему ими них она они оно мы вы был была были было будет
+    есть уже еще ещё только более всех всего весь вся все который которая которые
+    которых после через между года году день дня the and for that with this from
+    are was were will have has had not but its their they you your our about into
+    than then there which who what when where been also more
+""".split())
+
+DAMPING = 0.85
+ITERATIONS = 30
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Non-empty sentences in order
+    """
+    return [sentence.strip() for sentence in SENTENCE_RE.split(text) if sentence and sentence.strip()]
+
+
+def _terms(sentence: str) -> List[str]:
+    return [
+        word[:STEM_LENGTH]
+        for word in WORD_RE.findall(sentence.lower())
+        if word not in STOP_WORDS
+    ]
+
+
+def rank_sentences(sentences: List[str]) -> np.ndarray:
+    """
+    Score sentences by TextRank centrality over TF-IDF cosine similarity.
+    
+    Args:
+        sentences: Sentences of one text
+        
+    Returns:
+        Array of scores, one per sentence
+    """
+    count = len(sentences)
+    if count < 3:
+        return np.ones(count)
+        
+    vocabulary = {}
+    rows, columns = [], []
+    for row, sentence in enumerate(sentences):
+        for term in _terms(sentence):
+            rows.append(row)
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+    if not vocabulary:
+        return np.ones(count)
+        
+    size = len(vocabulary)
+    cells = np.asarray(rows) * size + np.asarray(columns)
+    tf = np.bincount(cells, minlength=count * size).reshape(count, size).astype(float)
+    idf = np.log((1 + count) / (1 + np.count_nonzero(tf, axis=0))) + 1
+    vectors = np.log1p(tf) * idf
+    norms = np.sqrt((vectors * vectors).sum(axis=1, keepdims=True))
+    vectors /= np.where(norms > 0, norms, 1)
+    
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0)
+    totals = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, totals, out=np.full_like(similarity, 1 / count), where=totals > 0)
+    
+    scores = np.full(count, 1 / count)
+    for _ in range(ITERATIONS):
+        scores = (1 - DAMPING) / count + DAMPING * (transition.T @ scores)
+        
+    # Telegram posts lead with the news, so earlier sentences get a boost
+    return scores * (1 + 1 / np.arange(1, count + 1))
+
+
+class ExtractiveProvider(BaseNLPProvider):
+    """Offline provider returning the post's most central sentences."""
+    
+    def __init__(self, max_sentences: int = None, max_chars: int = None):
+        self.max_sentences = max_sentences or config.nlp_extractive_max_sentences
+        self.max_chars = max_chars or config.nlp_extractive_max_chars
+    
+    @property
+    def model_id(self) -> str:
+        """Identifier including the summary size limits."""
+        return f"extractive:{self.max_sentences}:{self.max_chars}"
+    
+    async def summarize(self, text: str, template: str) -> Tuple[str, List[str]]:
+        """
+        Summarize text by sentence extraction; the template is ignored.
+        
+        Args:
+            text: Input text to summarize
+            template: Prompt template (unused)
+            
+        Returns:
+            Tuple of (summary_text, hashtags_list)
+        """
+        summary = self.extract(text)
+        return summary, extract_hashtags(summary)
+    
+    def extract(self, text: str) -> str:
+        """
+        Pick the top sentences of a text, in their original order.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Summary of at most max_sentences sentences and about max_chars characters
+        """
+        sentences = split_sentences(text)
+        if len(sentences) <= 1:
+            return self._clip(" ".join(sentences))
+            
+        scores = rank_sentences(sentences)
+        chosen = []
+        length = 0
+        for index in np.argsort(-scores, kind="stable"):
+            if len(chosen) >= self.max_sentences:
+                break
+            if chosen and length + len(sentences[index]) > self.max_chars:
+                continue
+            chosen.append(index)
+            length += len(sentences[index]) + 1
+            
+        return self._clip(" ".join(sentences[index] for index in sorted(chosen)))
+    
+    def _clip(self, summary: str) -> str:
+        if len(summary) <= self.max_chars:
+            return summary
+        return summary[:self.max_chars].rsplit(" ", 1)[0] + "…"
@@ -2,23 +2,121 @@
 OpenAI Chat Completions provider for NLP transformations.
 """
 
+import asyncio
+import json
 import logging
-from typing import Tuple, List
+from dataclasses import dataclass, field
+from typing import Dict, Tuple, List, Optional, Union
 import openai
 from app.services.nlp_transform.base import BaseNLPProvider
+from app.services.nlp_transform.concurrency import report_overload
+from app.services.nlp_transform.rate_limit import estimate_tokens, get_rate_limiter
+from app.services.utils.hashtag import extract_hashtags
 from app.config import config
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = "Ты помощник для создания кратких новостных сводок на русском языке."
+MAX_TOKENS = 500
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Completion tokens reserved per post in packed requests
+PACKED_ITEM_MAX_TOKENS = 300
+PACKED_PROMPT = (
+    "Выполни задание отдельно для каждого поста из списка ниже.\n"
+    "Задание:\n{instruction}\n\n"
+    "Ответь JSON-объектом вида "
+    '{{"items": [{{"id": 1, "summary": "...", "hashtags": ["#тег"]}}]}} '
+    "с одним элементом на каждый пост, id как у поста, до 5 хэштегов.\n\n"
+    "Посты (JSON):\n{posts}"
+)
+
+# Batch statuses after which no more results will appear
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# Errors worth retrying; the client's own retries are disabled so that
+# 429s go through the shared rate limiter
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError
+)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """
+    Read the Retry-After delay from an API error response.
+    
+    Args:
+        error: Exception raised by the OpenAI client
+        
+    Returns:
+        Delay in seconds or None if the response has no usable header
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+@dataclass
+class BatchResults:
+    """State of a Batch API job and the results available so far."""
+    status: str
+    summaries: Dict[str, Tuple[str, List[str]]] = field(default_factory=dict)  # custom_id -> (summary, hashtags)
+    errors: Dict[str, str] = field(default_factory=dict)  # custom_id -> error message
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in BATCH_FINAL_STATUSES
+
 
 class OpenAIProvider(BaseNLPProvider):
     """OpenAI Chat Completions provider."""
     
-    def __init__(self):
-        if not config.openai.api_key:
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None
+    ):
+        """
+        Create the provider; arguments default to the OPENAI_* settings.
+        
+        Args:
+            model: Chat model name
+            base_url: OpenAI-compatible API endpoint
+            api_key: API key for the endpoint
+        """
+        api_key = api_key or config.openai.api_key
+        if not api_key:
             raise RuntimeError("OPENAI_API_KEY is not set. Configure it to use the OpenAI provider.")
-        self.client = openai.AsyncOpenAI(api_key=config.openai.api_key)
-        self.model = config.openai.model
+        self.base_url = base_url or config.openai.base_url or None
+        self.client = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=self.base_url,
+            max_retries=0
+        )
+        self.model = model or config.openai.model
+        self.rate_limiter = get_rate_limiter(
+            f"{self.base_url or 'openai'}:{self.model}",
+            config.nlp_requests_per_minute,
+            config.nlp_tokens_per_minute
+        )
+    
+    @property
+    def model_id(self) -> str:
+        """Identifier of the configured OpenAI model."""
+        return f"openai:{self.model}"
     
     async def summarize(self, text: str, template: str) -> Tuple[str, List[str]]:
         """
@@ -32,24 +130,10 @@ class OpenAIProvider(BaseNLPProvider):
             Tuple of (summary_text, hashtags_list)
         """
         try:
-            # Format the prompt
-            prompt = template.format(text=text)
-            
             # Call OpenAI API
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Ты помощник для создания кратких новостных сводок на русском языке."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.3
-            )
+            response = await self._create_completion(self._build_messages(text, template))
             
-            summary = response.choices[0].message.content.strip()
-            
-            # Extract hashtags from summary
-            hashtags = self._extract_hashtags(summary)
+            summary, hashtags = self._parse_summary(response.choices[0].message.content)
             
             logger.info(f"Generated summary: {summary[:100]}...")
             logger.info(f"Extracted hashtags: {hashtags}")
@@ -60,40 +144,337 @@ class OpenAIProvider(BaseNLPProvider):
             logger.error(f"OpenAI API call failed: {str(e)}")
             raise
     
-    def _extract_hashtags(self, text: str) -> List[str]:
+    async def summarize_many(
+        self,
+        items: List[Tuple[str, str]],
+        template: str
+    ) -> Dict[str, Union[Tuple[str, List[str]], Exception]]:
         """
-        Extract hashtags from text.
+        Generate summaries for several texts, packing them into shared requests.
+        
+        With packing enabled, texts are grouped so each request stays within
+        the packing token budget, and the model answers with a JSON object
+        holding one summary per post. Items missing from or malformed in the
+        answer are summarized with single requests.
         
         Args:
-            text: Text to extract hashtags from
+            items: (item_id, text) pairs
+            template: Prompt template for summarization
             
         Returns:
-            List of hashtags
+            Dictionary mapping item_id to (summary_text, hashtags_list) or an exception
         """
-        hashtags = []
+        if not config.nlp_packing_enabled:
+            return await super().summarize_many(items, template)
         
-        # Simple hashtag extraction - look for words that could be hashtags
-        words = text.lower().split()
+        semaphore = asyncio.Semaphore(config.nlp_concurrency)
+        
+        async def run(pack: List[Tuple[str, str]]):
+            async with semaphore:
+                return await self._summarize_pack(pack, template)
+                
+        results = {}
+        for pack_results in await asyncio.gather(*(run(pack) for pack in self._plan_packs(items, template))):
+            results.update(pack_results)
+        return results
+    
+    def _plan_packs(self, items: List[Tuple[str, str]], template: str) -> List[List[Tuple[str, str]]]:
+        """
+        Group texts into packs that fit the packing token budget.
+        
+        Args:
+            items: (item_id, text) pairs
+            template: Prompt template for summarization
+            
+        Returns:
+            List of packs, in input order
+        """
+        overhead = estimate_tokens(SYSTEM_PROMPT + PACKED_PROMPT + template)
+        packs = []
+        pack = []
+        used = overhead
+        for item_id, text in items:
+            cost = estimate_tokens(text) + PACKED_ITEM_MAX_TOKENS
+            if pack and (len(pack) >= config.nlp_packing_max_posts or used + cost > config.nlp_packing_token_budget):
+                packs.append(pack)
+                pack = []
+                used = overhead
+            pack.append((item_id, text))
+            used += cost
+            
+        if pack:
+            packs.append(pack)
+        return packs
+    
+    async def _summarize_pack(
+        self,
+        pack: List[Tuple[str, str]],
+        template: str
+    ) -> Dict[str, Union[Tuple[str, List[str]], Exception]]:
+        """
+        Summarize one pack of texts in a single request.
+        
+        Args:
+            pack: (item_id, text) pairs
+            template: Prompt template for summarization
+            
+        Returns:
+            Dictionary mapping item_id to (summary_text, hashtags_list) or an exception
+        """
+        parsed = {}
+        if len(pack) > 1:
+            posts = json.dumps(
+                [{"id": index, "text": text} for index, (_, text) in enumerate(pack, 1)],
+                ensure_ascii=False
+            )
+            prompt = PACKED_PROMPT.format(
+                instruction=template.format(text="<текст поста>"),
+                posts=posts
+            )
+            try:
+                response = await self._create_completion(
+                    [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=PACKED_ITEM_MAX_TOKENS * len(pack),
+                    response_format={"type": "json_object"}
+                )
+            except Exception as e:
+                logger.error(f"OpenAI packed request for {len(pack)} posts failed: {str(e)}")
+                return {item_id: e for item_id, _ in pack}
+            parsed = self._parse_pack(response.choices[0].message.content, len(pack))
+            
+        results: Dict[str, Union[Tuple[str, List[str]], Exception]] = {}
+        retry = []
+        for index, (item_id, text) in enumerate(pack, 1):
+            if index in parsed:
+                results[item_id] = parsed[index]
+            else:
+                retry.append((item_id, text))
+                
+        if retry and len(pack) > 1:
+            logger.warning(f"{len(retry)} of {len(pack)} packed summaries missing or malformed, retrying singly")
+        for item_id, text in retry:
+            try:
+                results[item_id] = await self.summarize(text, template)
+            except Exception as e:
+                results[item_id] = e
+        return results
+    
+    def _parse_pack(self, content: str, size: int) -> Dict[int, Tuple[str, List[str]]]:
+        """
+        Validate a packed answer.
+        
+        Args:
+            content: Completion message content
+            size: Number of posts in the pack
+            
+        Returns:
+            Dictionary mapping post index (1-based) to (summary_text, hashtags_list)
+            for every well-formed item
+        """
+        try:
+            data = json.loads(content)
+        except (TypeError, ValueError):
+            return {}
+        
+        items = data.get("items") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return {}
+        
+        parsed = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                index = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            summary = item.get("summary")
+            if not 1 <= index <= size or not isinstance(summary, str) or not summary.strip():
+                continue
+                
+            summary = summary.strip()
+            hashtags = item.get("hashtags")
+            if isinstance(hashtags, list) and all(isinstance(tag, str) for tag in hashtags):
+                hashtags = [f"#{tag.strip().lstrip('#')}" for tag in hashtags if tag.strip().lstrip('#')][:5]
+            else:
+                hashtags = []
+            parsed[index] = (summary, hashtags or self._extract_hashtags(summary))
+            
+        return parsed
+    
+    async def submit_batch(self, items: List[Tuple[str, str]], template: str) -> str:
+        """
+        Submit texts for summarization as one Batch API job.
         
-        # Common news-related keywords in Russian and English
-        news_keywords = [
-            'новости', 'новость', 'события', 'событие', 'происшествие', 'происшествия',
-            'политика', 'экономика', 'спорт', 'технологии', 'технология', 'наука',
-            'здоровье', 'медицина', 'образование', 'культура', 'искусство',
-            'news', 'event', 'events', 'politics', 'economy', 'sport', 'technology',
-            'science', 'health', 'medicine', 'education', 'culture', 'art'
+        Batch jobs are billed at a discount and do not count against the
+        real-time RPM/TPM quota, but complete within the completion window
+        instead of seconds.
+        
+        Args:
+            items: (custom_id, text) pairs; custom_id identifies the result
+            template: Prompt template for summarization
+            
+        Returns:
+            Batch id
+        """
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": self.model,
+                    "messages": self._build_messages(text, template),
+                    "max_tokens": MAX_TOKENS,
+                    "temperature": 0.3
+                }
+            }, ensure_ascii=False)
+            for custom_id, text in items
+        ]
+        
+        input_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=config.nlp_batch_completion_window
+        )
+        
+        logger.info(f"Submitted batch {batch.id} with {len(items)} requests")
+        return batch.id
+    
+    async def fetch_batch(self, batch_id: str) -> BatchResults:
+        """
+        Check a Batch API job and download its results once it has finished.
+        
+        Args:
+            batch_id: Batch id returned by submit_batch
+            
+        Returns:
+            BatchResults; summaries and errors stay empty until the job finishes
+        """
+        batch = await self.client.batches.retrieve(batch_id)
+        results = BatchResults(status=batch.status)
+        if not results.finished:
+            return results
+        
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if line.strip():
+                    self._parse_batch_line(json.loads(line), results)
+                    
+        return results
+    
+    def _parse_batch_line(self, line: dict, results: BatchResults) -> None:
+        """
+        Add one line of a batch output or error file to the results.
+        
+        Args:
+            line: Parsed JSONL line
+            results: BatchResults to update
+        """
+        custom_id = line.get("custom_id")
+        response = line.get("response") or {}
+        body = response.get("body") or {}
+        
+        if line.get("error") or response.get("status_code") != 200:
+            error = line.get("error") or body.get("error") or {}
+            results.errors[custom_id] = error.get("message") or f"status {response.get('status_code')}"
+            return
+            
+        try:
+            results.summaries[custom_id] = self._parse_summary(body["choices"][0]["message"]["content"])
+        except (KeyError, IndexError, TypeError, AttributeError):
+            results.errors[custom_id] = "malformed response body"
+    
+    def _build_messages(self, text: str, template: str) -> List[dict]:
+        """
+        Build the chat messages for summarizing a text.
+        
+        Args:
+            text: Input text to summarize
+            template: Prompt template for summarization
+            
+        Returns:
+            Chat messages
+        """
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": template.format(text=text)}
         ]
+    
+    def _parse_summary(self, content: str) -> Tuple[str, List[str]]:
+        """
+        Turn a completion into a summary and its hashtags.
         
-        # Extract relevant keywords
-        for word in words:
-            # Clean word (remove punctuation)
-            clean_word = ''.join(c for c in word if c.isalnum())
-            if len(clean_word) > 3 and clean_word in news_keywords:
-                hashtags.append(f"#{clean_word}")
+        Args:
+            content: Completion message content
+            
+        Returns:
+            Tuple of (summary_text, hashtags_list)
+        """
+        summary = content.strip()
+        return summary, self._extract_hashtags(summary)
+    
+    async def _create_completion(self, messages: List[dict], max_tokens: int = MAX_TOKENS, **kwargs):
+        """
+        Create a chat completion within the RPM/TPM quota.
         
-        # Add some generic hashtags if none found
-        if not hashtags:
-            hashtags = ["#новости", "#события"]
+        Every attempt waits for the rate limiter first. A 429 pauses the
+        shared limiter for the Retry-After period, so concurrent callers
+        back off together; connection errors and 5xx are retried with
+        exponential backoff. Each failed attempt is reported to the
+        caller's concurrency limiter, even if a retry succeeds.
         
-        # Limit to 5 hashtags
-        return hashtags[:5]
+        Args:
+            messages: Chat messages
+            max_tokens: Completion token limit
+            **kwargs: Extra chat completion parameters
+            
+        Returns:
+            Chat completion response
+        """
+        estimated_tokens = sum(estimate_tokens(message["content"]) for message in messages) + max_tokens
+        
+        for attempt in range(config.nlp_max_retries + 1):
+            await self.rate_limiter.acquire(estimated_tokens)
+            try:
+                return await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=0.3,
+                    **kwargs
+                )
+            except RETRYABLE_ERRORS as e:
+                report_overload(e)
+                if attempt >= config.nlp_max_retries:
+                    raise
+                
+                delay = _retry_after(e) or min(2 ** attempt, 60)
+                if isinstance(e, openai.RateLimitError):
+                    self.rate_limiter.pause(delay)
+                    logger.warning(f"OpenAI rate limit hit, pausing requests for {delay:.1f}s")
+                else:
+                    logger.warning(f"OpenAI request failed ({str(e)}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+    
+    def _extract_hashtags(self, text: str) -> List[str]:
+        """
+        Extract hashtags from text with the shared hashtag engine.
+        
+        Args:
+            text: Text to extract hashtags from
+            
+        Returns:
+            List of hashtags
+        """
+        return extract_hashtags(text)
@@ -0,0 +1,89 @@
+"""
+Rate limiting for NLP provider API calls.
+Token buckets for requests-per-minute and tokens-per-minute quotas.
+"""
+
+import asyncio
+import time
+from typing import Callable
+
+from app.services.utils.token_bucket import TokenBucket
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens in text.
+    
+    Cyrillic text averages about 3 characters per token with current
+    OpenAI tokenizers, Latin text about 4; 3 keeps the estimate on the
+    safe side for both.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Estimated token count
+    """
+    return len(text) // 3 + 1
+
+
+class RateLimiter:
+    """
+    Combined requests-per-minute and tokens-per-minute limiter.
+    
+    A 429 response pauses all callers for its Retry-After period.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock)
+        self.clock = clock
+        self.paused_until = 0.0
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Pause all requests, e.g. for the Retry-After of a 429 response.
+        
+        Args:
+            seconds: Pause duration
+        """
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+    
+    async def acquire(self, tokens: int) -> None:
+        """
+        Wait for quota for one request using the given number of tokens.
+        
+        Args:
+            tokens: Estimated prompt plus completion tokens
+        """
+        while self.paused_until > self.clock():
+            await asyncio.sleep(self.paused_until - self.clock())
+            
+        await self.requests.acquire(1)
+        await self.tokens.acquire(tokens)
+
+
+# Limiters are shared by all providers of a process using the same quota
+_limiters = {}
+
+
+def get_rate_limiter(key: str, requests_per_minute: float, tokens_per_minute: float) -> RateLimiter:
+    """
+    Get the process-wide rate limiter for a quota.
+    
+    Args:
+        key: Quota identifier, e.g. the model name
+        requests_per_minute: Requests-per-minute limit
+        tokens_per_minute: Tokens-per-minute limit
+        
+    Returns:
+        Shared RateLimiter instance
+    """
+    if key not in _limiters:
+        _limiters[key] = RateLimiter(requests_per_minute, tokens_per_minute)
+    return _limiters[key]
@@ -0,0 +1,50 @@
+"""
+Registry of NLP providers by config name.
+"""
+
+import os
+from typing import Any, Dict, Type
+
+from app.services.nlp_transform.base import BaseNLPProvider
+from app.services.nlp_transform.providers.extractive_provider import ExtractiveProvider
+from app.services.nlp_transform.providers.openai_provider import OpenAIProvider
+
+PROVIDERS: Dict[str, Type[BaseNLPProvider]] = {
+    "openai": OpenAIProvider,
+    "extractive": ExtractiveProvider
+}
+
+
+def register_provider(name: str, provider_class: Type[BaseNLPProvider]) -> None:
+    """
+    Make a provider available under a config name.
+    
+    Args:
+        name: Name used in the nlp.provider, nlp.fallbacks and nlp_provider settings
+        provider_class: Provider class
+    """
+    PROVIDERS[name] = provider_class
+
+
+def create_provider(options: Dict[str, Any]) -> BaseNLPProvider:
+    """
+    Create a provider from its config entry.
+    
+    The "provider" key selects the class; the remaining keys are passed to
+    it as keyword arguments, except "api_key_env", which names the
+    environment variable holding the API key so keys stay out of the YAML.
+    
+    Args:
+        options: Provider config entry, e.g. {"provider": "openai", "model": "gpt-4o"}
+        
+    Returns:
+        Provider instance
+    """
+    options = dict(options)
+    name = options.pop("provider", "openai")
+    if name not in PROVIDERS:
+        raise ValueError(f"Unsupported NLP provider: {name}")
+        
+    if "api_key_env" in options:
+        options["api_key"] = os.environ.get(options.pop("api_key_env"))
+    return PROVIDERS[name](**options)
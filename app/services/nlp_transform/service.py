@@ -3,13 +3,25 @@ NLP transformation service.
 Processes posts to generate summaries and hashtags.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Set, Tuple
 from sqlalchemy.orm import Session
 
 from app.db import SessionLocal
-from app.models import Post
+from app.models import Post, Source
 from app.services.nlp_transform.providers.openai_provider import OpenAIProvider
+from app.services.nlp_transform.base import BaseNLPProvider
+from app.services.nlp_transform.cache import CachedNLPProvider
+from app.services.nlp_transform.concurrency import (
+    get_circuit_breaker, get_concurrency_limiter, is_provider_failure, overload_listener
+)
+from app.services.nlp_transform.hedging import HedgedNLPProvider
+from app.services.nlp_transform.preprocess import learn_boilerplate, preprocess_text
+from app.services.nlp_transform.registry import create_provider
+from app.services.utils.simhash import SimHashIndex
 from app.config import config
 
 logger = logging.getLogger(__name__)
@@ -21,62 +33,318 @@ class NLPTransformService:
     def __init__(self):
         self.db = SessionLocal()
         self.provider = self._get_provider()
+        self.batch_provider = self._get_batch_provider()
+        self.boilerplate: Dict[Any, Set[str]] = {}
+        self.routed_providers: Dict[str, BaseNLPProvider] = {}
+        self.limiter = self._get_limiter()
+        self.breaker = get_circuit_breaker(
+            config.nlp_provider,
+            failure_threshold=config.nlp_breaker_failure_threshold,
+            reset_seconds=config.nlp_breaker_reset_seconds
+        )
     
     def _get_provider(self):
-        """Get the configured NLP provider."""
-        if config.nlp_provider == "openai":
-            return OpenAIProvider()
-        else:
-            raise ValueError(f"Unsupported NLP provider: {config.nlp_provider}")
+        """
+        Get the configured NLP provider.
+        
+        With fallback providers configured, the primary provider is combined
+        with them into a hedged provider; the result is wrapped in the
+        summary cache if enabled.
+        """
+        provider = create_provider({"provider": config.nlp_provider})
+        
+        self.hedged_provider = None
+        if config.nlp_fallbacks:
+            provider = self.hedged_provider = HedgedNLPProvider(
+                [provider] + [create_provider(options) for options in config.nlp_fallbacks],
+                hedging=config.nlp_hedging_enabled,
+                percentile=config.nlp_hedging_percentile,
+                min_delay=config.nlp_hedging_min_delay_seconds,
+                max_delay=config.nlp_hedging_max_delay_seconds,
+                min_samples=config.nlp_hedging_min_samples
+            )
+        
+        if config.nlp_cache_enabled:
+            provider = CachedNLPProvider(
+                provider,
+                self.db,
+                ttl=timedelta(days=config.nlp_cache_ttl_days),
+                max_entries=config.nlp_cache_max_entries,
+                memory_entries=config.nlp_cache_memory_entries
+            )
+        return provider
+    
+    def _get_limiter(self):
+        """
+        Get the concurrency limiter for the default provider.
+        
+        With adaptive concurrency off the limit stays at nlp.concurrency.
+        """
+        if not config.nlp_adaptive_concurrency_enabled:
+            return get_concurrency_limiter(
+                f"{config.nlp_provider}:fixed",
+                initial=config.nlp_concurrency,
+                min_limit=config.nlp_concurrency,
+                max_limit=config.nlp_concurrency
+            )
+        return get_concurrency_limiter(
+            config.nlp_provider,
+            initial=config.nlp_concurrency,
+            min_limit=config.nlp_adaptive_concurrency_min,
+            max_limit=config.nlp_adaptive_concurrency_max,
+            latency_target=config.nlp_adaptive_concurrency_latency_target_seconds
+        )
+    
+    def _get_batch_provider(self) -> Optional[OpenAIProvider]:
+        """Get the provider for Batch API jobs, or None if batch mode is off."""
+        if not config.nlp_batch_enabled:
+            return None
+        if config.nlp_provider != "openai":
+            raise ValueError(f"Batch mode is not supported by NLP provider: {config.nlp_provider}")
+        return OpenAIProvider()
     
     async def transform_posts(self) -> Dict[str, Any]:
         """
         Transform all posts with status="new".
         
+        Posts are claimed in small batches, so any number of workers can
+        run this at once without summarizing a post twice. Leases of the
+        claimed posts are renewed while the run lasts, and claimed posts
+        the run does not finish go back to "new" when it ends.
+        
         Returns:
             Dictionary with processing results
         """
+        claimed: List[Post] = []
+        heartbeat = None
         try:
-            # Get all posts with status="new"
-            posts = self.db.query(Post).filter(Post.status == "new").all()
+            # Apply the results of finished batch jobs first
+            transformed, errors = await self.collect_batches() if self.batch_provider else (0, 0)
+            self._release_expired_claims()
             
-            if not posts:
-                logger.info("No new posts to transform")
-                return {"transformed": 0, "errors": 0}
+            duplicates = 0
+            deferred = 0
+            queued: List[Post] = []
+            packed: List[Post] = []
             
-            transformed = 0
-            errors = 0
+            fingerprints = self._load_recent_fingerprints() if config.dedup_enabled else {}
             
-            for post in posts:
-                try:
-                    await self.transform_post(post)
-                    transformed += 1
-                except Exception as e:
-                    logger.error(f"Failed to transform post {post.id}: {str(e)}")
-                    # Mark post as error
-                    post.status = "error"
-                    self.db.commit()
-                    errors += 1
+            # Transform concurrently; the limiter adapts the number of
+            # requests in flight to what the default provider sustains,
+            # and the provider's rate limiter keeps them within the API quota
+            async def process(post: Post) -> str:
+                if config.dedup_enabled:
+                    outcome = self._check_duplicate(post, fingerprints)
+                    if outcome is not None:
+                        return outcome
+                
+                # Only default provider calls take a slot; routed providers
+                # say nothing about its capacity
+                provider = self._provider_for(post)
+                if provider is not self.provider:
+                    await self.transform_post(post, provider)
+                    return "transformed"
+                
+                if self._use_batch(post):
+                    if self._apply_cached(post):
+                        return "transformed"
+                    queued.append(post)
+                    return "queued"
+                
+                if config.nlp_packing_enabled and post.original_text:
+                    packed.append(post)
+                    return "packed"
+                
+                async with self.limiter.slot() as epoch:
+                    # Posts waiting while the provider is down stay "new"
+                    # for the next run
+                    if not self.breaker.allow():
+                        return "deferred"
+                    
+                    started = time.monotonic()
+                    try:
+                        # Attempts the provider retries internally cut the
+                        # limit as well, even if a retry succeeds
+                        with overload_listener(lambda: self.limiter.on_overload(epoch)):
+                            await self.transform_post(post)
+                    except Exception as e:
+                        if is_provider_failure(e):
+                            self.limiter.on_overload(epoch)
+                            self.breaker.record_failure()
+                        raise
+                    self.limiter.on_success(epoch, time.monotonic() - started)
+                    self.breaker.record_success()
+                    return "transformed"
+            
+            # Claim oldest first so originals are transformed before their
+            # near-duplicates; stop claiming while the provider is down
+            heartbeat = asyncio.create_task(self._renew_claims(claimed))
+            while self.breaker.allow():
+                posts = self._claim_posts()
+                if not posts:
+                    break
+                claimed.extend(posts)
+                
+                results = await asyncio.gather(
+                    *(process(post) for post in posts),
+                    return_exceptions=True
+                )
+                
+                for post, result in zip(posts, results):
+                    if isinstance(result, Exception) and is_provider_failure(result):
+                        logger.warning(f"Deferred post {post.id}, provider unavailable: {str(result)}")
+                        deferred += 1
+                    elif isinstance(result, Exception):
+                        logger.error(f"Failed to transform post {post.id}: {str(result)}")
+                        # Mark post as error
+                        post.status = "error"
+                        errors += 1
+                    elif result == "duplicate":
+                        duplicates += 1
+                    elif result == "deferred":
+                        deferred += 1
+                    elif result == "transformed":
+                        transformed += 1
+                self.db.commit()
+                
+                if packed and self.breaker.allow():
+                    packed_transformed, packed_errors = await self._transform_packed(packed)
+                    transformed += packed_transformed
+                    errors += packed_errors
+                    deferred += len(packed) - packed_transformed - packed_errors
+                else:
+                    deferred += len(packed)
+                packed.clear()
+            
+            batched = await self._submit_batches(queued) if queued else 0
             
-            logger.info(f"Transform completed: {transformed} posts transformed, {errors} errors")
-            return {
+            result = {
                 "transformed": transformed,
-                "errors": errors
+                "errors": errors,
+                "duplicates": duplicates,
+                "batched": batched,
+                "deferred": deferred,
+                "concurrency": round(self.limiter.limit, 1),
+                "circuit": self.breaker.state
             }
+            if isinstance(self.provider, CachedNLPProvider):
+                self.provider.evict()
+                result["cache"] = self.provider.stats()
+            
+            logger.info(
+                f"Transform completed: {transformed} posts transformed, "
+                f"{batched} batched, {duplicates} duplicates, {errors} errors, "
+                f"{deferred} deferred (concurrency {result['concurrency']}, circuit {self.breaker.state})"
+            )
+            if self.hedged_provider is not None:
+                result["providers"] = self.hedged_provider.stats()
+            
+            if "cache" in result:
+                logger.info(f"Summary cache: {result['cache']}")
+            if "providers" in result:
+                logger.info(f"NLP providers: {result['providers']}")
+            return result
             
         except Exception as e:
             logger.error(f"NLP transform failed: {str(e)}")
             raise
         finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            self._release_claims(claimed)
             self.db.close()
     
-    async def transform_post(self, post: Post):
+    def _claim_posts(self) -> List[Post]:
+        """
+        Claim the oldest new posts for this worker.
+        
+        Rows locked by another worker's claim are skipped rather than
+        waited for, and claimed posts get status "processing" with a lease
+        so other workers leave them alone.
+        
+        Returns:
+            Up to nlp_claim_batch_size claimed posts
+        """
+        posts = (
+            self.db.query(Post)
+            .filter(Post.status == "new")
+            .order_by(Post.published_at, Post.id)
+            .limit(config.nlp_claim_batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        now = datetime.now(timezone.utc)
+        for post in posts:
+            post.status = "processing"
+            post.claimed_at = now
+        self.db.commit()
+        return posts
+    
+    async def _renew_claims(self, posts: List[Post]) -> None:
+        """
+        Renew the leases of claimed posts until cancelled.
+        
+        Leases are renewed three times per lease period, so a slow batch
+        is never taken for a crashed worker's and summarized twice.
+        
+        Args:
+            posts: Posts claimed by this run; the list grows as the run claims more
+        """
+        interval = config.nlp_claim_lease_minutes * 60 / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                now = datetime.now(timezone.utc)
+                for post in posts:
+                    if post.status == "processing":
+                        post.claimed_at = now
+                self.db.commit()
+            except Exception as e:
+                logger.error(f"Failed to renew claimed posts: {str(e)}")
+                self.db.rollback()
+    
+    def _release_claims(self, posts: List[Post]) -> None:
+        """
+        Return claimed posts that were not finished to status "new".
+        
+        Args:
+            posts: Posts claimed by this run
+        """
+        try:
+            released = 0
+            for post in posts:
+                if post.status == "processing":
+                    post.status = "new"
+                    post.claimed_at = None
+                    released += 1
+            self.db.commit()
+            if released:
+                logger.info(f"Released {released} unfinished posts")
+        except Exception as e:
+            logger.error(f"Failed to release claimed posts: {str(e)}")
+            self.db.rollback()
+    
+    def _release_expired_claims(self) -> None:
+        """Return posts whose worker lease expired, e.g. after a crash, to status "new"."""
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=config.nlp_claim_lease_minutes)
+        released = (
+            self.db.query(Post)
+            .filter(Post.status == "processing", Post.claimed_at < cutoff)
+            .update({Post.status: "new", Post.claimed_at: None}, synchronize_session=False)
+        )
+        self.db.commit()
+        if released:
+            logger.warning(f"Released {released} posts with expired worker leases")
+    
+    async def transform_post(self, post: Post, provider: Optional[BaseNLPProvider] = None):
         """
         Transform a single post.
         
         Args:
             post: Post model instance
+            provider: Provider to use instead of the default one
         """
+        provider = provider or self.provider
         try:
             if not post.original_text:
                 logger.warning(f"Post {post.id} has no original text")
@@ -85,8 +353,8 @@ class NLPTransformService:
                 return
             
             # Generate summary and hashtags
-            summary, hashtags = await self.provider.summarize(
-                post.original_text,
+            summary, hashtags = await provider.summarize(
+                self._prepare_text(post),
                 config.summary_prompt_template
             )
             
@@ -99,7 +367,388 @@ class NLPTransformService:
             logger.info(f"Transformed post {post.id}: {summary[:50]}...")
             
         except Exception as e:
-            logger.error(f"Failed to transform post {post.id}: {str(e)}")
-            post.status = "error"
-            self.db.commit()
+            # Provider outages leave the post claimed; it goes back to "new"
+            # when the run ends and is retried
+            if not is_provider_failure(e):
+                logger.error(f"Failed to transform post {post.id}: {str(e)}")
+                post.status = "error"
+                self.db.commit()
             raise
+    
+    async def _transform_packed(self, posts: List[Post]) -> Tuple[int, int]:
+        """
+        Transform posts with multi-post requests.
+        
+        Each pack holds a limiter slot like a single call, so its 429s and
+        5xx responses cut the concurrency limit and healthy packs raise it.
+        
+        Args:
+            posts: Posts with original text
+            
+        Returns:
+            Tuple of (transformed, errors) post counts; posts failed by a
+            provider outage are left for the next run and count as neither
+        """
+        async def run(pack: List[Post]) -> Dict[str, Any]:
+            async with self.limiter.slot() as epoch:
+                if not self.breaker.allow():
+                    return {}
+                    
+                started = time.monotonic()
+                with overload_listener(lambda: self.limiter.on_overload(epoch)):
+                    pack_results = await self.provider.summarize_many(
+                        [(str(post.id), self._prepare_text(post)) for post in pack],
+                        config.summary_prompt_template
+                    )
+                if any(
+                    not isinstance(result, tuple) and is_provider_failure(result)
+                    for result in pack_results.values()
+                ):
+                    self.limiter.on_overload(epoch)
+                else:
+                    self.limiter.on_success(epoch, time.monotonic() - started)
+                return pack_results
+                
+        # One request per pack of max_posts; the provider only splits a pack
+        # further when it exceeds the packing token budget
+        size = config.nlp_packing_max_posts
+        results = {}
+        for pack_results in await asyncio.gather(
+            *(run(posts[start:start + size]) for start in range(0, len(posts), size))
+        ):
+            results.update(pack_results)
+        
+        transformed = 0
+        errors = 0
+        for post in posts:
+            result = results.get(str(post.id))
+            if result is None:
+                # Not sent while the circuit was open
+                continue
+            if isinstance(result, tuple):
+                post.summary_text, post.hashtags = result
+                post.status = "ready"
+                transformed += 1
+                self.breaker.record_success()
+            elif is_provider_failure(result):
+                self.breaker.record_failure()
+            else:
+                logger.error(f"Failed to transform post {post.id}: {str(result)}")
+                post.status = "error"
+                errors += 1
+        self.db.commit()
+        
+        return transformed, errors
+    
+    def _provider_for(self, post: Post) -> BaseNLPProvider:
+        """
+        Get the provider for a post.
+        
+        The source's nlp_provider wins over its channel's, which wins over
+        the nlp.source_type_providers mapping; otherwise the default
+        provider is used.
+        
+        Args:
+            post: Post to transform
+            
+        Returns:
+            Provider instance
+        """
+        source = post.source
+        name = (
+            source.nlp_provider
+            or source.our_channel.nlp_provider
+            or config.nlp_source_type_providers.get(source.source_type)
+        )
+        if not name or name == config.nlp_provider:
+            return self.provider
+        
+        if name not in self.routed_providers:
+            self.routed_providers[name] = create_provider({"provider": name})
+        return self.routed_providers[name]
+    
+    def _prepare_text(self, post: Post) -> str:
+        """
+        Get the text sent to the provider for a post.
+        
+        Whitespace is normalized, link lists, emoji runs and the source's
+        boilerplate lines are removed, and the text is truncated to the
+        input token budget.
+        
+        Args:
+            post: Post with original text
+            
+        Returns:
+            Text to summarize
+        """
+        if not config.nlp_preprocess_enabled:
+            return post.original_text
+        
+        return preprocess_text(
+            post.original_text,
+            self._get_boilerplate(post.source_id),
+            config.nlp_max_input_tokens,
+            config.nlp_tokenizer
+        )
+    
+    def _get_boilerplate(self, source_id) -> Set[str]:
+        """
+        Learn a source's boilerplate lines from its recent posts.
+        
+        Args:
+            source_id: Source id
+            
+        Returns:
+            Set of boilerplate lines, cached for the rest of the run
+        """
+        if source_id not in self.boilerplate:
+            texts = [
+                text for (text,) in
+                self.db.query(Post.original_text)
+                .filter(Post.source_id == source_id)
+                .order_by(Post.created_at.desc())
+                .limit(config.nlp_boilerplate_sample_posts)
+                .all()
+            ]
+            self.boilerplate[source_id] = learn_boilerplate(
+                texts,
+                config.nlp_boilerplate_min_share,
+                config.nlp_boilerplate_min_posts
+            )
+        return self.boilerplate[source_id]
+    
+    def _use_batch(self, post: Post) -> bool:
+        """Check whether a post is summarized through the Batch API."""
+        if self.batch_provider is None or not post.original_text:
+            return False
+        return not config.nlp_batch_source_types or post.source.source_type in config.nlp_batch_source_types
+    
+    def _apply_cached(self, post: Post) -> bool:
+        """
+        Apply a cached summary to a post instead of batching it.
+        
+        Args:
+            post: Post waiting for a summary
+            
+        Returns:
+            True if the summary cache had the post's summary
+        """
+        if not isinstance(self.provider, CachedNLPProvider):
+            return False
+        
+        cached = self.provider.lookup(self._prepare_text(post), config.summary_prompt_template)
+        if cached is None:
+            return False
+        
+        post.summary_text, post.hashtags = cached
+        post.status = "ready"
+        self.db.commit()
+        return True
+    
+    async def _submit_batches(self, posts: List[Post]) -> int:
+        """
+        Submit posts to the Batch API in jobs of at most nlp_batch_max_posts.
+        
+        Submitted posts get status "batched" and the job's id. Posts of a
+        job that fails to submit stay "new" and are retried next run.
+        
+        Args:
+            posts: Posts to summarize
+            
+        Returns:
+            Number of submitted posts
+        """
+        submitted = 0
+        for start in range(0, len(posts), config.nlp_batch_max_posts):
+            chunk = posts[start:start + config.nlp_batch_max_posts]
+            try:
+                batch_id = await self.batch_provider.submit_batch(
+                    [(str(post.id), self._prepare_text(post)) for post in chunk],
+                    config.summary_prompt_template
+                )
+            except Exception as e:
+                logger.error(f"Failed to submit batch of {len(chunk)} posts: {str(e)}")
+                break
+            
+            for post in chunk:
+                post.status = "batched"
+                post.nlp_batch_id = batch_id
+            self.db.commit()
+            submitted += len(chunk)
+        
+        return submitted
+    
+    async def collect_batches(self) -> Tuple[int, int]:
+        """
+        Apply the results of finished Batch API jobs.
+        
+        Posts of a job that expired or was cancelled before their request
+        ran go back to status "new"; posts of a failed job, or whose
+        request failed, get status "error".
+        
+        Returns:
+            Tuple of (transformed, errors) post counts
+        """
+        batch_ids = [
+            batch_id for (batch_id,) in
+            self.db.query(Post.nlp_batch_id).filter(Post.status == "batched").distinct().all()
+        ]
+        
+        transformed = 0
+        errors = 0
+        for batch_id in batch_ids:
+            try:
+                results = await self.batch_provider.fetch_batch(batch_id)
+            except Exception as e:
+                logger.error(f"Failed to check batch {batch_id}: {str(e)}")
+                continue
+                
+            if not results.finished:
+                logger.info(f"Batch {batch_id} is {results.status}")
+                continue
+                
+            # Another worker collecting the same job skips the locked rows
+            posts = (
+                self.db.query(Post)
+                .filter(Post.nlp_batch_id == batch_id, Post.status == "batched")
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            for post in posts:
+                custom_id = str(post.id)
+                if custom_id in results.summaries:
+                    post.summary_text, post.hashtags = results.summaries[custom_id]
+                    post.status = "ready"
+                    transformed += 1
+                    if isinstance(self.provider, CachedNLPProvider):
+                        self.provider.store(self._prepare_text(post), config.summary_prompt_template,
+                                            post.summary_text, post.hashtags)
+                elif custom_id in results.errors or results.status == "failed":
+                    logger.error(
+                        f"Failed to transform post {post.id} in batch {batch_id}: "
+                        f"{results.errors.get(custom_id, 'batch failed')}"
+                    )
+                    post.status = "error"
+                    errors += 1
+                else:
+                    post.status = "new"
+                    post.nlp_batch_id = None
+            self.db.commit()
+            logger.info(f"Batch {batch_id} {results.status}: applied results to {len(posts)} posts")
+            
+        return transformed, errors
+    
+    def _load_recent_fingerprints(self) -> Dict[Any, SimHashIndex]:
+        """
+        Load fingerprints of posts from the dedup window, indexed per channel.
+        
+        Only the columns needed to find candidates are loaded; a candidate
+        post itself is loaded once it matches.
+        
+        Returns:
+            Dictionary mapping our_channel_id to an index of
+            (id, simhash, published_at) rows
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=config.dedup_window_hours)
+        rows = (
+            self.db.query(Post.id, Post.simhash, Post.published_at, Source.our_channel_id)
+            .join(Source, Post.source_id == Source.id)
+            .filter(
+                Post.created_at >= cutoff,
+                Post.simhash.isnot(None),
+                Post.status.notin_(["duplicate", "error"])
+            )
+            .all()
+        )
+        
+        fingerprints: Dict[Any, SimHashIndex] = {}
+        for row in rows:
+            if row.our_channel_id not in fingerprints:
+                fingerprints[row.our_channel_id] = SimHashIndex(config.dedup_max_distance)
+            fingerprints[row.our_channel_id].add(row.simhash, row)
+        return fingerprints
+    
+    def _find_duplicate(self, post: Post, fingerprints: Dict[Any, SimHashIndex]) -> Optional[Post]:
+        """
+        Find an earlier near-duplicate of a post for the same channel.
+        
+        Args:
+            post: Post to check
+            fingerprints: Result of _load_recent_fingerprints
+            
+        Returns:
+            The closest earlier post within the Hamming distance that is
+            not itself a duplicate or failed, or None
+        """
+        index = fingerprints.get(post.source.our_channel_id)
+        if post.simhash is None or index is None:
+            return None
+        
+        def order_key(candidate: Any) -> Tuple[datetime, str]:
+            return candidate.published_at, str(candidate.id)
+        
+        for _, candidate in index.search(post.simhash):
+            if candidate.id == post.id or order_key(candidate) >= order_key(post):
+                continue
+            # Statuses change during the run, so check the current one
+            original = self.db.get(Post, candidate.id)
+            if original is not None and original.status not in ("duplicate", "error"):
+                return original
+        
+        return None
+    
+    def _check_duplicate(self, post: Post, fingerprints: Dict[Any, SimHashIndex]) -> Optional[str]:
+        """
+        Handle a post that near-duplicates an earlier one.
+        
+        Only originals that are ready or sent are final. With dedup action
+        "skip", a post whose original is still pending is deferred to a
+        later run, so it is not dropped for an original that may still
+        fail; with "reuse" it is transformed on its own.
+        
+        Args:
+            post: Post to check
+            fingerprints: Result of _load_recent_fingerprints
+            
+        Returns:
+            "duplicate" or "deferred" if the post needs no transform now,
+            otherwise None
+        """
+        original = self._find_duplicate(post, fingerprints)
+        if original is None:
+            return None
+        if original.status in ("ready", "sent"):
+            return "duplicate" if self._apply_duplicate(post, original) else None
+        if config.dedup_action == "skip":
+            logger.info(f"Post {post.id} waits for its original {original.id} ({original.status})")
+            return "deferred"
+        return None
+    
+    def _apply_duplicate(self, post: Post, original: Post) -> bool:
+        """
+        Mark a post as a near-duplicate of an earlier post.
+        
+        With dedup action "skip" the post gets status "duplicate" and is
+        never summarized or published. With "reuse" it takes over the
+        original's summary and hashtags, if the original has one yet.
+        
+        Args:
+            post: Near-duplicate post
+            original: Earlier post it duplicates
+            
+        Returns:
+            True if the post was handled and needs no transform
+        """
+        if config.dedup_action == "reuse":
+            if not original.summary_text:
+                return False
+            post.summary_text = original.summary_text
+            post.hashtags = original.hashtags
+            post.status = "ready"
+        else:
+            post.status = "duplicate"
+        
+        post.duplicate_of_id = original.id
+        self.db.commit()
+        logger.info(f"Post {post.id} is a near-duplicate of {original.id} ({config.dedup_action})")
+        return True
@@ -0,0 +1,130 @@
+"""
+Cache of Telegram file_ids for uploaded media.
+Sending a known file_id is instant server-side, while a URL makes
+Telegram download the media again.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import TelegramFileCache
+
+logger = logging.getLogger(__name__)
+
+
+def get_file_id(message: Any, media_type: str) -> Optional[str]:
+    """
+    Get the file_id of the media in a sent message.
+    
+    Args:
+        message: Message returned by a Bot API send method
+        media_type: "photo" or "video"
+        
+    Returns:
+        file_id, or None if the message has no such media
+    """
+    media = getattr(message, media_type, None)
+    if isinstance(media, list):
+        # Photos come in several sizes, largest last
+        media = media[-1] if media else None
+    if media is None:
+        # GIFs sent as photos or videos come back as animations
+        media = getattr(message, "animation", None)
+    return getattr(media, "file_id", None)
+
+
+def is_rejected_file_id(error: BaseException) -> bool:
+    """
+    Check whether Telegram refused a cached file_id.
+    
+    Args:
+        error: Exception raised by a Bot API send method
+        
+    Returns:
+        True for a 400 response about the file identifier; throttling,
+        network and other errors say nothing about the file_id
+    """
+    if getattr(error, "error_code", None) != 400:
+        return False
+    description = (getattr(error, "description", None) or "").lower()
+    return any(phrase in description for phrase in ("file identifier", "file_id", "file reference"))
+
+
+class FileIdCache:
+    """Persistent mapping of media keys to Telegram file_ids."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str, media_type: str) -> Optional[str]:
+        """
+        Look up the file_id of media.
+        
+        Args:
+            key: Media URL or content hash
+            media_type: "photo" or "video"
+            
+        Returns:
+            Cached file_id, or None
+        """
+        entry = self.db.get(TelegramFileCache, key)
+        if entry is None or entry.media_type != media_type:
+            self.misses += 1
+            return None
+            
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_used_at = datetime.now(timezone.utc)
+        self.db.commit()
+        self.hits += 1
+        return entry.file_id
+    
+    def put(self, key: str, media_type: str, file_id: str) -> None:
+        """
+        Store the file_id of uploaded media.
+        
+        Args:
+            key: Media URL or content hash
+            media_type: "photo" or "video"
+            file_id: file_id returned by Telegram
+        """
+        now = datetime.now(timezone.utc)
+        values = {
+            "key": key,
+            "media_type": media_type,
+            "file_id": file_id,
+            "hits": 0,
+            "created_at": now,
+            "last_used_at": now
+        }
+        stmt = insert(TelegramFileCache).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={name: stmt.excluded[name] for name in values if name != "key"}
+        )
+        self.db.execute(stmt)
+        self.db.commit()
+    
+    def evict(self, key: str) -> None:
+        """
+        Drop a file_id Telegram no longer accepts.
+        
+        Args:
+            key: Media URL or content hash
+        """
+        self.db.query(TelegramFileCache).filter(TelegramFileCache.key == key).delete()
+        self.db.commit()
+        logger.info(f"Evicted stale file_id for {key}")
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get hit/miss counters.
+        
+        Returns:
+            Dictionary with hits and misses
+        """
+        return {"hits": self.hits, "misses": self.misses}
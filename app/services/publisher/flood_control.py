@@ -0,0 +1,166 @@
+"""
+Flood control for Telegram Bot API sends.
+Token buckets for the per-bot and per-chat message limits, plus per-chat
+pauses for the retry_after of 429 responses.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import config
+from app.services.utils.token_bucket import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class FloodControlError(Exception):
+    """Telegram keeps throttling a chat; the send should be retried in a later run."""
+    
+    def __init__(self, chat_id: str, retry_after: float):
+        super().__init__(f"Chat {chat_id} is throttled for {retry_after:.0f}s")
+        self.chat_id = chat_id
+        self.retry_after = retry_after
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """
+    Get the wait Telegram asks for in a 429 response.
+    
+    Args:
+        error: Exception raised by a Bot API call
+        
+    Returns:
+        Seconds to wait, or None if the error is not a 429
+    """
+    if getattr(error, "error_code", None) != 429:
+        return None
+    parameters = (getattr(error, "result_json", None) or {}).get("parameters") or {}
+    return float(parameters.get("retry_after", 1))
+
+
+class SendScheduler:
+    """
+    Paces Bot API sends within Telegram's flood limits.
+    
+    Each message takes a token from its chat's bucket and then from the
+    bot-wide bucket; an album takes one per item, as Telegram counts each
+    item as a message. A 429 pauses only the chat it was returned for.
+    """
+    
+    def __init__(
+        self,
+        messages_per_second: float = 30,
+        chat_messages_per_minute: float = 20,
+        chat_burst: float = 3,
+        max_retries: int = 3,
+        max_wait_seconds: float = 60,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.bucket = TokenBucket(messages_per_second * 60, capacity=messages_per_second, clock=clock)
+        self.chat_messages_per_minute = chat_messages_per_minute
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.max_wait_seconds = max_wait_seconds
+        self.clock = clock
+        self.chat_buckets: Dict[str, TokenBucket] = {}
+        self.paused_until: Dict[str, float] = {}
+    
+    def pause(self, chat_id: str, seconds: float) -> None:
+        """
+        Pause sends to a chat.
+        
+        Args:
+            chat_id: Telegram chat ID or username
+            seconds: Pause duration
+        """
+        self.paused_until[chat_id] = max(self.paused_until.get(chat_id, 0.0), self.clock() + seconds)
+    
+    async def acquire(self, chat_id: str, message_count: int = 1) -> None:
+        """
+        Wait until messages may be sent to a chat.
+        
+        Args:
+            chat_id: Telegram chat ID or username
+            message_count: Number of messages the send delivers
+            
+        Raises:
+            FloodControlError: If the chat is paused for longer than max_wait_seconds
+        """
+        wait = self.paused_until.get(chat_id, 0.0) - self.clock()
+        if wait > self.max_wait_seconds:
+            raise FloodControlError(chat_id, wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+            
+        if chat_id not in self.chat_buckets:
+            self.chat_buckets[chat_id] = TokenBucket(
+                self.chat_messages_per_minute, capacity=self.chat_burst, clock=self.clock
+            )
+        # One token at a time, since buckets clamp larger requests to their
+        # capacity and an album can exceed the chat burst
+        for _ in range(message_count):
+            await self.chat_buckets[chat_id].acquire(1)
+            await self.bucket.acquire(1)
+    
+    async def send(
+        self,
+        method: Callable[..., Awaitable[Any]],
+        chat_id: str,
+        message_count: int = 1,
+        **kwargs
+    ) -> Any:
+        """
+        Call a Bot API send method within the flood limits.
+        
+        429 responses pause the chat for their retry_after and the call is
+        retried, up to max_retries times.
+        
+        Args:
+            method: Bot API method, e.g. bot.send_message
+            chat_id: Telegram chat ID or username
+            message_count: Number of messages the call delivers, e.g. album items
+            **kwargs: Method arguments besides chat_id
+            
+        Returns:
+            Result of the method
+            
+        Raises:
+            FloodControlError: If the chat stays throttled
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(chat_id, message_count)
+            try:
+                return await method(chat_id=chat_id, **kwargs)
+            except Exception as e:
+                retry_after = get_retry_after(e)
+                if retry_after is None:
+                    raise
+                self.pause(chat_id, retry_after)
+                logger.warning(f"Telegram flood control for {chat_id}: retry after {retry_after:.0f}s")
+                
+        raise FloodControlError(chat_id, self.paused_until[chat_id] - self.clock())
+
+
+# Flood limits apply per bot, so one scheduler is shared by the process
+_scheduler: Optional[SendScheduler] = None
+
+
+def get_send_scheduler() -> SendScheduler:
+    """
+    Get the process-wide send scheduler built from the telegram config.
+    
+    Returns:
+        SendScheduler instance
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SendScheduler(
+            messages_per_second=config.telegram_messages_per_second,
+            chat_messages_per_minute=config.telegram_chat_messages_per_minute,
+            chat_burst=config.telegram_chat_burst,
+            max_retries=config.telegram_flood_max_retries,
+            max_wait_seconds=config.telegram_flood_max_wait_seconds
+        )
+    return _scheduler
@@ -3,18 +3,27 @@ Telegram publisher service.
 Publishes posts to Telegram channels.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session, joinedload
 
 from app.db import SessionLocal
 from app.models import Post, Source, OurChannel
 from app.config import config
-import telebot
+from app.services.media.cache import CachedMedia, MediaCache
+from app.services.media.pipeline import get_media_url
+from app.services.publisher.file_cache import FileIdCache, get_file_id, is_rejected_file_id
+from app.services.publisher.flood_control import FloodControlError, get_send_scheduler
+from telebot.async_telebot import AsyncTeleBot
+from telebot.types import InputMediaPhoto, InputMediaVideo
 
 logger = logging.getLogger(__name__)
 
+# Telegram accepts 2-10 photos and videos per sendMediaGroup call
+ALBUM_MAX_ITEMS = 10
+
 
 class TelegramPublisherService:
     """Service for publishing posts to Telegram channels."""
@@ -23,12 +32,25 @@ class TelegramPublisherService:
         self.db = SessionLocal()
         if not config.telegram.bot_token:
             raise RuntimeError("TELEGRAM_BOT_TOKEN is not set. Configure it to enable publishing.")
-        self.bot = telebot.TeleBot(config.telegram.bot_token)
+        # Async client over a shared keep-alive aiohttp session, so Bot API
+        # calls do not block the event loop
+        self.bot = AsyncTeleBot(config.telegram.bot_token)
+        self.scheduler = get_send_scheduler()
+        self.file_cache = FileIdCache(self.db) if config.publish_file_id_cache_enabled else None
+        self.media_cache = (
+            MediaCache(config.media_cache_dir, config.media_cache_max_bytes) if config.media_enabled else None
+        )
+        self.media: Dict[str, Optional[CachedMedia]] = {}
     
     async def publish_posts(self) -> Dict[str, Any]:
         """
         Publish all posts with status="ready".
         
+        Chats are published to concurrently; within a chat posts are sent
+        one at a time, oldest first, with bursts of media posts grouped
+        into albums when the channel has an album window. Posts of a chat
+        Telegram keeps throttling stay "ready" for the next run.
+        
         Returns:
             Dictionary with processing results
         """
@@ -36,40 +58,290 @@ class TelegramPublisherService:
             # Get all posts with status="ready" and their related data
             posts = self.db.query(Post).options(
                 joinedload(Post.source).joinedload(Source.our_channel)
-            ).filter(Post.status == "ready").all()
+            ).filter(Post.status == "ready").order_by(Post.published_at, Post.id).all()
             
             if not posts:
                 logger.info("No ready posts to publish")
-                return {"published": 0, "errors": 0}
-            
-            published = 0
-            errors = 0
+                return {"published": 0, "errors": 0, "throttled": 0}
             
+            chats: Dict[Optional[str], List[Post]] = {}
             for post in posts:
-                try:
-                    success = await self.publish_post(post)
-                    if success:
-                        published += 1
-                    else:
-                        errors += 1
-                except Exception as e:
-                    logger.error(f"Failed to publish post {post.id}: {str(e)}")
-                    post.status = "error"
-                    self.db.commit()
-                    errors += 1
-            
-            logger.info(f"Publish completed: {published} posts published, {errors} errors")
-            return {
+                our_channel = post.source.our_channel
+                chat_id = our_channel.tg_chat_id_or_username if our_channel else None
+                chats.setdefault(chat_id, []).append(post)
+            
+            # Look up media prepared by the media job, so the ordered sends
+            # upload local files
+            if self.media_cache is not None:
+                prepared = [
+                    (self._get_media_url(post), post.media_type)
+                    for post in posts if post.media_type
+                ]
+                self.media = await asyncio.to_thread(self._load_media, prepared)
+            
+            semaphore = asyncio.Semaphore(config.telegram_max_concurrent_chats)
+            
+            async def publish_chat(chat_posts: List[Post]) -> Tuple[int, int, int]:
+                async with semaphore:
+                    return await self._publish_in_order(chat_posts)
+            
+            results = await asyncio.gather(*(publish_chat(chat_posts) for chat_posts in chats.values()))
+            published = sum(chat_published for chat_published, _, _ in results)
+            errors = sum(chat_errors for _, chat_errors, _ in results)
+            throttled = sum(chat_throttled for _, _, chat_throttled in results)
+            
+            logger.info(
+                f"Publish completed: {published} posts published, {errors} errors, "
+                f"{throttled} throttled"
+            )
+            result = {
                 "published": published,
-                "errors": errors
+                "errors": errors,
+                "throttled": throttled
             }
+            if self.file_cache is not None:
+                result["file_cache"] = self.file_cache.stats()
+                logger.info(f"File id cache: {result['file_cache']}")
+            return result
             
         except Exception as e:
             logger.error(f"Publish failed: {str(e)}")
             raise
         finally:
+            await self.bot.close_session()
             self.db.close()
     
+    async def _publish_in_order(self, posts: List[Post]) -> Tuple[int, int, int]:
+        """
+        Publish posts of one chat one after another.
+        
+        Albums that fail for other reasons than flood control are sent
+        post by post. When the chat is throttled, the remaining posts are
+        left "ready" so they are sent in order by a later run.
+        
+        Args:
+            posts: Posts for the same chat, in publishing order
+            
+        Returns:
+            Tuple of (published, errors, throttled) post counts
+        """
+        published = 0
+        errors = 0
+        done = 0
+        for album in self._group_albums(posts):
+            try:
+                if len(album) > 1 and await self.publish_album(album):
+                    published += len(album)
+                    done += len(album)
+                    continue
+                    
+                for post in album:
+                    try:
+                        success = await self.publish_post(post)
+                        if success:
+                            published += 1
+                        else:
+                            errors += 1
+                    except FloodControlError:
+                        raise
+                    except Exception as e:
+                        logger.error(f"Failed to publish post {post.id}: {str(e)}")
+                        post.status = "error"
+                        self.db.commit()
+                        errors += 1
+                    done += 1
+            except FloodControlError as e:
+                logger.warning(f"Requeued {len(posts) - done} posts: {str(e)}")
+                return published, errors, len(posts) - done
+        return published, errors, 0
+    
+    def _load_media(self, prepared: List[Tuple[Optional[str], str]]) -> Dict[str, Optional[CachedMedia]]:
+        """
+        Load media prepared by the media job from the disk cache.
+        
+        Args:
+            prepared: Tuples of (media URL, media_type) of prepared posts
+            
+        Returns:
+            Dictionary mapping URLs to cached media, or to None if the URL
+            is not an image or video; evicted media is left out and sent by URL
+        """
+        media: Dict[str, Optional[CachedMedia]] = {}
+        for media_url, media_type in prepared:
+            if not media_url:
+                continue
+            if media_type == "unknown":
+                media[media_url] = None
+                continue
+            cached = self.media_cache.get(media_url)
+            if cached is not None:
+                media[media_url] = cached
+        return media
+    
+    def _group_albums(self, posts: List[Post]) -> List[List[Post]]:
+        """
+        Split posts of one chat into albums and single posts.
+        
+        Consecutive photo and video posts of one source published within
+        the channel's album window of the first post of the group form an
+        album of up to ALBUM_MAX_ITEMS posts; every other post is a group
+        of its own. Posts of different sources feeding the same channel are
+        never grouped, even when published close together.
+        
+        Args:
+            posts: Posts for the same chat, in publishing order
+            
+        Returns:
+            List of post groups, in publishing order
+        """
+        groups: List[List[Post]] = []
+        current: List[Post] = []
+        for post in posts:
+            our_channel = post.source.our_channel
+            window = our_channel.album_window_seconds if our_channel else None
+            if window is None:
+                window = config.publish_album_window_seconds
+                
+            media_url = self._get_media_url(post)
+            groupable = (
+                window > 0
+                and post.published_at is not None
+                and media_url is not None
+                and self._resolve_media(media_url)[0] in ("photo", "video")
+            )
+            if (
+                groupable
+                and current
+                and len(current) < ALBUM_MAX_ITEMS
+                and post.source_id == current[0].source_id
+                and (post.published_at - current[0].published_at).total_seconds() <= window
+            ):
+                current.append(post)
+                continue
+                
+            if current:
+                groups.append(current)
+                current = []
+            if groupable:
+                current = [post]
+            else:
+                groups.append([post])
+                
+        if current:
+            groups.append(current)
+        return groups
+    
+    async def publish_album(self, posts: List[Post]) -> bool:
+        """
+        Publish media posts of one channel as a single album.
+        
+        Each post is one item of the album with its own caption, so the
+        whole burst costs one Bot API call. Cached file_ids are used where
+        known; if Telegram rejects the album because of one, the album's
+        cached file_ids are evicted and the media uploaded again.
+        
+        Args:
+            posts: 2-10 photo or video posts for the same channel
+            
+        Returns:
+            True if successful, False otherwise
+            
+        Raises:
+            FloodControlError: If the chat stays throttled
+        """
+        our_channel = posts[0].source.our_channel
+        try:
+            items = []
+            for post in posts:
+                media_url = self._get_media_url(post)
+                media_type, prepared = self._resolve_media(media_url)
+                key = f"sha256:{prepared.sha256}" if prepared else media_url
+                items.append((post, media_type, media_url, prepared, key))
+                
+            keys = [key for _, _, _, _, key in items]
+            media_types = [media_type for _, media_type, _, _, _ in items]
+            file_ids = [
+                self.file_cache.get(key, media_type) if self.file_cache else None
+                for key, media_type in zip(keys, media_types)
+            ]
+            
+            try:
+                messages = await self._send_album(our_channel.tg_chat_id_or_username, items, file_ids)
+            except FloodControlError:
+                raise
+            except Exception as e:
+                if not any(file_ids) or not is_rejected_file_id(e):
+                    raise
+                logger.warning(f"Album with cached file_ids was rejected: {str(e)}")
+                for key, file_id in zip(keys, file_ids):
+                    if file_id:
+                        self.file_cache.evict(key)
+                messages = await self._send_album(
+                    our_channel.tg_chat_id_or_username, items, [None] * len(items)
+                )
+                file_ids = [None] * len(items)
+                
+            if self.file_cache:
+                for key, media_type, file_id, message in zip(keys, media_types, file_ids, messages):
+                    new_file_id = get_file_id(message, media_type)
+                    if new_file_id and not file_id:
+                        self.file_cache.put(key, media_type, new_file_id)
+                        
+            for post in posts:
+                post.status = "sent"
+                post.sent_at = datetime.utcnow()
+                
+                # Update source.last_guid (critical rule!)
+                post.source.last_guid = post.guid
+                
+            self.db.commit()
+            logger.info(f"Successfully published album of {len(posts)} posts to {our_channel.name}")
+            return True
+            
+        except FloodControlError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to publish album of {len(posts)} posts: {str(e)}")
+            return False
+    
+    async def _send_album(
+        self,
+        chat_id: str,
+        items: List[Tuple[Post, str, str, Optional[CachedMedia], str]],
+        file_ids: List[Optional[str]]
+    ) -> List[Any]:
+        """
+        Send album items with sendMediaGroup.
+        
+        Args:
+            chat_id: Telegram chat ID or username
+            items: Tuples of (post, media_type, media_url, prepared, cache key)
+            file_ids: Cached file_id of each item, or None to upload it
+            
+        Returns:
+            Sent messages, one per item
+        """
+        media = []
+        for (post, media_type, media_url, prepared, _), file_id in zip(items, file_ids):
+            if file_id:
+                source = file_id
+            elif prepared:
+                # Files go as (name, bytes), which can be sent again on a retry
+                source = (prepared.file_name, await asyncio.to_thread(prepared.read))
+            else:
+                source = media_url
+            input_media = InputMediaPhoto if media_type == "photo" else InputMediaVideo
+            media.append(input_media(
+                source,
+                caption=self._build_caption(post),
+                parse_mode=config.telegram_parse_mode
+            ))
+            
+        # Telegram counts every album item against the chat's flood limit
+        return await self.scheduler.send(
+            self.bot.send_media_group, chat_id=chat_id, message_count=len(media), media=media
+        )
+    
     async def publish_post(self, post: Post) -> bool:
         """
         Publish a single post to Telegram.
@@ -91,10 +363,11 @@ class TelegramPublisherService:
             caption = self._build_caption(post)
             
             # Determine if we have media
-            if post.media_url:
+            media_url = self._get_media_url(post)
+            if media_url:
                 success = await self._send_media_message(
                     our_channel.tg_chat_id_or_username,
-                    post.media_url,
+                    media_url,
                     caption
                 )
             else:
@@ -118,10 +391,24 @@ class TelegramPublisherService:
                 logger.error(f"Failed to publish post {post.id}")
                 return False
                 
+        except FloodControlError:
+            raise
         except Exception as e:
             logger.error(f"Failed to publish post {post.id}: {str(e)}")
             return False
     
+    def _get_media_url(self, post: Post) -> Optional[str]:
+        """
+        Get the media URL to publish a post with.
+        
+        Args:
+            post: Post model instance
+            
+        Returns:
+            Media URL, or None for a text message
+        """
+        return get_media_url(post)
+    
     def _build_caption(self, post: Post) -> str:
         """
         Build caption for Telegram message.
@@ -159,29 +446,14 @@ class TelegramPublisherService:
             True if successful, False otherwise
         """
         try:
-            # Determine media type by extension
-            media_type = self._get_media_type(media_url)
-            
-            if media_type == "photo":
-                self.bot.send_photo(
-                    chat_id=chat_id,
-                    photo=media_url,
-                    caption=caption,
-                    parse_mode=config.telegram_parse_mode,
-                    disable_web_page_preview=config.telegram_disable_preview
-                )
-            elif media_type == "video":
-                self.bot.send_video(
-                    chat_id=chat_id,
-                    video=media_url,
-                    caption=caption,
-                    parse_mode=config.telegram_parse_mode,
-                    disable_web_page_preview=config.telegram_disable_preview
-                )
+            media_type, prepared = self._resolve_media(media_url)
+            if media_type in ("photo", "video"):
+                await self._send_file(chat_id, media_type, media_url, caption, prepared)
             else:
                 # Send as text with link
                 message = f"{caption}\n\n{media_url}"
-                self.bot.send_message(
+                await self.scheduler.send(
+                    self.bot.send_message,
                     chat_id=chat_id,
                     text=message,
                     parse_mode=config.telegram_parse_mode,
@@ -190,10 +462,90 @@ class TelegramPublisherService:
             
             return True
             
+        except FloodControlError:
+            raise
         except Exception as e:
             logger.error(f"Failed to send media message: {str(e)}")
             return False
     
+    def _resolve_media(self, media_url: str) -> Tuple[str, Optional[CachedMedia]]:
+        """
+        Get the media type of a URL and its prepared media.
+        
+        Prepared media was typed by its contents; media that could not be
+        downloaded is sent by URL, typed by extension.
+        
+        Args:
+            media_url: URL of media file
+            
+        Returns:
+            Tuple of (media type, prepared media or None)
+        """
+        prepared = self.media.get(media_url)
+        if prepared is not None:
+            return prepared.media_type, prepared
+        if media_url in self.media:
+            return "unknown", None
+        return self._get_media_type(media_url), None
+    
+    async def _send_file(
+        self,
+        chat_id: str,
+        media_type: str,
+        media_url: str,
+        caption: str,
+        prepared: Optional[CachedMedia] = None
+    ) -> None:
+        """
+        Send a photo or video, by its cached file_id when there is one.
+        
+        A cached file_id that Telegram rejects as invalid is evicted and
+        the media is uploaded again; other errors are raised as they are.
+        The file_id of a new upload is cached. Prepared
+        media is uploaded from disk and its file_id cached by content hash,
+        other media is sent by URL.
+        
+        Args:
+            chat_id: Telegram chat ID or username
+            media_type: "photo" or "video"
+            media_url: URL of media file
+            caption: Message caption
+            prepared: Media prepared by the media job
+        """
+        method = self.bot.send_photo if media_type == "photo" else self.bot.send_video
+        key = f"sha256:{prepared.sha256}" if prepared else media_url
+        
+        file_id = self.file_cache.get(key, media_type) if self.file_cache else None
+        if file_id:
+            try:
+                await self.scheduler.send(
+                    method,
+                    chat_id=chat_id,
+                    caption=caption,
+                    parse_mode=config.telegram_parse_mode,
+                    **{media_type: file_id}
+                )
+                return
+            except Exception as e:
+                if not is_rejected_file_id(e):
+                    raise
+                logger.warning(f"Cached file_id for {media_url} was rejected: {str(e)}")
+                self.file_cache.evict(key)
+        
+        # Files go as (name, bytes), which can be sent again on a retry
+        upload = (prepared.file_name, await asyncio.to_thread(prepared.read)) if prepared else media_url
+        message = await self.scheduler.send(
+            method,
+            chat_id=chat_id,
+            caption=caption,
+            parse_mode=config.telegram_parse_mode,
+            **{media_type: upload}
+        )
+        
+        new_file_id = get_file_id(message, media_type)
+        if self.file_cache and new_file_id:
+            self.file_cache.put(key, media_type, new_file_id)
+    
     async def _send_text_message(self, chat_id: str, text: str) -> bool:
         """
         Send text message to Telegram.
@@ -206,7 +558,8 @@ class TelegramPublisherService:
             True if successful, False otherwise
         """
         try:
-            self.bot.send_message(
+            await self.scheduler.send(
+                self.bot.send_message,
                 chat_id=chat_id,
                 text=text,
                 parse_mode=config.telegram_parse_mode,
@@ -214,6 +567,8 @@ class TelegramPublisherService:
             )
             return True
             
+        except FloodControlError:
+            raise
         except Exception as e:
             logger.error(f"Failed to send text message: {str(e)}")
             return False
@@ -3,20 +3,22 @@ RSS ingestion service.
 Fetches content from RSS sources and stores new posts.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, List
+import aiohttp
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
 
 from app.db import SessionLocal
 from app.models import Source, Post
 from app.services.utils.rss import (
-    fetch_rss_feed, 
-    extract_guid, 
-    extract_original_text, 
-    extract_media_url,
-    build_rsshub_url
+    fetch_rsshub_feed,
+    create_http_session
 )
+from app.services.utils.polling import update_posting_rate, compute_poll_interval
 from app.config import config
 
 logger = logging.getLogger(__name__)
@@ -28,33 +30,59 @@ class RSSIngestService:
     def __init__(self):
         self.db = SessionLocal()
     
-    async def ingest_all_sources(self) -> Dict[str, Any]:
+    async def ingest_all_sources(
+        self,
+        due_only: bool = False,
+        source_ids: Optional[List[Any]] = None
+    ) -> Dict[str, Any]:
         """
         Ingest content from all enabled sources.
         
+        Args:
+            due_only: Only ingest sources whose adaptive next poll time has passed
+            source_ids: Only ingest these sources
+        
         Returns:
             Dictionary with processing results
         """
         try:
             # Get all enabled sources
-            sources = self.db.query(Source).filter(Source.enabled == True).all()
+            query = self.db.query(Source).filter(Source.enabled == True)
+            if due_only:
+                now = datetime.now(timezone.utc)
+                query = query.filter(or_(Source.next_poll_at.is_(None), Source.next_poll_at <= now))
+            if source_ids is not None:
+                query = query.filter(Source.id.in_(source_ids))
+            sources = query.all()
             
             if not sources:
-                logger.info("No enabled sources found")
+                logger.info("No due sources found" if due_only else "No enabled sources found")
                 return {"processed": 0, "new_posts": 0, "errors": 0}
             
             processed = 0
             new_posts = 0
             errors = 0
             
-            for source in sources:
-                try:
-                    result = await self.ingest_source(source)
+            # Fan out fetches over one pooled session, bounded by the semaphore
+            semaphore = asyncio.Semaphore(config.fetch_concurrency)
+            
+            async def ingest_with_limit(source: Source) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self.ingest_source(source, session)
+            
+            async with create_http_session() as session:
+                results = await asyncio.gather(
+                    *(ingest_with_limit(source) for source in sources),
+                    return_exceptions=True
+                )
+            
+            for source, result in zip(sources, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to ingest source {source.name}: {str(result)}")
+                    errors += 1
+                else:
                     processed += 1
                     new_posts += result.get('new_posts', 0)
-                except Exception as e:
-                    logger.error(f"Failed to ingest source {source.name}: {str(e)}")
-                    errors += 1
             
             logger.info(f"Ingest completed: {processed} sources processed, {new_posts} new posts, {errors} errors")
             return {
@@ -69,69 +97,228 @@ class RSSIngestService:
         finally:
             self.db.close()
     
-    async def ingest_source(self, source: Source) -> Dict[str, Any]:
+    async def ingest_source(
+        self,
+        source: Source,
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> Dict[str, Any]:
         """
         Ingest content from a single source.
         
         Args:
             source: Source model instance
+            session: Shared HTTP session used for the feed request
             
         Returns:
             Dictionary with processing results
         """
         try:
-            # Build RSSHub URL
-            feed_url = build_rsshub_url(source.username)
-            logger.info(f"Fetching feed for source {source.name}: {feed_url}")
+            logger.info(f"Fetching feed for source {source.name}: {source.username}")
+            
+            # Fetch and parse feed from the healthiest mirror, conditionally
+            # if we have validators
+            feed = await fetch_rsshub_feed(
+                source.username,
+                session,
+                etag=source.etag,
+                modified=source.last_modified
+            )
+            
+            # Adaptive polling needs the next poll time even for a 304
+            scheduled = self._schedule_next_poll(source, feed)
+            
+            if feed and feed.get('status') == 304:
+                logger.info(f"Feed not modified for source {source.name}")
+                if scheduled:
+                    self.db.commit()
+                return {"new_posts": 0}
             
-            # Fetch and parse feed
-            feed = fetch_rss_feed(feed_url)
             if not feed or not feed.entries:
                 logger.warning(f"No entries found for source {source.name}")
+                if feed:
+                    self._store_validators(source, feed)
+                if feed or scheduled:
+                    self.db.commit()
                 return {"new_posts": 0}
             
-            # Get the top (most recent) entry
-            entry = feed.entries[0]
+            # Validators are committed together with the new posts, so a
+            # failed insert never turns the next fetch into a 304
+            self._store_validators(source, feed)
             
-            # Extract GUID
-            guid = extract_guid(entry)
-            logger.info(f"Extracted GUID for source {source.name}: {guid}")
-            
-            # Check if this is the same as last_guid (no new content)
-            if source.last_guid == guid:
+            # Collect every entry newer than the newest one already stored
+            entries = self._select_new_entries(source, feed.entries)
+            if not entries:
                 logger.info(f"No new content for source {source.name}")
+                self.db.commit()
                 return {"new_posts": 0}
             
-            # Extract content
-            original_text = extract_original_text(entry)
-            media_url = extract_media_url(entry)
+            rows = []
+            for entry, published_at in zip(entries, self._publication_times(entries)):
+                # Text and media were extracted in the parse worker
+                if not entry['text']:
+                    logger.warning(f"No text content found for source {source.name}: {entry['guid']}")
+                    continue
+                
+                rows.append({
+                    "source_id": source.id,
+                    "guid": entry['guid'],
+                    "original_text": entry['text'],
+                    "simhash": entry['simhash'],
+                    "media_url": entry['media_url'],
+                    "published_at": published_at,
+                    "status": "new"
+                })
             
-            if not original_text:
-                logger.warning(f"No text content found for source {source.name}")
+            if not rows:
+                self.db.commit()
                 return {"new_posts": 0}
             
-            # Create new post
-            post = Post(
-                source_id=source.id,
-                guid=guid,
-                original_text=original_text,
-                media_url=media_url,
-                status="new"
+            # One multi-row insert; guids we already have are skipped by the
+            # unique constraint instead of an IntegrityError per post
+            stmt = (
+                insert(Post)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=['source_id', 'guid'])
+                .returning(Post.guid)
             )
+            inserted = self.db.execute(stmt).scalars().all()
+            self.db.commit()
             
-            try:
-                self.db.add(post)
-                self.db.commit()
-                logger.info(f"Created new post for source {source.name}: {guid}")
-                return {"new_posts": 1}
-                
-            except IntegrityError:
-                # Post with this GUID already exists for this source
-                self.db.rollback()
-                logger.info(f"Post already exists for source {source.name}: {guid}")
-                return {"new_posts": 0}
+            skipped = len(rows) - len(inserted)
+            logger.info(
+                f"Created {len(inserted)} new posts for source {source.name}"
+                f" ({skipped} already existed)"
+            )
+            return {"new_posts": len(inserted)}
                 
         except Exception as e:
             logger.error(f"Failed to ingest source {source.name}: {str(e)}")
             self.db.rollback()
             raise
+    
+    def _store_validators(self, source: Source, feed) -> None:
+        """
+        Remember the feed's cache validators for the next conditional fetch.
+        
+        The caller is responsible for committing the session.
+        
+        Args:
+            source: Source model instance
+            feed: Parsed feed returned by fetch_rsshub_feed
+        """
+        source.etag = feed.get('etag')
+        source.last_modified = feed.get('modified')
+    
+    def _select_new_entries(self, source: Source, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Select feed entries that are newer than the source's stored posts.
+        
+        Feeds list entries newest first, so entries are taken until one
+        whose guid is already stored for the source. If none is, the whole
+        feed is new, except on a source's first poll: a source without any
+        posts only gets its newest entry, so adding a source does not
+        backfill the whole feed.
+        
+        Args:
+            source: Source model instance
+            entries: Entry dicts from fetch_rsshub_feed, newest first
+            
+        Returns:
+            List of entry dicts, oldest first
+        """
+        if not entries:
+            return []
+            
+        guids = [entry['guid'] for entry in entries]
+        known = {
+            guid for (guid,) in
+            self.db.query(Post.guid)
+            .filter(Post.source_id == source.id, Post.guid.in_(guids))
+            .all()
+        }
+        
+        selected = []
+        for entry in entries:
+            if entry['guid'] in known:
+                break
+            selected.append(entry)
+            
+        if not known and self.db.query(Post.id).filter(Post.source_id == source.id).first() is None:
+            selected = selected[:1]
+        
+        selected.reverse()
+        return selected
+    
+    def _publication_times(self, entries: List[Dict[str, Any]]) -> List[datetime]:
+        """
+        Get the publication time stored with each new entry.
+        
+        Entries without a timestamp get the ingest time. Times are made
+        strictly increasing, one microsecond apart where needed, so posts
+        sort in feed order even when entries share a timestamp.
+        
+        Args:
+            entries: New entry dicts, oldest first
+            
+        Returns:
+            List of timezone-aware datetimes, one per entry
+        """
+        now = datetime.now(timezone.utc)
+        times = []
+        for entry in entries:
+            published_at = entry['published_at'] or now
+            if times and published_at <= times[-1]:
+                published_at = times[-1] + timedelta(microseconds=1)
+            times.append(published_at)
+        return times
+    
+    def _schedule_next_poll(self, source: Source, feed) -> bool:
+        """
+        Update the source's posting rate and next poll time.
+        
+        Entries published after `last_entry_at` feed the decayed posting rate,
+        which sets the interval until the next poll. Does nothing unless
+        adaptive polling is enabled. The caller is responsible for committing
+        the session.
+        
+        Args:
+            source: Source model instance
+            feed: Parsed feed returned by fetch_rsshub_feed, or None if the fetch failed
+            
+        Returns:
+            True if the source was updated
+        """
+        if not config.polling_enabled:
+            return False
+        
+        now = datetime.now(timezone.utc)
+        
+        entry_times = []
+        for entry in (feed.entries if feed else []):
+            published_at = entry['published_at']
+            if published_at and (not source.last_entry_at or published_at > source.last_entry_at):
+                entry_times.append(min(published_at, now))
+        
+        source.post_rate = update_posting_rate(
+            source.post_rate,
+            source.rate_updated_at,
+            entry_times,
+            now,
+            config.polling_half_life_hours
+        )
+        source.rate_updated_at = now
+        if entry_times:
+            source.last_entry_at = max(entry_times)
+        
+        interval = compute_poll_interval(
+            source.post_rate,
+            config.polling_target_posts_per_poll,
+            config.polling_min_interval_minutes,
+            config.polling_max_interval_minutes
+        )
+        source.next_poll_at = now + interval
+        logger.info(
+            f"Source {source.name}: {source.post_rate:.2f} posts/hour,"
+            f" next poll in {interval.total_seconds() / 60:.0f} min"
+        )
+        return True
@@ -2,8 +2,173 @@
 Hashtag extraction utilities.
 """
 
+import logging
 import re
-from typing import List
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+")
+
+# Common news-related keywords in Russian and English
+DEFAULT_KEYWORDS = [
+    'новости', 'новость', 'события', 'событие', 'происшествие', 'происшествия',
+    'политика', 'экономика', 'спорт', 'технологии', 'технология', 'наука',
+    'здоровье', 'медицина', 'образование', 'культура', 'искусство',
+    'news', 'event', 'events', 'politics', 'economy', 'sport', 'technology',
+    'science', 'health', 'medicine', 'education', 'culture', 'art'
+]
+DEFAULT_HASHTAGS = ["#новости", "#события"]
+
+# Russian noun, adjective and verb endings, longest first
+RUSSIAN_ENDINGS = sorted("""
+    иями ями ами иях иям ией ого его ому ему ыми ими ях ах ов ев ей ий ый ой ая яя
+    ое ее ые ие ии ию ия ье ья ью ьи ам ям ом ем ую юю ть ти ет ит ут ют ат ят
+    ы и а я о е у ю ь й
+""".split(), key=len, reverse=True)
+MIN_STEM_LENGTH = 3
+
+
+@lru_cache(maxsize=100000)
+def stem(word: str) -> str:
+    """
+    Reduce a lowercase word to a crude stem so inflected forms match.
+    
+    Russian words lose their longest known ending, English words their
+    plural suffix; stems keep at least MIN_STEM_LENGTH characters.
+    
+    Args:
+        word: Lowercase word
+        
+    Returns:
+        Stem
+    """
+    if word.isascii():
+        if word.endswith("ies") and len(word) > MIN_STEM_LENGTH + 2:
+            return word[:-3] + "y"
+        if word.endswith("s") and not word.endswith("ss") and len(word) > MIN_STEM_LENGTH + 1:
+            return word[:-1]
+        return word
+        
+    for ending in RUSSIAN_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+            return word[:-len(ending)]
+    return word
+
+
+def load_vocabulary(path: str) -> Dict[str, str]:
+    """
+    Load keywords from a vocabulary file.
+    
+    Each line holds a keyword or two-word phrase, optionally followed by
+    "= hashtag" to tag it differently; empty lines and lines starting
+    with "#" are skipped.
+    
+    Args:
+        path: Vocabulary file path
+        
+    Returns:
+        Dictionary mapping keywords to hashtags
+    """
+    vocabulary = {}
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        keyword, _, tag = line.partition("=")
+        keyword = keyword.strip().lower()
+        vocabulary[keyword] = tag.strip() or keyword
+    return vocabulary
+
+
+class HashtagEngine:
+    """
+    Keyword-based hashtag extractor.
+    
+    Keywords are stemmed once into a lookup table, so extraction is a
+    single pass of dictionary lookups over the text's words and word pairs.
+    """
+    
+    def __init__(
+        self,
+        keywords: Optional[Dict[str, str]] = None,
+        max_hashtags: int = 5,
+        default_hashtags: Iterable[str] = DEFAULT_HASHTAGS
+    ):
+        if keywords is None:
+            keywords = {keyword: keyword for keyword in DEFAULT_KEYWORDS}
+        self.max_hashtags = max_hashtags
+        self.default_hashtags = list(default_hashtags)
+        
+        # Keywords and two-word phrases are keyed by their space-joined
+        # stems; the first keyword of a stem decides its hashtag
+        self.tags: Dict[str, str] = {}
+        for keyword, tag in keywords.items():
+            words = WORD_RE.findall(keyword.lower())
+            if words:
+                tag = "_".join(tag.lstrip("#").split())
+                self.tags.setdefault(" ".join(stem(word) for word in words), f"#{tag}")
+    
+    def extract(self, text: str) -> List[str]:
+        """
+        Extract hashtags from text.
+        
+        Args:
+            text: Text to extract hashtags from
+            
+        Returns:
+            List of hashtags in order of first mention, or the defaults if none match
+        """
+        hashtags = []
+        words = WORD_RE.findall(text.lower())
+        stems = [stem(word) for word in words]
+        for index, word_stem in enumerate(stems):
+            tag = None
+            if index + 1 < len(stems):
+                tag = self.tags.get(f"{word_stem} {stems[index + 1]}")
+            if tag is None and len(words[index]) > 3:
+                tag = self.tags.get(word_stem)
+            if tag and tag not in hashtags:
+                hashtags.append(tag)
+                if len(hashtags) >= self.max_hashtags:
+                    break
+                    
+        return hashtags or self.default_hashtags[:self.max_hashtags]
+    
+    def extract_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """
+        Extract hashtags from many texts.
+        
+        Args:
+            texts: Texts to extract hashtags from
+            
+        Returns:
+            List of hashtag lists, one per text
+        """
+        return [self.extract(text) for text in texts]
+
+
+_engine: Optional[HashtagEngine] = None
+
+
+def get_hashtag_engine() -> HashtagEngine:
+    """
+    Get the shared engine built from the hashtags config.
+    
+    Returns:
+        HashtagEngine instance
+    """
+    global _engine
+    if _engine is None:
+        keywords = None
+        if config.hashtags_vocabulary_file:
+            keywords = load_vocabulary(config.hashtags_vocabulary_file)
+            logger.info(f"Loaded {len(keywords)} hashtag keywords from {config.hashtags_vocabulary_file}")
+        _engine = HashtagEngine(keywords, max_hashtags=config.hashtags_max)
+    return _engine
 
 
 def extract_hashtags(text: str) -> List[str]:
@@ -16,30 +181,17 @@ def extract_hashtags(text: str) -> List[str]:
     Returns:
         List of hashtags
     """
-    hashtags = []
-    
-    # Simple hashtag extraction - look for words that could be hashtags
-    words = text.lower().split()
-    
-    # Common news-related keywords in Russian and English
-    news_keywords = [
-        'новости', 'новость', 'события', 'событие', 'происшествие', 'происшествия',
-        'политика', 'экономика', 'спорт', 'технологии', 'технология', 'наука',
-        'здоровье', 'медицина', 'образование', 'культура', 'искусство',
-        'news', 'event', 'events', 'politics', 'economy', 'sport', 'technology',
-        'science', 'health', 'medicine', 'education', 'culture', 'art'
-    ]
-    
-    # Extract relevant keywords
-    for word in words:
-        # Clean word (remove punctuation)
-        clean_word = ''.join(c for c in word if c.isalnum())
-        if len(clean_word) > 3 and clean_word in news_keywords:
-            hashtags.append(f"#{clean_word}")
-    
-    # Add some generic hashtags if none found
-    if not hashtags:
-        hashtags = ["#новости", "#события"]
-    
-    # Limit to 5 hashtags
-    return hashtags[:5]
+    return get_hashtag_engine().extract(text)
+
+
+def extract_hashtags_many(texts: Iterable[str]) -> List[List[str]]:
+    """
+    Extract hashtags from many texts in one call.
+    
+    Args:
+        texts: Texts to extract hashtags from
+        
+    Returns:
+        List of hashtag lists, one per text
+    """
+    return get_hashtag_engine().extract_many(texts)
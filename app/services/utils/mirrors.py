@@ -0,0 +1,119 @@
+"""
+RSSHub mirror pool.
+Tracks per-mirror health and picks the best mirror for each request.
+"""
+
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class MirrorStats:
+    """Health statistics of a single mirror."""
+    
+    def __init__(self):
+        self.latency: Optional[float] = None  # EWMA of successful request latency, seconds
+        self.error_rate: float = 0.0  # EWMA of failures, 0..1
+        self.consecutive_failures: int = 0
+        self.ejected_until: float = 0.0
+        self.requests: int = 0
+        self.failures: int = 0
+
+
+class MirrorPool:
+    """
+    Health-aware pool of RSSHub base URLs.
+    
+    Each mirror keeps an exponentially-weighted latency and error rate.
+    Requests go to the available mirror with the lowest score; mirrors that
+    fail repeatedly are ejected for a cool-down period.
+    """
+    
+    def __init__(
+        self,
+        bases: List[str],
+        cooldown_seconds: float = 300,
+        failures_before_eject: int = 2,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if not bases:
+            raise ValueError("MirrorPool needs at least one RSSHub base URL")
+            
+        self.bases = [base.rstrip('/') for base in bases]
+        self.cooldown_seconds = cooldown_seconds
+        self.failures_before_eject = failures_before_eject
+        self.smoothing = smoothing
+        self.clock = clock
+        self.stats: Dict[str, MirrorStats] = {base: MirrorStats() for base in self.bases}
+    
+    def __len__(self) -> int:
+        return len(self.bases)
+    
+    def choose(self, exclude: Iterable[str] = ()) -> str:
+        """
+        Choose the healthiest mirror.
+        
+        Mirrors without latency data score zero, so every mirror gets
+        tried. If all candidates are ejected, the one whose cool-down ends
+        first is returned.
+        
+        Args:
+            exclude: Mirrors already tried for this request
+            
+        Returns:
+            Mirror base URL
+        """
+        excluded = set(exclude)
+        candidates = [base for base in self.bases if base not in excluded] or self.bases
+        
+        now = self.clock()
+        available = [base for base in candidates if self.stats[base].ejected_until <= now]
+        if not available:
+            return min(candidates, key=lambda base: self.stats[base].ejected_until)
+            
+        return min(available, key=self._score)
+    
+    def record_success(self, base: str, latency: float) -> None:
+        """
+        Record a successful request.
+        
+        Args:
+            base: Mirror base URL
+            latency: Request latency in seconds
+        """
+        stats = self.stats[base]
+        stats.requests += 1
+        stats.consecutive_failures = 0
+        stats.error_rate *= 1 - self.smoothing
+        
+        if stats.latency is None:
+            stats.latency = latency
+        else:
+            stats.latency += self.smoothing * (latency - stats.latency)
+    
+    def record_failure(self, base: str) -> None:
+        """
+        Record a failed request (timeout, connection error or 5xx).
+        
+        Args:
+            base: Mirror base URL
+        """
+        stats = self.stats[base]
+        stats.requests += 1
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        stats.error_rate += self.smoothing * (1 - stats.error_rate)
+        
+        if stats.consecutive_failures >= self.failures_before_eject:
+            stats.ejected_until = self.clock() + self.cooldown_seconds
+            stats.consecutive_failures = 0
+    
+    def is_ejected(self, base: str) -> bool:
+        """Check whether a mirror is in its cool-down period."""
+        return self.stats[base].ejected_until > self.clock()
+    
+    def _score(self, base: str) -> float:
+        """Lower is better: latency inflated by the error rate."""
+        stats = self.stats[base]
+        latency = stats.latency or 0.0
+        return latency * (1 + 10 * stats.error_rate) + stats.error_rate
@@ -0,0 +1,93 @@
+"""
+Adaptive polling utilities.
+Estimates a per-source posting rate and derives the next poll time from it.
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+
+def decay_rate(rate: float, elapsed_hours: float, half_life_hours: float) -> float:
+    """
+    Decay a posting rate over elapsed time.
+    
+    Args:
+        rate: Posting rate in posts per hour
+        elapsed_hours: Hours since the rate was last updated
+        half_life_hours: Hours after which an observation weighs half as much
+        
+    Returns:
+        Decayed posting rate
+    """
+    if elapsed_hours <= 0:
+        return rate
+    return rate * math.exp(-math.log(2) * elapsed_hours / half_life_hours)
+
+
+def update_posting_rate(
+    rate: Optional[float],
+    rate_updated_at: Optional[datetime],
+    entry_times: Iterable[datetime],
+    now: datetime,
+    half_life_hours: float
+) -> float:
+    """
+    Update an exponentially-decayed posting rate with newly seen entries.
+    
+    Each entry contributes lambda * exp(-lambda * age), where lambda is the
+    decay constant, so the rate is a recency-weighted count of posts per hour
+    that converges to the true rate for a steadily posting source.
+    
+    Args:
+        rate: Current posting rate in posts per hour (None if unknown)
+        rate_updated_at: When the rate was last updated
+        entry_times: Publication times of entries not seen before
+        now: Current time
+        half_life_hours: Half-life of an observation in hours
+        
+    Returns:
+        Posting rate in posts per hour as of `now`
+    """
+    decay = math.log(2) / half_life_hours
+    
+    current = 0.0
+    if rate and rate_updated_at:
+        elapsed_hours = (now - rate_updated_at).total_seconds() / 3600
+        current = decay_rate(rate, elapsed_hours, half_life_hours)
+        
+    for entry_time in entry_times:
+        age_hours = max((now - entry_time).total_seconds() / 3600, 0.0)
+        current += decay * math.exp(-decay * age_hours)
+        
+    return current
+
+
+def compute_poll_interval(
+    rate: float,
+    target_posts_per_poll: float,
+    min_interval_minutes: float,
+    max_interval_minutes: float
+) -> timedelta:
+    """
+    Compute how long to wait before polling a source again.
+    
+    The interval is chosen so that about `target_posts_per_poll` new posts
+    are expected per poll, clamped to the configured bounds.
+    
+    Args:
+        rate: Posting rate in posts per hour
+        target_posts_per_poll: Expected number of new posts per poll
+        min_interval_minutes: Lower bound for the interval
+        max_interval_minutes: Upper bound for the interval
+        
+    Returns:
+        Interval until the next poll
+    """
+    if rate <= 0:
+        minutes = max_interval_minutes
+    else:
+        minutes = target_posts_per_poll / rate * 60
+        
+    minutes = min(max(minutes, min_interval_minutes), max_interval_minutes)
+    return timedelta(minutes=minutes)
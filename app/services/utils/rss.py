@@ -2,53 +2,378 @@
 RSS fetching and parsing utilities.
 """
 
-import requests
+import asyncio
+import calendar
+import aiohttp
 import feedparser
 import hashlib
 import logging
-from typing import Optional, Dict, Any
-from bs4 import BeautifulSoup
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+import lxml.html
+from lxml import etree
 from app.config import config
+from app.services.utils.mirrors import MirrorPool
+from app.services.utils.simhash import compute_simhash
 
 logger = logging.getLogger(__name__)
 
+# Process pool for CPU-bound feed parsing, created on first use
+_parse_executor: Optional[ProcessPoolExecutor] = None
 
-def fetch_rss_feed(feed_url: str) -> Optional[feedparser.FeedParserDict]:
+# RSSHub mirror health is tracked for the lifetime of the process
+_mirror_pool: Optional[MirrorPool] = None
+
+# Streaming download settings
+_CHUNK_SIZE = 64 * 1024
+_ENTRY_END_RE = re.compile(rb'</(?:item|entry)\s*>', re.IGNORECASE)
+
+
+def create_http_session() -> aiohttp.ClientSession:
     """
-    Fetch and parse RSS feed from URL.
+    Create a pooled keep-alive HTTP session for feed fetching.
+    
+    The connector caps the total number of open connections and the number
+    of connections per host, so one session can be shared by all concurrent
+    fetches of an ingest run.
+    
+    Returns:
+        aiohttp client session (must be closed by the caller)
+    """
+    connector = aiohttp.TCPConnector(
+        limit=config.fetch_concurrency,
+        limit_per_host=config.fetch_per_host_limit
+    )
+    timeout = aiohttp.ClientTimeout(total=config.fetch_timeout)
+    headers = {
+        'User-Agent': config.user_agent
+    }
+    
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers=headers
+    )
+
+
+def get_parse_executor() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the shared process pool used for feed parsing.
+    
+    Workers are started with the "spawn" method so they never inherit the
+    event loop or open connections of the serving process.
+    
+    Returns:
+        Process pool, or None if `fetch.parse_workers` is 0 (parse inline)
+    """
+    global _parse_executor
+    
+    if config.fetch_parse_workers <= 0:
+        return None
+    
+    if _parse_executor is None:
+        _parse_executor = ProcessPoolExecutor(
+            max_workers=config.fetch_parse_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    
+    return _parse_executor
+
+
+def _reset_parse_executor(broken: ProcessPoolExecutor) -> None:
+    """
+    Drop a parse pool that a crashed worker left broken.
+    
+    A broken pool rejects every later task, so the next get_parse_executor
+    call starts a new one. Concurrent parses that hit the same broken pool
+    reset it only once.
+    
+    Args:
+        broken: The pool that raised BrokenProcessPool
+    """
+    global _parse_executor
+    
+    if _parse_executor is broken:
+        _parse_executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+def get_mirror_pool() -> MirrorPool:
+    """
+    Get the shared RSSHub mirror pool built from config.
+    
+    Returns:
+        Mirror pool over `rsshub_base`
+    """
+    global _mirror_pool
+    
+    if _mirror_pool is None:
+        _mirror_pool = MirrorPool(
+            config.rsshub_bases,
+            cooldown_seconds=config.rsshub_cooldown_seconds,
+            failures_before_eject=config.rsshub_failures_before_eject
+        )
+    
+    return _mirror_pool
+
+
+def shutdown_parse_executor() -> None:
+    """Shut down the feed parsing process pool if it was started."""
+    global _parse_executor
+    
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=True)
+        _parse_executor = None
+
+
+async def _read_capped(response: aiohttp.ClientResponse, feed_url: str) -> bytes:
+    """
+    Stream a feed body, stopping at the byte cap or after enough entries.
+    
+    Closing </item> and </entry> tags are counted while streaming, so the
+    download stops as soon as `fetch.max_entries` complete entries arrived.
+    On the byte cap the body is cut after the last complete entry. Feeds
+    list newest entries first, so the newest entries are always kept.
+    
+    Args:
+        response: Response with an unread body
+        feed_url: URL of the RSS feed (for logging)
+        
+    Returns:
+        Feed document, possibly truncated
+    """
+    max_bytes = config.fetch_max_bytes
+    max_entries = config.fetch_max_entries
+    
+    buffer = bytearray()
+    entries = 0
+    last_entry_end = 0
+    scan_from = 0
+    
+    async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+        buffer += chunk[:max_bytes - len(buffer)]
+        
+        for match in _ENTRY_END_RE.finditer(buffer, scan_from):
+            entries += 1
+            last_entry_end = match.end()
+            if entries >= max_entries:
+                logger.debug(f"Stopped reading {feed_url} after {entries} entries")
+                return bytes(buffer[:last_entry_end])
+        
+        # Closing tags may straddle chunks, so rescan the tail next time
+        scan_from = max(last_entry_end, len(buffer) - 16)
+        
+        if len(buffer) >= max_bytes:
+            logger.warning(f"Feed {feed_url} exceeds {max_bytes} bytes, keeping {entries} complete entries")
+            return bytes(buffer[:last_entry_end] if last_entry_end else buffer)
+    
+    return bytes(buffer)
+
+
+async def _download_feed(
+    session: aiohttp.ClientSession,
+    feed_url: str,
+    etag: Optional[str],
+    modified: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Download a feed document, conditionally if validators are given.
     
     Args:
+        session: HTTP session
         feed_url: URL of the RSS feed
+        etag: ETag from the previous response, sent as If-None-Match
+        modified: Last-Modified from the previous response, sent as If-Modified-Since
         
     Returns:
-        Parsed feed object or None if failed
+        Dictionary with status, content, etag and modified
+        
+    Raises:
+        aiohttp.ClientError: On connection errors and non-2xx responses
+        asyncio.TimeoutError: When the request times out
     """
-    try:
-        headers = {
-            'User-Agent': config.user_agent
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if modified:
+        headers['If-Modified-Since'] = modified
+    
+    async with session.get(feed_url, headers=headers) as response:
+        if response.status == 304:
+            return {"status": 304, "content": None, "etag": etag, "modified": modified}
+        
+        response.raise_for_status()
+        return {
+            "status": response.status,
+            "content": await _read_capped(response, feed_url),
+            "etag": response.headers.get('ETag'),
+            "modified": response.headers.get('Last-Modified')
         }
+
+
+async def _build_feed(feed_url: str, downloaded: Dict[str, Any]) -> feedparser.FeedParserDict:
+    """
+    Parse a downloaded feed document off the event loop.
+    
+    Args:
+        feed_url: URL the document came from (for logging)
+        downloaded: Result of _download_feed
         
-        response = requests.get(
-            feed_url,
-            headers=headers,
-            timeout=config.fetch_timeout
+    Returns:
+        Feed with status, etag, modified and entry dicts
+    """
+    if downloaded['status'] == 304:
+        return feedparser.FeedParserDict(
+            status=304,
+            entries=[],
+            etag=downloaded['etag'],
+            modified=downloaded['modified']
         )
-        response.raise_for_status()
+    
+    max_entries = config.fetch_max_entries
+    executor = get_parse_executor()
+    if executor is None:
+        parsed = parse_feed(downloaded['content'], max_entries)
+    else:
+        loop = asyncio.get_running_loop()
+        try:
+            parsed = await loop.run_in_executor(executor, parse_feed, downloaded['content'], max_entries)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); replace the pool and retry once
+            logger.warning(f"Feed parse worker crashed while parsing {feed_url}, restarting the pool")
+            _reset_parse_executor(executor)
+            parsed = await loop.run_in_executor(
+                get_parse_executor(), parse_feed, downloaded['content'], max_entries
+            )
+    
+    if parsed['bozo']:
+        logger.warning(f"Feed parsing warnings for {feed_url}: {parsed['bozo_exception']}")
+    
+    return feedparser.FeedParserDict(
+        status=downloaded['status'],
+        entries=parsed['entries'],
+        etag=downloaded['etag'],
+        modified=downloaded['modified']
+    )
+
+
+async def fetch_rss_feed(
+    feed_url: str,
+    session: Optional[aiohttp.ClientSession] = None,
+    etag: Optional[str] = None,
+    modified: Optional[str] = None
+) -> Optional[feedparser.FeedParserDict]:
+    """
+    Fetch and parse RSS feed from URL.
+    
+    When validators from a previous fetch are given, the request is made
+    conditional. Like feedparser's own HTTP handling, the result carries
+    `status`, `etag` and `modified`; a 304 result has no entries and the
+    body is never parsed.
+    
+    Parsing and entry extraction run in the parse process pool, so the
+    entries are plain dicts as returned by `entry_to_dict`.
+    
+    Args:
+        feed_url: URL of the RSS feed
+        session: Shared HTTP session; a temporary one is created if omitted
+        etag: ETag from the previous response, sent as If-None-Match
+        modified: Last-Modified from the previous response, sent as If-Modified-Since
         
-        # Parse the feed
-        feed = feedparser.parse(response.content)
+    Returns:
+        Parsed feed object or None if failed
+    """
+    owns_session = session is None
+    if owns_session:
+        session = create_http_session()
+    
+    try:
+        downloaded = await _download_feed(session, feed_url, etag, modified)
+        return await _build_feed(feed_url, downloaded)
         
-        if feed.bozo:
-            logger.warning(f"Feed parsing warnings for {feed_url}: {feed.bozo_exception}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Failed to fetch RSS feed {feed_url}: {str(e) or type(e).__name__}")
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error parsing RSS feed {feed_url}: {str(e)}")
+        return None
+    finally:
+        if owns_session:
+            await session.close()
+
+
+async def fetch_rsshub_feed(
+    username: str,
+    session: Optional[aiohttp.ClientSession] = None,
+    etag: Optional[str] = None,
+    modified: Optional[str] = None,
+    pool: Optional[MirrorPool] = None
+) -> Optional[feedparser.FeedParserDict]:
+    """
+    Fetch and parse a Telegram channel feed from the RSSHub mirror pool.
+    
+    Each attempt goes to the healthiest mirror not tried yet. Timeouts,
+    connection errors, 429 and 5xx responses count against the mirror and
+    are retried on another one, up to `rsshub.max_attempts`. Other HTTP
+    errors (e.g. 404 for an unknown channel) are not retried.
+    
+    Args:
+        username: Telegram username (without @)
+        session: Shared HTTP session; a temporary one is created if omitted
+        etag: ETag from the previous response, sent as If-None-Match
+        modified: Last-Modified from the previous response, sent as If-Modified-Since
+        pool: Mirror pool; the shared pool from config is used if omitted
         
-        return feed
+    Returns:
+        Parsed feed object (see fetch_rss_feed) or None if failed
+    """
+    pool = pool or get_mirror_pool()
+    owns_session = session is None
+    if owns_session:
+        session = create_http_session()
+    
+    tried = []
+    try:
+        for _ in range(min(len(pool), config.rsshub_max_attempts)):
+            base = pool.choose(exclude=tried)
+            tried.append(base)
+            feed_url = build_rsshub_url(username, base)
+            started = time.monotonic()
+            
+            try:
+                downloaded = await _download_feed(session, feed_url, etag, modified)
+            except aiohttp.ClientResponseError as e:
+                if e.status < 500 and e.status != 429:
+                    # The mirror answered; the request itself is bad
+                    pool.record_success(base, time.monotonic() - started)
+                    logger.error(f"Failed to fetch RSS feed {feed_url}: {str(e)}")
+                    return None
+                pool.record_failure(base)
+                logger.warning(f"RSSHub mirror {base} failed for {username}: {str(e)}")
+                continue
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                pool.record_failure(base)
+                logger.warning(f"RSSHub mirror {base} failed for {username}: {str(e) or type(e).__name__}")
+                continue
+            
+            pool.record_success(base, time.monotonic() - started)
+            return await _build_feed(feed_url, downloaded)
         
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to fetch RSS feed {feed_url}: {str(e)}")
+        logger.error(f"Failed to fetch RSS feed for {username} from mirrors: {', '.join(tried)}")
         return None
+        
     except Exception as e:
-        logger.error(f"Unexpected error parsing RSS feed {feed_url}: {str(e)}")
+        logger.error(f"Unexpected error parsing RSS feed for {username}: {str(e)}")
         return None
+    finally:
+        if owns_session:
+            await session.close()
 
 
 def extract_guid(entry: feedparser.FeedParserDict) -> str:
@@ -80,37 +405,169 @@ def extract_guid(entry: feedparser.FeedParserDict) -> str:
     return hashlib.md5(content.encode('utf-8')).hexdigest()
 
 
-def extract_original_text(entry: feedparser.FeedParserDict) -> str:
+def extract_published_at(entry: feedparser.FeedParserDict) -> Optional[datetime]:
     """
-    Extract original text from RSS entry.
+    Extract publication time of RSS entry.
     
-    Priority: content[0].value (HTML stripped) -> summary -> title
+    Priority: published_parsed -> updated_parsed
     
     Args:
         entry: RSS entry object
         
+    Returns:
+        Timezone-aware UTC datetime or None if the entry has no timestamp
+    """
+    parsed = getattr(entry, 'published_parsed', None) or getattr(entry, 'updated_parsed', None)
+    if not parsed:
+        return None
+    
+    return datetime.fromtimestamp(calendar.timegm(parsed), tz=timezone.utc)
+
+
+@dataclass
+class EntryContent:
+    """Text, media and links extracted from a single RSS entry."""
+    text: str = ""
+    media_urls: List[str] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    
+    @property
+    def media_url(self) -> Optional[str]:
+        """Primary media URL (first image, else first video)."""
+        return self.media_urls[0] if self.media_urls else None
+
+
+def _parse_html(markup: str) -> Optional[lxml.html.HtmlElement]:
+    """
+    Parse an HTML fragment with lxml.
+    
+    Args:
+        markup: HTML markup
+        
+    Returns:
+        Root element or None if the markup is empty or unparsable
+    """
+    if not markup or not markup.strip():
+        return None
+    
+    try:
+        root = lxml.html.fromstring(markup)
+    except (etree.ParserError, ValueError):
+        return None
+    
+    # Script and style bodies are not readable text
+    etree.strip_elements(root, 'script', 'style', with_tail=False)
+    return root
+
+
+def _collect_content(root: lxml.html.HtmlElement, content: EntryContent) -> None:
+    """
+    Collect text, media and links from a parsed tree in a single walk.
+    
+    Args:
+        root: Parsed HTML root element
+        content: Result object to fill in
+    """
+    images = []
+    videos = []
+    
+    for element in root.iter('img', 'video', 'source', 'a'):
+        tag = element.tag
+        if tag == 'img':
+            if element.get('src'):
+                images.append(element.get('src'))
+        elif tag == 'video':
+            if element.get('src'):
+                videos.append(element.get('src'))
+        elif tag == 'source':
+            parent = element.getparent()
+            if parent is not None and parent.tag == 'video' and element.get('src'):
+                videos.append(element.get('src'))
+        elif element.get('href'):
+            content.links.append(element.get('href'))
+    
+    # Images first, matching the historical media priority
+    for url in images + videos:
+        if url not in content.media_urls:
+            content.media_urls.append(url)
+
+
+def _html_text(root: lxml.html.HtmlElement) -> str:
+    """
+    Get stripped text of a parsed tree.
+    
+    Mirrors BeautifulSoup's get_text(strip=True): every text node is
+    stripped and the non-empty pieces are concatenated.
+    
+    Args:
+        root: Parsed HTML root element
+        
     Returns:
         Extracted text
     """
-    # Try content[0].value (HTML stripped)
+    return ''.join(piece.strip() for piece in root.itertext() if piece.strip())
+
+
+def extract_entry_content(entry: feedparser.FeedParserDict) -> EntryContent:
+    """
+    Extract text, media URLs and links from RSS entry in one pass.
+    
+    Each HTML body is parsed at most once. Text priority:
+    content[0].value (HTML stripped) -> summary -> title. Media are taken
+    from the content, and from the summary only when the content has none.
+    
+    Args:
+        entry: RSS entry object
+        
+    Returns:
+        EntryContent with text, media URLs and links
+    """
+    content = EntryContent()
+    has_content = False
+    
+    # Try content[0].value
     if hasattr(entry, 'content') and entry.content:
         try:
             content_html = entry.content[0].value
-            soup = BeautifulSoup(content_html, 'html.parser')
-            return soup.get_text(strip=True)
+            has_content = True
         except (IndexError, AttributeError):
-            pass
+            content_html = None
+        
+        root = _parse_html(content_html)
+        if root is not None:
+            content.text = _html_text(root)
+            _collect_content(root, content)
     
-    # Try summary
-    if hasattr(entry, 'summary') and entry.summary:
-        soup = BeautifulSoup(entry.summary, 'html.parser')
-        return soup.get_text(strip=True)
+    # Try summary, unless the content already gave us text and media
+    has_summary = bool(getattr(entry, 'summary', None))
+    if has_summary and (not has_content or not content.media_urls):
+        root = _parse_html(entry.summary)
+        if root is not None:
+            if not has_content:
+                content.text = _html_text(root)
+            _collect_content(root, content)
     
     # Fallback to title
-    if hasattr(entry, 'title') and entry.title:
-        return entry.title
+    if not has_content and not has_summary:
+        if hasattr(entry, 'title') and entry.title:
+            content.text = entry.title
     
-    return ""
+    return content
+
+
+def extract_original_text(entry: feedparser.FeedParserDict) -> str:
+    """
+    Extract original text from RSS entry.
+    
+    Priority: content[0].value (HTML stripped) -> summary -> title
+    
+    Args:
+        entry: RSS entry object
+        
+    Returns:
+        Extracted text
+    """
+    return extract_entry_content(entry).text
 
 
 def extract_media_url(entry: feedparser.FeedParserDict) -> Optional[str]:
@@ -123,49 +580,65 @@ def extract_media_url(entry: feedparser.FeedParserDict) -> Optional[str]:
     Returns:
         Media URL or None
     """
-    # Check for media in content
-    if hasattr(entry, 'content') and entry.content:
-        try:
-            content_html = entry.content[0].value
-            soup = BeautifulSoup(content_html, 'html.parser')
-            
-            # Look for images first
-            img_tag = soup.find('img')
-            if img_tag and img_tag.get('src'):
-                return img_tag['src']
-            
-            # Look for videos
-            video_tag = soup.find('video')
-            if video_tag and video_tag.get('src'):
-                return video_tag['src']
-                
-        except (IndexError, AttributeError):
-            pass
+    return extract_entry_content(entry).media_url
+
+
+def entry_to_dict(entry: feedparser.FeedParserDict) -> Dict[str, Any]:
+    """
+    Extract everything ingest needs from RSS entry into a plain dict.
     
-    # Check for media in summary
-    if hasattr(entry, 'summary') and entry.summary:
-        try:
-            soup = BeautifulSoup(entry.summary, 'html.parser')
-            
-            # Look for images
-            img_tag = soup.find('img')
-            if img_tag and img_tag.get('src'):
-                return img_tag['src']
-                
-        except AttributeError:
-            pass
+    Args:
+        entry: RSS entry object
+        
+    Returns:
+        Dictionary with guid, published_at, text, simhash, media_url, media_urls and links
+    """
+    content = extract_entry_content(entry)
+    
+    return {
+        "guid": extract_guid(entry),
+        "published_at": extract_published_at(entry),
+        "text": content.text,
+        "simhash": compute_simhash(content.text) if content.text else None,
+        "media_url": content.media_url,
+        "media_urls": content.media_urls,
+        "links": content.links
+    }
+
+
+def parse_feed(content: bytes, max_entries: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Parse a feed document and extract its entries.
+    
+    Runs in a worker process, so both input and result are picklable.
+    
+    Args:
+        content: Raw feed document
+        max_entries: Only extract this many leading entries
+        
+    Returns:
+        Dictionary with bozo flag, bozo exception text and entry dicts (newest first)
+    """
+    feed = feedparser.parse(content)
+    entries = feed.entries[:max_entries] if max_entries else feed.entries
     
-    return None
+    return {
+        "bozo": bool(feed.bozo),
+        "bozo_exception": str(feed.get('bozo_exception', '')),
+        "entries": [entry_to_dict(entry) for entry in entries]
+    }
 
 
-def build_rsshub_url(username: str) -> str:
+def build_rsshub_url(username: str, base: Optional[str] = None) -> str:
     """
     Build RSSHub URL for Telegram channel.
     
     Args:
         username: Telegram username (without @)
+        base: RSSHub base URL; the first configured mirror if omitted
         
     Returns:
         RSSHub URL
     """
-    return f"{config.rsshub_base}/telegram/channel/{username}?showContent"
+    base = (base or config.rsshub_base).rstrip('/')
+    return f"{base}/telegram/channel/{username}?showContent"
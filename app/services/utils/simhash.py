@@ -0,0 +1,131 @@
+"""
+SimHash fingerprints for near-duplicate detection.
+"""
+
+import hashlib
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+FINGERPRINT_BITS = 64
+_MASK = (1 << FINGERPRINT_BITS) - 1
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _features(text: str) -> List[str]:
+    """
+    Split text into fingerprint features: words and adjacent word pairs.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        List of features
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < 2:
+        return words
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def compute_simhash(text: str) -> int:
+    """
+    Compute a 64-bit SimHash of text.
+    
+    The value is returned as a signed 64-bit integer so it fits a Postgres
+    BIGINT column; hamming_distance works on either representation.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Signed 64-bit fingerprint (0 for text without words)
+    """
+    weights = [0] * FINGERPRINT_BITS
+    
+    for feature, count in Counter(_features(text)).items():
+        digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'big')
+        for bit in range(FINGERPRINT_BITS):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+                
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+            
+    # Store as signed BIGINT
+    if fingerprint >= 1 << (FINGERPRINT_BITS - 1):
+        fingerprint -= 1 << FINGERPRINT_BITS
+    return fingerprint
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """
+    Count differing bits between two fingerprints.
+    
+    Args:
+        first: Fingerprint
+        second: Fingerprint
+        
+    Returns:
+        Number of differing bits
+    """
+    return ((first ^ second) & _MASK).bit_count()
+
+
+class SimHashIndex:
+    """
+    Fingerprints indexed for Hamming-distance lookups.
+    
+    Fingerprints are split into max_distance + 1 bands of bits. Two
+    fingerprints at most max_distance bits apart agree on at least one
+    band, so a lookup only compares the fingerprints sharing a band with
+    it instead of all of them.
+    """
+    
+    def __init__(self, max_distance: int):
+        self.max_distance = max_distance
+        count = min(max_distance + 1, FINGERPRINT_BITS)
+        bounds = [FINGERPRINT_BITS * band // count for band in range(count + 1)]
+        self.bands = [(start, (1 << (end - start)) - 1) for start, end in zip(bounds, bounds[1:])]
+        self.tables: List[Dict[int, List[Tuple[int, Any]]]] = [{} for _ in self.bands]
+    
+    def add(self, fingerprint: int, item: Any) -> None:
+        """
+        Add a fingerprint to the index.
+        
+        Args:
+            fingerprint: Fingerprint from compute_simhash
+            item: Value returned by search for this fingerprint
+        """
+        entry = (fingerprint, item)
+        for table, (shift, mask) in zip(self.tables, self.bands):
+            table.setdefault(fingerprint >> shift & mask, []).append(entry)
+    
+    def search(self, fingerprint: int) -> List[Tuple[int, Any]]:
+        """
+        Find indexed fingerprints within max_distance of a fingerprint.
+        
+        Args:
+            fingerprint: Fingerprint from compute_simhash
+            
+        Returns:
+            List of (distance, item) tuples, closest first
+        """
+        seen = set()
+        matches = []
+        for table, (shift, mask) in zip(self.tables, self.bands):
+            for entry in table.get(fingerprint >> shift & mask, []):
+                if id(entry) in seen:
+                    continue
+                seen.add(id(entry))
+                distance = hamming_distance(fingerprint, entry[0])
+                if distance <= self.max_distance:
+                    matches.append((distance, entry[1]))
+                    
+        matches.sort(key=lambda match: match[0])
+        return matches
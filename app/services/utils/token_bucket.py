@@ -0,0 +1,64 @@
+"""
+Token bucket rate limiting.
+Shared by the NLP provider quotas and Telegram flood control.
+"""
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate."""
+    
+    def __init__(
+        self,
+        per_minute: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated_at = clock()
+    
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def try_acquire(self, amount: float) -> float:
+        """
+        Take tokens from the bucket if available.
+        
+        Requests larger than the capacity are clamped to it, so they wait
+        for a full bucket instead of forever.
+        
+        Args:
+            amount: Number of tokens
+            
+        Returns:
+            0 if the tokens were taken, otherwise seconds to wait before retrying
+        """
+        amount = min(amount, self.capacity)
+        self._refill()
+        
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+            
+        return (amount - self.tokens) / self.rate
+    
+    async def acquire(self, amount: float = 1) -> None:
+        """
+        Wait until tokens are available and take them.
+        
+        Args:
+            amount: Number of tokens
+        """
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
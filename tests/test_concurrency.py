@@ -0,0 +1,178 @@
+"""
+Tests for adaptive concurrency and the circuit breaker.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+import openai
+from app.config import config
+from app.services.nlp_transform.concurrency import (
+    AIMDLimiter, CircuitBreaker, is_provider_failure, overload_listener
+)
+from app.services.nlp_transform.providers.openai_provider import OpenAIProvider
+from app.services.nlp_transform.service import NLPTransformService
+
+
+class StatusError(Exception):
+    """Error carrying an HTTP status code like the OpenAI client's."""
+    
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_is_provider_failure():
+    """Test that only overload and outage errors count as provider failures."""
+    assert is_provider_failure(StatusError(429))
+    assert is_provider_failure(StatusError(503))
+    assert is_provider_failure(ConnectionError())
+    assert is_provider_failure(asyncio.TimeoutError())
+    assert not is_provider_failure(StatusError(400))
+    assert not is_provider_failure(ValueError("bad post"))
+
+
+def test_aimd_limiter_increases_and_cuts():
+    """Test additive increase on success and one cut per overload burst."""
+    limiter = AIMDLimiter(initial=4, min_limit=1, max_limit=6, latency_target=1.0)
+    
+    for _ in range(4):
+        limiter.on_success(0, latency=0.1)
+    assert 4.9 < limiter.limit < 5.0
+    
+    limiter.on_success(0, latency=5.0)
+    assert limiter.limit < 5.0
+    
+    # Three 429s from requests started in the same epoch cut once
+    for _ in range(3):
+        limiter.on_overload(0)
+    assert 2.4 < limiter.limit < 2.5
+    
+    for _ in range(10):
+        limiter.on_overload(limiter.epoch)
+    assert limiter.limit == 1
+    
+    for _ in range(1000):
+        limiter.on_success(limiter.epoch, latency=0.1)
+    assert limiter.limit == 6
+
+
+def test_aimd_limiter_bounds_in_flight():
+    """Test that no more requests run at once than the limit allows."""
+    limiter = AIMDLimiter(initial=3, max_limit=3)
+    peak = 0
+    
+    async def work():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+    
+    async def run():
+        await asyncio.gather(*(work() for _ in range(10)))
+        
+    asyncio.run(run())
+    assert peak == 3
+    
+    # A fresh event loop starts with nothing in flight
+    asyncio.run(run())
+    assert limiter.in_flight == 0
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """Test that the breaker opens, half-opens after the reset time and closes."""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60, clock=lambda: now[0])
+    
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+    
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    
+    now[0] = 61
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    breaker.record_failure()
+    assert not breaker.allow()
+    
+    now[0] = 130
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_retried_rate_limit_cuts_limit():
+    """Test that a 429 the provider retries successfully still cuts the limit."""
+    response = SimpleNamespace(status_code=429, headers={"retry-after-ms": "10"}, request=None)
+    completion = AsyncMock()
+    completion.choices = [AsyncMock()]
+    completion.choices[0].message.content = "Сводка"
+    limiter = AIMDLimiter(initial=8, min_limit=1, max_limit=8)
+    
+    async def run():
+        async with limiter.slot() as epoch:
+            with overload_listener(lambda: limiter.on_overload(epoch)):
+                return await provider.summarize("Текст", "Сожми: {text}")
+                
+    with patch('app.services.nlp_transform.providers.openai_provider.openai.AsyncOpenAI') as mock_openai, \
+            patch.object(config, 'nlp_max_retries', 2):
+        mock_client = AsyncMock()
+        mock_client.chat.completions.create.side_effect = [
+            openai.RateLimitError("Too Many Requests", response=response, body=None),
+            completion
+        ]
+        mock_openai.return_value = mock_client
+        provider = OpenAIProvider(model="test-retried-429")
+        
+        summary, _ = asyncio.run(run())
+        
+    assert summary == "Сводка"
+    assert limiter.limit == 4
+
+
+def test_packed_requests_drive_limiter():
+    """Test that packed requests hold limiter slots, cut the limit on a retried 429 and raise it when healthy."""
+    response = SimpleNamespace(status_code=429, headers={"retry-after-ms": "10"}, request=None)
+    
+    def packed_completion(*summaries):
+        completion = AsyncMock()
+        completion.choices = [AsyncMock()]
+        completion.choices[0].message.content = json.dumps({"items": [
+            {"id": index, "summary": summary, "hashtags": []} for index, summary in enumerate(summaries, 1)
+        ]})
+        return completion
+        
+    posts = [SimpleNamespace(id=number, original_text=f"Текст {number}", status="processing") for number in range(2)]
+    service = NLPTransformService.__new__(NLPTransformService)
+    service.db = SimpleNamespace(commit=lambda: None)
+    service.limiter = AIMDLimiter(initial=8, min_limit=1, max_limit=8)
+    service.breaker = CircuitBreaker()
+    
+    with patch('app.services.nlp_transform.providers.openai_provider.openai.AsyncOpenAI') as mock_openai, \
+            patch.object(config, 'nlp_max_retries', 2), \
+            patch.object(config, 'nlp_packing_enabled', True), \
+            patch.object(config, 'nlp_packing_max_posts', 2), \
+            patch.object(config, 'nlp_preprocess_enabled', False):
+        mock_client = AsyncMock()
+        mock_client.chat.completions.create.side_effect = [
+            openai.RateLimitError("Too Many Requests", response=response, body=None),
+            packed_completion("Сводка 0", "Сводка 1"),
+            packed_completion("Сводка 0", "Сводка 1")
+        ]
+        mock_openai.return_value = mock_client
+        service.provider = OpenAIProvider(model="test-packed-429")
+        
+        # Halved by the retried 429, then raised once by the response
+        assert asyncio.run(service._transform_packed(posts)) == (2, 0)
+        assert service.limiter.limit == 4.25
+        
+        asyncio.run(service._transform_packed(posts))
+        
+    assert [post.status for post in posts] == ["ready", "ready"]
+    assert service.limiter.limit > 4.25
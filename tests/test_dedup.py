@@ -0,0 +1,105 @@
+"""
+Tests for near-duplicate handling in the transform service.
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app.config import config
+from app.services.nlp_transform.service import NLPTransformService
+from app.services.utils.simhash import compute_simhash
+
+
+TEXT = "Власти Москвы объявили о перекрытии Тверской улицы в выходные из-за городского праздника"
+
+
+class FakeQuery:
+    """Query stand-in returning fixed rows."""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def join(self, *args):
+        return self
+    
+    def filter(self, *args):
+        return self
+    
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Database session stand-in over a dict of posts."""
+    
+    def __init__(self, posts):
+        self.posts = {post.id: post for post in posts}
+    
+    def query(self, *columns):
+        return FakeQuery([
+            SimpleNamespace(id=post.id, simhash=post.simhash, published_at=post.published_at, our_channel_id="channel")
+            for post in self.posts.values()
+            if post.status not in ("duplicate", "error")
+        ])
+    
+    def get(self, model, post_id):
+        return self.posts.get(post_id)
+    
+    def commit(self):
+        pass
+
+
+def make_post(post_id, minutes, status, text=TEXT):
+    return SimpleNamespace(
+        id=post_id, simhash=compute_simhash(text), status=status,
+        published_at=datetime(2026, 1, 1) + timedelta(minutes=minutes),
+        source=SimpleNamespace(our_channel_id="channel"),
+        summary_text="Summary" if status in ("ready", "sent") else None,
+        hashtags=["#news"], duplicate_of_id=None
+    )
+
+
+def check(posts, post, monkeypatch, action="skip"):
+    monkeypatch.setattr(config, "dedup_action", action)
+    service = NLPTransformService.__new__(NLPTransformService)
+    service.db = FakeSession(posts)
+    return service._check_duplicate(post, service._load_recent_fingerprints())
+
+
+def test_duplicate_of_sent_post_is_skipped(monkeypatch):
+    """Test that a repost of a published post is marked as its duplicate."""
+    original = make_post("a", 0, "sent")
+    repost = make_post("b", 5, "processing", TEXT + " Подписывайтесь")
+    
+    assert check([original, repost], repost, monkeypatch) == "duplicate"
+    assert repost.status == "duplicate"
+    assert repost.duplicate_of_id == "a"
+
+
+def test_duplicate_of_pending_post_waits(monkeypatch):
+    """Test that a repost is not dropped while its original may still fail."""
+    original = make_post("a", 0, "processing")
+    repost = make_post("b", 5, "processing")
+    
+    assert check([original, repost], repost, monkeypatch) == "deferred"
+    assert repost.status == "processing"
+    
+    # With "reuse" there is no summary to copy yet, so it is transformed
+    assert check([original, repost], repost, monkeypatch, action="reuse") is None
+
+
+def test_failed_or_later_posts_are_not_originals(monkeypatch):
+    """Test that failed originals and later posts never make a post a duplicate."""
+    original = make_post("a", 0, "processing")
+    repost = make_post("b", 5, "processing")
+    posts = [original, repost]
+    
+    # The original failed during this run, after fingerprints were loaded
+    monkeypatch.setattr(config, "dedup_action", "skip")
+    service = NLPTransformService.__new__(NLPTransformService)
+    service.db = FakeSession(posts)
+    fingerprints = service._load_recent_fingerprints()
+    original.status = "error"
+    assert service._check_duplicate(repost, fingerprints) is None
+    
+    original.status = "ready"
+    assert check(posts, original, monkeypatch) is None
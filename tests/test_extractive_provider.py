@@ -0,0 +1,57 @@
+"""
+Tests for the local extractive provider.
+"""
+
+import asyncio
+from app.services.nlp_transform.providers.extractive_provider import (
+    ExtractiveProvider,
+    rank_sentences,
+    split_sentences
+)
+
+
+NEWS = (
+    "Правительство утвердило новый бюджет на 2027 год. "
+    "Расходы на образование вырастут на десять процентов. "
+    "Министр финансов заявил, что дефицит бюджета сократится. "
+    "Подписывайтесь на наш канал! "
+    "Бюджет будет рассмотрен Госдумой в ноябре."
+)
+
+
+def test_split_sentences():
+    """Test sentence splitting on punctuation and line breaks."""
+    assert split_sentences("Первое. Второе!\nТретье «цитата». Четвертое") == [
+        "Первое.", "Второе!", "Третье «цитата».", "Четвертое"
+    ]
+
+
+def test_rank_sentences_prefers_central_sentences():
+    """Test that sentences sharing terms with the rest rank above filler."""
+    sentences = split_sentences(NEWS)
+    scores = rank_sentences(sentences)
+    
+    assert len(scores) == len(sentences)
+    assert scores[0] > scores[3]
+    assert scores[4] > scores[3]
+
+
+def test_extractive_provider_summarize():
+    """Test that summaries keep the top sentences in original order."""
+    provider = ExtractiveProvider(max_sentences=2, max_chars=400)
+    summary, hashtags = asyncio.run(provider.summarize(NEWS, "{text}"))
+    
+    assert summary.startswith("Правительство утвердило новый бюджет")
+    assert len(split_sentences(summary)) == 2
+    assert "Подписывайтесь" not in summary
+    assert all(hashtag.startswith("#") for hashtag in hashtags)
+
+
+def test_extractive_provider_clips_long_text():
+    """Test the character limit on a single long sentence."""
+    provider = ExtractiveProvider(max_sentences=3, max_chars=50)
+    
+    summary = provider.extract("слово " * 100)
+    
+    assert len(summary) <= 51
+    assert summary.endswith("…")
@@ -3,7 +3,7 @@ Tests for hashtag utilities.
 """
 
 import pytest
-from app.services.utils.hashtag import extract_hashtags
+from app.services.utils.hashtag import HashtagEngine, extract_hashtags, load_vocabulary
 
 
 def test_extract_hashtags_basic():
@@ -41,3 +41,33 @@ def test_extract_hashtags_limit():
     
     # Should be limited to 5 hashtags
     assert len(hashtags) <= 5
+
+
+def test_extract_hashtags_matches_inflected_forms():
+    """Test that stemming matches inflected keyword forms once each."""
+    hashtags = extract_hashtags("Новости о технологиях и науке. Снова новости науки")
+    
+    assert hashtags == ["#новости", "#технологии", "#наука"]
+
+
+def test_hashtag_engine_vocabulary_file(tmp_path):
+    """Test loading keywords, custom tags and phrases from a vocabulary file."""
+    vocabulary = tmp_path / "hashtags.txt"
+    vocabulary.write_text(
+        "# comment\nбиржа = #рынки\nискусственный интеллект\nвыборы\n",
+        encoding="utf-8"
+    )
+    engine = HashtagEngine(load_vocabulary(str(vocabulary)), max_hashtags=5)
+    
+    assert engine.extract("На бирже рост, выборов не будет") == ["#рынки", "#выборы"]
+    assert engine.extract("Искусственного интеллекта стало больше") == ["#искусственный_интеллект"]
+    assert engine.extract("ничего") == ["#новости", "#события"]
+
+
+def test_hashtag_engine_extract_many():
+    """Test batch extraction."""
+    engine = HashtagEngine()
+    
+    results = engine.extract_many(["Спортивные новости", "Economy and politics", ""])
+    
+    assert results == [["#новости"], ["#economy", "#politics"], ["#новости", "#события"]]
@@ -0,0 +1,102 @@
+"""
+Tests for hedged and fallback NLP providers.
+"""
+
+import asyncio
+import pytest
+from app.services.nlp_transform.base import BaseNLPProvider
+from app.services.nlp_transform.hedging import HedgedNLPProvider, LatencyHistogram
+
+
+class FakeProvider(BaseNLPProvider):
+    """Provider answering after a delay, or failing."""
+    
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+    
+    @property
+    def model_id(self):
+        return self.name
+    
+    async def summarize(self, text, template):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return f"{self.name}: {text}", ["#tag"]
+
+
+def test_latency_histogram_percentile():
+    """Test percentiles from bucketed latencies."""
+    histogram = LatencyHistogram(buckets=[0.1, 0.5, 1.0, 5.0])
+    assert histogram.percentile(0.95) is None
+    
+    for seconds in [0.05] * 90 + [0.8] * 9 + [30]:
+        histogram.observe(seconds)
+        
+    assert histogram.percentile(0.50) == 0.1
+    assert histogram.percentile(0.95) == 1.0
+    assert histogram.percentile(1.0) == 5.0
+
+
+def test_hedged_provider_hedges_slow_primary():
+    """Test that a slow primary is hedged and the faster answer wins."""
+    primary = FakeProvider("primary", delay=1.0)
+    secondary = FakeProvider("secondary", delay=0.01)
+    provider = HedgedNLPProvider([primary, secondary], min_delay=0.05, max_delay=0.05)
+    
+    summary, _ = asyncio.run(provider.summarize("text", "{text}"))
+    
+    assert summary == "secondary: text"
+    assert primary.cancelled == 1
+    stats = provider.stats()
+    assert stats["secondary"]["hedges"] == 1
+    assert stats["secondary"]["wins"] == 1
+    assert stats["primary"]["wins"] == 0
+
+
+def test_hedged_provider_fails_over():
+    """Test that errors move the request to the next provider."""
+    primary = FakeProvider("primary", error=RuntimeError("boom"))
+    secondary = FakeProvider("secondary")
+    provider = HedgedNLPProvider([primary, secondary], hedging=False)
+    
+    summary, _ = asyncio.run(provider.summarize("text", "{text}"))
+    
+    assert summary == "secondary: text"
+    assert provider.stats()["primary"]["errors"] == 1
+
+
+def test_hedged_provider_raises_when_all_fail():
+    """Test that the last error is raised when every provider fails."""
+    provider = HedgedNLPProvider([
+        FakeProvider("primary", error=RuntimeError("first")),
+        FakeProvider("secondary", error=RuntimeError("second"))
+    ])
+    
+    with pytest.raises(RuntimeError, match="second"):
+        asyncio.run(provider.summarize("text", "{text}"))
+
+
+def test_hedged_provider_summarize_many_fails_over_items():
+    """Test that items failed by the primary are retried on the fallbacks."""
+    class PartialProvider(FakeProvider):
+        async def summarize_many(self, items, template):
+            return {item_id: RuntimeError("lost") if item_id == "b" else (text, []) for item_id, text in items}
+            
+    secondary = FakeProvider("secondary")
+    provider = HedgedNLPProvider([PartialProvider("primary"), secondary])
+    
+    results = asyncio.run(provider.summarize_many([("a", "one"), ("b", "two")], "{text}"))
+    
+    assert results["a"] == ("one", [])
+    assert results["b"] == ("secondary: two", ["#tag"])
+    assert secondary.calls == 1
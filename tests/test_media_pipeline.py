@@ -0,0 +1,164 @@
+"""
+Tests for media preparation and the media disk cache.
+"""
+
+import io
+import os
+from types import SimpleNamespace
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from PIL import Image
+from app.services.media.cache import MediaCache
+from app.services.media.pipeline import MediaPipeline, fit_photo, sniff_media
+from app.services.media.service import MediaPrepareService
+
+
+def make_image(image_format, size=(100, 50), mode="RGB"):
+    output = io.BytesIO()
+    Image.new(mode, size, (200, 10, 10, 128) if mode == "RGBA" else (200, 10, 10)).save(output, format=image_format)
+    return output.getvalue()
+
+
+def test_sniff_media():
+    """Test that media is typed by magic bytes, whatever the URL says."""
+    assert sniff_media(make_image("JPEG")) == ("photo", "jpeg")
+    assert sniff_media(make_image("PNG")) == ("photo", "png")
+    assert sniff_media(make_image("WEBP")) == ("photo", "webp")
+    assert sniff_media(b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00") == ("video", "mp4")
+    assert sniff_media(b"\x00\x00\x00\x1cftypavif\x00\x00\x00\x00") == ("photo", "heif")
+    assert sniff_media(b"\x00\x00\x00\x20ftypisom\x00\x00\x02\x00") == ("video", "mp4")
+    # Audio and other ISO base media brands are not videos
+    assert sniff_media(b"\x00\x00\x00\x20ftypM4A \x00\x00\x00\x00") is None
+    assert sniff_media(b"\x00\x00\x00\x14ftyp3gp4\x00\x00\x00\x00") is None
+    assert sniff_media(b"<!DOCTYPE html><html>") is None
+
+
+def test_fit_photo():
+    """Test that fitting images are kept and others are resized to JPEG."""
+    jpeg = make_image("JPEG")
+    assert fit_photo(jpeg, "jpeg", 2560, 10 * 1024 * 1024, 85) == (jpeg, "jpg")
+    
+    data, extension = fit_photo(make_image("PNG", size=(4000, 1000), mode="RGBA"), "png", 2560, 10 * 1024 * 1024, 85)
+    assert extension == "jpg"
+    assert Image.open(io.BytesIO(data)).size == (2560, 640)
+    
+    data, extension = fit_photo(make_image("WEBP"), "webp", 2560, 10 * 1024 * 1024, 85)
+    assert extension == "jpg"
+    
+    with pytest.raises(ValueError):
+        fit_photo(make_image("PNG", size=(2100, 100)), "png", 2560, 10 * 1024 * 1024, 85)
+
+
+def test_media_cache_dedupes_and_evicts(tmp_path):
+    """Test content addressing across URLs and least recently used eviction."""
+    cache = MediaCache(str(tmp_path), max_bytes=250)
+    first = cache.put("https://a.example/1.jpg", b"x" * 100, "photo", "jpg")
+    same = cache.put("https://b.example/copy.jpg", b"x" * 100, "photo", "jpg")
+    second = cache.put("https://a.example/2.jpg", b"y" * 100, "photo", "jpg")
+    assert first.path == same.path
+    assert cache.get("https://b.example/copy.jpg").read() == b"x" * 100
+    
+    # Make the first file the least recently used one
+    os.utime(first.path, (1, 1))
+    third = cache.put("https://a.example/3.jpg", b"z" * 100, "photo", "jpg")
+    assert cache.evict() == 1
+    
+    assert cache.get("https://a.example/1.jpg") is None
+    assert cache.get("https://a.example/2.jpg").path == second.path
+    assert cache.get("https://a.example/3.jpg").path == third.path
+
+
+@pytest.mark.asyncio
+async def test_prepare_many(tmp_path):
+    """Test downloading, typing and caching media from a local server."""
+    requests = []
+    
+    async def media(request):
+        requests.append(request.path)
+        if request.path == "/photo.jpg":
+            # A PNG behind a .jpg URL
+            return web.Response(body=make_image("PNG"), content_type="image/jpeg")
+        if request.path == "/page.jpg":
+            return web.Response(text="<html></html>", content_type="text/html")
+        return web.Response(status=404)
+        
+    app = web.Application()
+    app.router.add_get("/{name}", media)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        urls = [str(server.make_url(name)) for name in ("/photo.jpg", "/page.jpg", "/missing.jpg")]
+        pipeline = MediaPipeline(MediaCache(str(tmp_path), max_bytes=1024 * 1024))
+        
+        results = await pipeline.prepare_many(urls)
+        again = await pipeline.prepare_many(urls[:1])
+    finally:
+        await server.close()
+        
+    photo = results[urls[0]]
+    assert photo.media_type == "photo"
+    assert photo.file_name.endswith(".png")
+    assert results[urls[1]] is None
+    assert urls[2] not in results
+    assert again[urls[0]].path == photo.path
+    assert requests.count("/photo.jpg") == 1
+
+
+class FakeQuery:
+    """Query stand-in returning fixed rows."""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def options(self, *args):
+        return self
+    
+    def filter(self, *args):
+        return self
+    
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Database session stand-in."""
+    
+    def __init__(self, rows):
+        self.rows = rows
+        self.commits = 0
+    
+    def query(self, model):
+        return FakeQuery(self.rows)
+    
+    def commit(self):
+        self.commits += 1
+    
+    def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_prepare_posts_marks_media_types(tmp_path):
+    """Test that the media job records what it prepared and leaves failures for a retry."""
+    photo = MediaCache(str(tmp_path), max_bytes=1024).put("https://example.com/photo", b"jpeg", "photo", "jpg")
+    
+    class FakePipeline:
+        async def prepare_many(self, urls):
+            self.urls = sorted(urls)
+            return {"https://example.com/photo": photo, "https://example.com/page": None}
+            
+    posts = [
+        SimpleNamespace(media_url=f"https://example.com/{name}", media_type=None, source=None)
+        for name in ("photo", "page", "missing")
+    ]
+    service = MediaPrepareService.__new__(MediaPrepareService)
+    service.db = FakeSession(posts)
+    service.pipeline = FakePipeline()
+    
+    result = await service.prepare_posts()
+    
+    assert result == {"prepared": 2, "failed": 1}
+    assert [post.media_type for post in posts] == ["photo", "unknown", None]
+    assert service.pipeline.urls == sorted(post.media_url for post in posts)
+    assert service.db.commits == 1
@@ -0,0 +1,65 @@
+"""
+Tests for the RSSHub mirror pool.
+"""
+
+import pytest
+from app.services.utils.mirrors import MirrorPool
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def test_choose_prefers_fastest_mirror():
+    """Test that the mirror with the lowest latency is chosen."""
+    pool = MirrorPool(["https://a.example", "https://b.example"])
+    pool.record_success("https://a.example", 2.0)
+    pool.record_success("https://b.example", 0.5)
+    
+    assert pool.choose() == "https://b.example"
+    assert pool.choose(exclude=["https://b.example"]) == "https://a.example"
+
+
+def test_failing_mirror_is_ejected_for_cooldown():
+    """Test ejection after repeated failures and return after the cool-down."""
+    clock = FakeClock()
+    pool = MirrorPool(
+        ["https://a.example", "https://b.example"],
+        cooldown_seconds=60,
+        failures_before_eject=2,
+        clock=clock
+    )
+    pool.record_success("https://a.example", 0.1)
+    pool.record_success("https://b.example", 1.0)
+    
+    pool.record_failure("https://a.example")
+    assert not pool.is_ejected("https://a.example")
+    pool.record_failure("https://a.example")
+    assert pool.is_ejected("https://a.example")
+    assert pool.choose() == "https://b.example"
+    
+    clock.now = 61
+    assert not pool.is_ejected("https://a.example")
+
+
+def test_all_ejected_returns_earliest_recovery():
+    """Test that some mirror is always returned."""
+    clock = FakeClock()
+    pool = MirrorPool(["https://a.example", "https://b.example"], cooldown_seconds=60, failures_before_eject=1, clock=clock)
+    pool.record_failure("https://a.example")
+    clock.now = 10
+    pool.record_failure("https://b.example")
+    
+    assert pool.choose() == "https://a.example"
+
+
+def test_empty_pool_rejected():
+    """Test that a pool needs at least one mirror."""
+    with pytest.raises(ValueError):
+        MirrorPool([])
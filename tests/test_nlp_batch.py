@@ -0,0 +1,119 @@
+"""
+Tests for Batch API summarization against a local stand-in server.
+"""
+
+import json
+import pytest
+import openai
+from contextlib import asynccontextmanager
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.services.nlp_transform.providers.openai_provider import OpenAIProvider
+
+
+class FakeBatchAPI:
+    """Minimal OpenAI-compatible Files and Batches API."""
+    
+    def __init__(self):
+        self.files = {}
+        self.batches = {}
+    
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/files", self.create_file)
+        app.router.add_get("/v1/files/{file_id}/content", self.file_content)
+        app.router.add_post("/v1/batches", self.create_batch)
+        app.router.add_get("/v1/batches/{batch_id}", self.retrieve_batch)
+        return app
+    
+    def _add_file(self, content: str) -> str:
+        file_id = f"file-{len(self.files) + 1}"
+        self.files[file_id] = content
+        return file_id
+    
+    async def create_file(self, request):
+        form = await request.post()
+        file_id = self._add_file(form["file"].file.read().decode("utf-8"))
+        return web.json_response({
+            "id": file_id, "object": "file", "bytes": len(self.files[file_id]),
+            "created_at": 0, "filename": "batch.jsonl", "purpose": form["purpose"], "status": "processed"
+        })
+    
+    async def file_content(self, request):
+        return web.Response(text=self.files[request.match_info["file_id"]])
+    
+    async def create_batch(self, request):
+        body = await request.json()
+        batch_id = f"batch-{len(self.batches) + 1}"
+        self.batches[batch_id] = {
+            "id": batch_id, "object": "batch", "endpoint": body["endpoint"],
+            "input_file_id": body["input_file_id"], "completion_window": body["completion_window"],
+            "status": "in_progress", "created_at": 0, "output_file_id": None, "error_file_id": None
+        }
+        return web.json_response(self.batches[batch_id])
+    
+    async def retrieve_batch(self, request):
+        return web.json_response(self.batches[request.match_info["batch_id"]])
+    
+    def complete(self, batch_id: str, failing_ids=()):
+        """Answer every request of a batch, failing the given custom ids."""
+        batch = self.batches[batch_id]
+        output, errors = [], []
+        for line in self.files[batch["input_file_id"]].splitlines():
+            request = json.loads(line)
+            if request["custom_id"] in failing_ids:
+                errors.append({
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 400, "body": {"error": {"message": "bad request"}}},
+                    "error": None
+                })
+                continue
+            prompt = request["body"]["messages"][-1]["content"]
+            output.append({
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": {
+                    "choices": [{"message": {"role": "assistant", "content": f" Сводка: {prompt} "}}]
+                }},
+                "error": None
+            })
+        batch["status"] = "completed"
+        batch["output_file_id"] = self._add_file("\n".join(json.dumps(line) for line in output))
+        batch["error_file_id"] = self._add_file("\n".join(json.dumps(line) for line in errors))
+
+
+@asynccontextmanager
+async def batch_server(api: FakeBatchAPI):
+    server = TestServer(api.app())
+    await server.start_server()
+    try:
+        yield str(server.make_url("/v1"))
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_round_trip():
+    """Test submitting a batch and collecting summaries and errors."""
+    api = FakeBatchAPI()
+    
+    async with batch_server(api) as base_url:
+        provider = OpenAIProvider()
+        provider.client = openai.AsyncOpenAI(api_key="test", base_url=base_url, max_retries=0)
+        
+        batch_id = await provider.submit_batch(
+            [("post-1", "Новости спорта"), ("post-2", "Второй текст")],
+            "Сожми: {text}"
+        )
+        
+        results = await provider.fetch_batch(batch_id)
+        assert not results.finished
+        assert results.summaries == {}
+        
+        api.complete(batch_id, failing_ids={"post-2"})
+        results = await provider.fetch_batch(batch_id)
+        
+    assert results.finished
+    summary, hashtags = results.summaries["post-1"]
+    assert summary == "Сводка: Сожми: Новости спорта"
+    assert all(hashtag.startswith("#") for hashtag in hashtags)
+    assert results.errors == {"post-2": "bad request"}
@@ -2,8 +2,10 @@
 Tests for NLP providers.
 """
 
+import json
 import pytest
 from unittest.mock import AsyncMock, patch
+from app.config import config
 from app.services.nlp_transform.providers.openai_provider import OpenAIProvider
 
 
@@ -56,3 +58,62 @@ def test_openai_provider_extract_hashtags():
     # Should return default hashtags
     assert len(hashtags) > 0
     assert "#новости" in hashtags
+
+
+def test_openai_provider_plan_packs():
+    """Test that packs respect the post limit and the token budget."""
+    provider = OpenAIProvider()
+    
+    with patch.object(config, 'nlp_packing_max_posts', 3), patch.object(config, 'nlp_packing_token_budget', 2000):
+        packs = provider._plan_packs([(str(i), "короткий текст") for i in range(7)], "Сожми: {text}")
+        assert [len(pack) for pack in packs] == [3, 3, 1]
+        
+        packs = provider._plan_packs([("long", "т" * 6000), ("short", "текст")], "Сожми: {text}")
+        assert [[item_id for item_id, _ in pack] for pack in packs] == [["long"], ["short"]]
+
+
+def test_openai_provider_parse_pack():
+    """Test that malformed packed items are dropped."""
+    provider = OpenAIProvider()
+    content = json.dumps({"items": [
+        {"id": 1, "summary": " Первая сводка ", "hashtags": ["спорт", "#новости"]},
+        {"id": 2, "summary": ""},
+        {"id": 7, "summary": "Лишний пост"},
+        "не объект",
+        {"id": "3", "summary": "Третья сводка", "hashtags": "не список"}
+    ]}, ensure_ascii=False)
+    
+    parsed = provider._parse_pack(content, 3)
+    
+    assert parsed[1] == ("Первая сводка", ["#спорт", "#новости"])
+    assert parsed[3][0] == "Третья сводка"
+    assert parsed[3][1]
+    assert set(parsed) == {1, 3}
+    assert provider._parse_pack("not json", 3) == {}
+
+
+@pytest.mark.asyncio
+async def test_openai_provider_summarize_many_packed():
+    """Test packed summaries with a single-request retry for missing items."""
+    def completion(content):
+        response = AsyncMock()
+        response.choices = [AsyncMock()]
+        response.choices[0].message.content = content
+        return response
+    
+    packed = completion(json.dumps({"items": [{"id": 1, "summary": "Сводка 1", "hashtags": ["#a"]}]}))
+    single = completion("Сводка 2")
+    
+    with patch('app.services.nlp_transform.providers.openai_provider.openai.AsyncOpenAI') as mock_openai, \
+            patch.object(config, 'nlp_packing_enabled', True):
+        mock_client = AsyncMock()
+        mock_client.chat.completions.create.side_effect = [packed, single]
+        mock_openai.return_value = mock_client
+        
+        provider = OpenAIProvider()
+        results = await provider.summarize_many([("a", "Текст 1"), ("b", "Текст 2")], "Сожми: {text}")
+        
+    assert results["a"] == ("Сводка 1", ["#a"])
+    assert results["b"][0] == "Сводка 2"
+    assert mock_client.chat.completions.create.call_count == 2
+    assert mock_client.chat.completions.create.call_args_list[0].kwargs["response_format"] == {"type": "json_object"}
@@ -0,0 +1,38 @@
+"""
+Tests for adaptive polling utilities.
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.services.utils.polling import decay_rate, update_posting_rate, compute_poll_interval
+
+
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def test_decay_rate_half_life():
+    """Test that a rate halves after one half-life."""
+    assert decay_rate(4.0, 24, 24) == pytest.approx(2.0)
+    assert decay_rate(4.0, 0, 24) == 4.0
+
+
+def test_update_posting_rate_steady_source():
+    """Test that a steady hourly source converges to about one post per hour."""
+    entry_times = [NOW - timedelta(hours=hours) for hours in range(24 * 30)]
+    rate = update_posting_rate(None, None, entry_times, NOW, half_life_hours=72)
+    
+    assert rate == pytest.approx(1.0, rel=0.05)
+
+
+def test_update_posting_rate_decays_without_entries():
+    """Test that a silent source's rate decays over time."""
+    rate = update_posting_rate(2.0, NOW - timedelta(hours=72), [], NOW, half_life_hours=72)
+    
+    assert rate == pytest.approx(1.0)
+
+
+def test_compute_poll_interval_bounds():
+    """Test that poll intervals follow the rate within the bounds."""
+    assert compute_poll_interval(2.0, 1, 5, 1440) == timedelta(minutes=30)
+    assert compute_poll_interval(100.0, 1, 5, 1440) == timedelta(minutes=5)
+    assert compute_poll_interval(0.0, 1, 5, 1440) == timedelta(minutes=1440)
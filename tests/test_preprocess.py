@@ -0,0 +1,52 @@
+"""
+Tests for NLP input preprocessing.
+"""
+
+from app.services.nlp_transform.preprocess import (
+    collapse_emoji,
+    count_tokens,
+    learn_boilerplate,
+    normalize_whitespace,
+    preprocess_text,
+    strip_links,
+    truncate_to_tokens
+)
+
+
+def test_normalize_whitespace():
+    """Test that spaces collapse and paragraphs survive."""
+    assert normalize_whitespace("  Один   два \n\n\n\n три\t ") == "Один два\n\nтри"
+
+
+def test_strip_links_and_emoji():
+    """Test that link lists disappear and inline URLs keep their host."""
+    text = "Подробнее на https://www.rbc.ru/news/1 сегодня\nhttps://a.com/x, https://b.com/y"
+    
+    assert strip_links(text) == "Подробнее на www.rbc.ru сегодня"
+    assert collapse_emoji("Ура 🔥🔥 🚀 итог") == "Ура 🔥 итог"
+
+
+def test_learn_boilerplate():
+    """Test that lines repeated across a source's posts are learned."""
+    texts = [f"Новость {number}\nПодписывайтесь: @channel" for number in range(5)] + ["Новость без подписи"]
+    
+    assert learn_boilerplate(texts, min_share=0.5, min_posts=5) == {"Подписывайтесь: @channel"}
+    assert learn_boilerplate(texts[:3], min_share=0.5, min_posts=5) == set()
+
+
+def test_truncate_to_tokens_at_sentence_boundary():
+    """Test that truncation keeps whole sentences within the budget."""
+    text = "Первое предложение. Второе предложение! Третье предложение?"
+    budget = count_tokens("Первое предложение. Второе предложение!")
+    
+    assert truncate_to_tokens(text, budget) == "Первое предложение. Второе предложение!"
+    assert truncate_to_tokens(text, 1000) == text
+    assert count_tokens(truncate_to_tokens("слово " * 500, 20)) <= 20
+
+
+def test_preprocess_text():
+    """Test the full preprocessing pipeline."""
+    text = "Новость   дня 🔥🔥🔥\n\nhttps://t.me/channel\nПодписывайтесь: @channel"
+    
+    assert preprocess_text(text, {"Подписывайтесь: @channel"}) == "Новость дня 🔥"
+    assert preprocess_text("Подписывайтесь: @channel", {"Подписывайтесь: @channel"}) == "Подписывайтесь: @channel"
@@ -0,0 +1,56 @@
+"""
+Tests for NLP rate limiting.
+"""
+
+import pytest
+from app.services.nlp_transform.rate_limit import RateLimiter, estimate_tokens
+from app.services.utils.token_bucket import TokenBucket
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_at_rate():
+    """Test that a bucket drains and refills at its per-minute rate."""
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)
+    
+    assert bucket.try_acquire(60) == 0
+    assert bucket.try_acquire(1) == pytest.approx(1.0)
+    
+    clock.now = 10
+    assert bucket.try_acquire(10) == 0
+    assert bucket.try_acquire(5) == pytest.approx(5.0)
+
+
+def test_token_bucket_clamps_large_requests():
+    """Test that requests above the capacity wait for a full bucket only."""
+    clock = FakeClock()
+    bucket = TokenBucket(100, clock=clock)
+    bucket.try_acquire(100)
+    
+    assert bucket.try_acquire(1000) == pytest.approx(60.0)
+
+
+def test_rate_limiter_pause():
+    """Test that a Retry-After pause only extends the pause."""
+    clock = FakeClock()
+    limiter = RateLimiter(100, 1000, clock=clock)
+    
+    limiter.pause(10)
+    limiter.pause(5)
+    
+    assert limiter.paused_until == 10
+
+
+def test_estimate_tokens():
+    """Test that the estimate grows with the text."""
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("Новости " * 100) > estimate_tokens("Новости")
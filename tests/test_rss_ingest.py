@@ -0,0 +1,168 @@
+"""
+Tests for RSS ingestion.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import feedparser
+from sqlalchemy.dialects import postgresql
+from app.services import rss_ingest
+from app.services.rss_ingest import RSSIngestService
+
+
+class FakeQuery:
+    """Query stand-in returning fixed rows."""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def filter(self, *args):
+        return self
+    
+    def all(self):
+        return self.rows
+    
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeResult:
+    """Result stand-in for an INSERT ... RETURNING."""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def scalars(self):
+        return self
+    
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Database session stand-in holding the guids already stored for a source."""
+    
+    def __init__(self, known=(), has_posts=None):
+        self.known = set(known)
+        self.has_posts = bool(known) if has_posts is None else has_posts
+        self.inserted = []
+        self.commits = 0
+    
+    def query(self, column):
+        if column.key == "guid":
+            return FakeQuery([(guid,) for guid in self.known])
+        return FakeQuery([("post-id",)] if self.has_posts else [])
+    
+    def execute(self, stmt):
+        rows = stmt.compile(dialect=postgresql.dialect()).params
+        guids = [value for name, value in rows.items() if name.startswith("guid")]
+        self.inserted.append(rows)
+        return FakeResult([guid for guid in guids if guid not in self.known])
+    
+    def commit(self):
+        self.commits += 1
+    
+    def rollback(self):
+        pass
+
+
+def make_entries(*numbers, published_at=None):
+    # Feeds list entries newest first
+    return [
+        {
+            "guid": f"https://t.me/test/{number}",
+            "text": f"Post {number}",
+            "simhash": number,
+            "media_url": None,
+            "published_at": published_at
+        }
+        for number in sorted(numbers, reverse=True)
+    ]
+
+
+def make_service(session):
+    service = RSSIngestService.__new__(RSSIngestService)
+    service.db = session
+    return service
+
+
+def guids(entries):
+    return [entry["guid"].rsplit("/", 1)[1] for entry in entries]
+
+
+def test_select_new_entries_stops_at_stored_guid():
+    """Test that entries newer than the newest stored one are taken, oldest first."""
+    service = make_service(FakeSession(known=["https://t.me/test/3", "https://t.me/test/2"]))
+    source = SimpleNamespace(id="source", last_guid=None)
+    
+    assert guids(service._select_new_entries(source, make_entries(1, 2, 3, 4, 5, 6))) == ["4", "5", "6"]
+
+
+def test_select_new_entries_first_poll_takes_newest_only():
+    """Test that a source without posts does not backfill its feed."""
+    service = make_service(FakeSession())
+    source = SimpleNamespace(id="source", last_guid=None)
+    
+    assert guids(service._select_new_entries(source, make_entries(1, 2, 3))) == ["3"]
+
+
+def test_select_new_entries_ignores_publisher_cursor():
+    """Test that posts never published are not lost to an old last_guid."""
+    service = make_service(FakeSession(known=["https://t.me/test/1"]))
+    source = SimpleNamespace(id="source", last_guid=None)
+    
+    assert guids(service._select_new_entries(source, make_entries(1, 2, 3))) == ["2", "3"]
+
+
+def test_select_new_entries_stored_guids_not_in_feed():
+    """Test that the whole feed is taken once the stored entries rolled out of it."""
+    service = make_service(FakeSession(has_posts=True))
+    source = SimpleNamespace(id="source", last_guid="https://t.me/test/0")
+    
+    assert guids(service._select_new_entries(source, make_entries(1, 2, 3))) == ["1", "2", "3"]
+
+
+def test_publication_times_follow_feed_order():
+    """Test that entries sharing or missing a timestamp still sort in feed order."""
+    service = make_service(FakeSession())
+    published_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    entries = list(reversed(make_entries(1, 2, 3, published_at=published_at)))
+    entries.append(dict(entries[0], published_at=None))
+    
+    times = service._publication_times(entries)
+    
+    assert times[0] == published_at
+    assert times == sorted(set(times))
+
+
+def test_ingest_source_counts_conflict_skips(monkeypatch):
+    """Test that guids already stored are skipped by the conflict clause, not counted as new."""
+    feed = feedparser.FeedParserDict(status=200, entries=make_entries(1, 2, 3))
+    
+    async def fetch(*args, **kwargs):
+        return feed
+        
+    monkeypatch.setattr(rss_ingest, "fetch_rsshub_feed", fetch)
+    monkeypatch.setattr(rss_ingest.config, "polling_enabled", False)
+    session = FakeSession(has_posts=True)
+    service = make_service(session)
+    source = SimpleNamespace(id="source", name="test", username="test", etag=None, last_modified=None)
+    
+    # Another ingest run stores post 2 between the selection and the insert
+    select = service._select_new_entries
+    
+    def select_then_race(*args):
+        selected = select(*args)
+        session.known.add("https://t.me/test/2")
+        return selected
+        
+    monkeypatch.setattr(service, "_select_new_entries", select_then_race)
+    
+    result = asyncio.run(service.ingest_source(source))
+    
+    assert result == {"new_posts": 2}
+    assert len(session.inserted) == 1
+    params = session.inserted[0]
+    times = [params[name] for name in sorted(params) if name.startswith("published_at")]
+    assert len(times) == 3 and len(set(times)) == 3
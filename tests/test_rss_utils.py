@@ -0,0 +1,240 @@
+"""
+Tests for RSS utilities.
+"""
+
+import os
+import pytest
+import feedparser
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.config import config
+from app.services.utils.mirrors import MirrorPool
+from app.services.utils.rss import (
+    fetch_rss_feed,
+    fetch_rsshub_feed,
+    create_http_session,
+    get_parse_executor,
+    shutdown_parse_executor,
+    extract_entry_content,
+    extract_original_text,
+    extract_media_url
+)
+
+
+FEED_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+  <channel>
+    <title>Test channel</title>
+    <item>
+      <guid>https://t.me/test/2</guid>
+      <title>Second post</title>
+      <description><![CDATA[<p>Second post text</p><img src="https://cdn.example.com/2.jpg">]]></description>
+    </item>
+    <item>
+      <guid>https://t.me/test/1</guid>
+      <title>First post</title>
+      <description><![CDATA[<p>First post text</p>]]></description>
+    </item>
+  </channel>
+</rss>
+"""
+
+
+async def feed_handler(request):
+    return web.Response(body=FEED_XML.encode('utf-8'), content_type='application/rss+xml')
+
+
+async def error_handler(request):
+    return web.Response(status=503)
+
+
+async def conditional_handler(request):
+    if request.headers.get('If-None-Match') == '"v1"':
+        return web.Response(status=304)
+    return web.Response(
+        body=FEED_XML.encode('utf-8'),
+        content_type='application/rss+xml',
+        headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 14 Oct 2026 10:00:00 GMT'}
+    )
+
+
+async def large_feed_handler(request):
+    """Stream a feed with many entries in small chunks."""
+    response = web.StreamResponse(headers={'Content-Type': 'application/rss+xml'})
+    await response.prepare(request)
+    await response.write(b'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>Big</title>')
+    for number in range(1000, 0, -1):
+        await response.write(
+            f'<item><guid>https://t.me/test/{number}</guid>'
+            f'<description>Post {number} {"x" * 500}</description></item>'.encode('utf-8')
+        )
+    await response.write(b'</channel></rss>')
+    return response
+
+
+@asynccontextmanager
+async def feed_server():
+    """Local HTTP server serving a static RSS feed."""
+    app = web.Application()
+    app.router.add_get('/feed', feed_handler)
+    app.router.add_get('/error', error_handler)
+    app.router.add_get('/conditional', conditional_handler)
+    app.router.add_get('/telegram/channel/test', feed_handler)
+    app.router.add_get('/large', large_feed_handler)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        yield server
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_fetch_rss_feed():
+    """Test fetching and parsing a feed with a shared session."""
+    async with feed_server() as server, create_http_session() as session:
+        feed = await fetch_rss_feed(str(server.make_url('/feed')), session)
+        
+    assert feed is not None
+    assert len(feed.entries) == 2
+    assert feed.entries[0]['guid'] == "https://t.me/test/2"
+    assert feed.entries[0]['text'] == "Second post text"
+    assert feed.entries[0]['media_url'] == "https://cdn.example.com/2.jpg"
+
+
+@pytest.mark.asyncio
+async def test_fetch_rss_feed_http_error():
+    """Test that HTTP errors return None instead of raising."""
+    async with feed_server() as server:
+        feed = await fetch_rss_feed(str(server.make_url('/error')))
+        
+    assert feed is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_rss_feed_conditional():
+    """Test that validators are returned and a 304 skips parsing."""
+    async with feed_server() as server:
+        url = str(server.make_url('/conditional'))
+        
+        feed = await fetch_rss_feed(url)
+        assert feed['status'] == 200
+        assert feed['etag'] == '"v1"'
+        assert feed['modified'] == 'Wed, 14 Oct 2026 10:00:00 GMT'
+        assert len(feed.entries) == 2
+        
+        not_modified = await fetch_rss_feed(url, etag=feed['etag'], modified=feed['modified'])
+        assert not_modified['status'] == 304
+        assert not_modified.entries == []
+        assert not_modified['etag'] == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_fetch_rsshub_feed_fails_over_to_healthy_mirror():
+    """Test that a 5xx mirror is retried on another mirror and penalized."""
+    failing_app = web.Application()
+    failing_app.router.add_get('/telegram/channel/test', error_handler)
+    failing_server = TestServer(failing_app)
+    await failing_server.start_server()
+    
+    try:
+        async with feed_server() as server:
+            failing_base = str(failing_server.make_url('')).rstrip('/')
+            healthy_base = str(server.make_url('')).rstrip('/')
+            pool = MirrorPool([failing_base, healthy_base], failures_before_eject=1)
+            
+            feed = await fetch_rsshub_feed("test", pool=pool)
+            
+            assert feed is not None
+            assert len(feed.entries) == 2
+            assert pool.stats[failing_base].failures == 1
+            assert pool.is_ejected(failing_base)
+            assert pool.choose() == healthy_base
+    finally:
+        await failing_server.close()
+
+
+@pytest.mark.asyncio
+async def test_fetch_rss_feed_entry_cap(monkeypatch):
+    """Test that only the first max_entries entries are downloaded and parsed."""
+    monkeypatch.setattr(config, 'fetch_max_entries', 5)
+    
+    async with feed_server() as server:
+        feed = await fetch_rss_feed(str(server.make_url('/large')))
+        
+    assert [entry['guid'] for entry in feed.entries] == [
+        f"https://t.me/test/{number}" for number in range(1000, 995, -1)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fetch_rss_feed_byte_cap(monkeypatch):
+    """Test that the byte cap keeps only complete entries."""
+    monkeypatch.setattr(config, 'fetch_max_entries', 1000)
+    monkeypatch.setattr(config, 'fetch_max_bytes', 10 * 1024)
+    
+    async with feed_server() as server:
+        feed = await fetch_rss_feed(str(server.make_url('/large')))
+        
+    assert 0 < len(feed.entries) < 20
+    assert all(entry['text'].endswith("x" * 500) for entry in feed.entries)
+
+
+@pytest.mark.asyncio
+async def test_fetch_rss_feed_recovers_from_broken_parse_pool(monkeypatch):
+    """Test that a crashed parse worker is replaced instead of breaking every later parse."""
+    monkeypatch.setattr(config, 'fetch_parse_workers', 1)
+    shutdown_parse_executor()
+    broken = get_parse_executor()
+    try:
+        # Kill the worker the way the OOM killer would
+        with pytest.raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+            
+        async with feed_server() as server:
+            feed = await fetch_rss_feed(str(server.make_url('/feed')))
+            
+        assert [entry['guid'] for entry in feed.entries] == ["https://t.me/test/2", "https://t.me/test/1"]
+        assert get_parse_executor() is not broken
+    finally:
+        shutdown_parse_executor()
+
+
+def test_extract_entry_content():
+    """Test single-pass extraction of text, media and links."""
+    entry = feedparser.FeedParserDict(
+        content=[feedparser.FeedParserDict(value=(
+            '<p>Breaking <b>news</b></p>'
+            '<a href="https://example.com/story"><img src="https://cdn.example.com/preview.jpg"></a>'
+            '<video><source src="https://cdn.example.com/clip.mp4"></video>'
+            '<script>tracking()</script>'
+        ))],
+        summary='<img src="https://cdn.example.com/summary.jpg">',
+        title='Title'
+    )
+    
+    content = extract_entry_content(entry)
+    
+    assert content.text == "Breakingnews"
+    assert content.media_urls == [
+        "https://cdn.example.com/preview.jpg",
+        "https://cdn.example.com/clip.mp4"
+    ]
+    assert content.links == ["https://example.com/story"]
+    assert content.media_url == "https://cdn.example.com/preview.jpg"
+
+
+def test_extract_entry_content_fallbacks():
+    """Test summary and title fallbacks used by the wrapper functions."""
+    summary_entry = feedparser.FeedParserDict(
+        summary='<p>Summary text</p><img src="https://cdn.example.com/1.jpg">',
+        title='Title'
+    )
+    title_entry = feedparser.FeedParserDict(title='Only title')
+    
+    assert extract_original_text(summary_entry) == "Summary text"
+    assert extract_media_url(summary_entry) == "https://cdn.example.com/1.jpg"
+    assert extract_original_text(title_entry) == "Only title"
+    assert extract_media_url(title_entry) is None
@@ -0,0 +1,50 @@
+"""
+Tests for SimHash fingerprints.
+"""
+
+from app.services.utils.simhash import SimHashIndex, compute_simhash, hamming_distance
+
+
+ORIGINAL = (
+    "Власти Москвы объявили о перекрытии Тверской улицы в выходные из-за проведения "
+    "городского праздника. Движение транспорта будет ограничено с 8 утра до 23 часов."
+)
+REPOST = (
+    "Власти Москвы объявили о перекрытии Тверской улицы в выходные из-за проведения "
+    "городского праздника! Движение транспорта будет ограничено с 8 утра до 22 часов. Подписывайтесь"
+)
+UNRELATED = (
+    "Центробанк сохранил ключевую ставку на уровне 16 процентов, сообщила пресс-служба "
+    "регулятора после заседания совета директоров."
+)
+
+
+def test_simhash_near_duplicates_are_close():
+    """Test that a lightly edited repost stays within the default distance."""
+    assert hamming_distance(compute_simhash(ORIGINAL), compute_simhash(REPOST)) <= 8
+    assert hamming_distance(compute_simhash(ORIGINAL), compute_simhash(UNRELATED)) > 8
+
+
+def test_simhash_is_deterministic_and_fits_bigint():
+    """Test that fingerprints are stable signed 64-bit integers."""
+    fingerprint = compute_simhash(ORIGINAL)
+    
+    assert fingerprint == compute_simhash(ORIGINAL)
+    assert -(1 << 63) <= fingerprint < (1 << 63)
+    assert hamming_distance(fingerprint, fingerprint) == 0
+    assert compute_simhash("") == 0
+
+
+def test_simhash_index_finds_fingerprints_within_distance():
+    """Test that band lookups find every fingerprint within the distance and no farther."""
+    index = SimHashIndex(max_distance=3)
+    base = compute_simhash(ORIGINAL)
+    for flipped in range(6):
+        # Flip the lowest bits of each band in turn
+        fingerprint = base
+        for bit in range(flipped):
+            fingerprint ^= 1 << (bit * 16)
+        index.add(fingerprint, flipped)
+    index.add(compute_simhash(UNRELATED), "unrelated")
+    
+    assert index.search(base) == [(0, 0), (1, 1), (2, 2), (3, 3)]
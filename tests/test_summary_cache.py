@@ -0,0 +1,70 @@
+"""
+Tests for the summary cache.
+"""
+
+import asyncio
+from datetime import timedelta
+from app.services.nlp_transform.base import BaseNLPProvider
+from app.services.nlp_transform.cache import CachedNLPProvider, normalize_text, summary_cache_key
+
+
+class CountingProvider(BaseNLPProvider):
+    """Provider that counts calls."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def summarize(self, text, template):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return f"summary of {text}", ["#tag"]
+
+
+class EmptySession:
+    """Database session stand-in with an empty summary_cache table."""
+    
+    def get(self, model, key):
+        return None
+    
+    def execute(self, statement):
+        pass
+    
+    def commit(self):
+        pass
+
+
+def test_normalize_text():
+    """Test that formatting-only differences normalize away."""
+    assert normalize_text("  Hello\n\tworld  ") == "Hello world"
+    assert normalize_text("ﬁle") == "file"
+
+
+def test_summary_cache_key():
+    """Test that keys depend on normalized text, template and model."""
+    key = summary_cache_key("Hello  world", "template", "openai:gpt-4")
+    
+    assert key == summary_cache_key("Hello world\n", "template", "openai:gpt-4")
+    assert key != summary_cache_key("Hello world", "other template", "openai:gpt-4")
+    assert key != summary_cache_key("Hello world", "template", "openai:gpt-4o")
+    assert len(key) == 64
+
+
+def test_cached_provider_memory_hits():
+    """Test that repeated and concurrent requests share one provider call."""
+    provider = CountingProvider()
+    cached = CachedNLPProvider(provider, EmptySession(), ttl=timedelta(days=1),
+                               max_entries=10, memory_entries=10)
+    
+    async def run():
+        first = await asyncio.gather(
+            cached.summarize("text", "template"),
+            cached.summarize("text", "template")
+        )
+        second = await cached.summarize("text ", "template")
+        return first, second
+        
+    first, second = asyncio.run(run())
+    
+    assert first[0] == first[1] == second == ("summary of text", ["#tag"])
+    assert provider.calls == 1
+    assert cached.stats() == {"memory_hits": 1, "db_hits": 0, "misses": 1}
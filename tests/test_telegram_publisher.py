@@ -0,0 +1,423 @@
+"""
+Tests for the Telegram publisher.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from telebot.asyncio_helper import ApiTelegramException
+from app.services.media.cache import CachedMedia, MediaCache
+from app.services.publisher.file_cache import get_file_id, is_rejected_file_id
+from app.services.publisher.flood_control import FloodControlError, SendScheduler, get_retry_after
+from app.services.publisher.telegram_publisher import TelegramPublisherService
+
+
+class FakeBot:
+    """Async Bot API stand-in recording sends with a delay per call."""
+    
+    def __init__(self, delay=0.05, throttle=None):
+        self.delay = delay
+        self.throttle = throttle or {}
+        self.rejected = set()
+        self.sent = []
+        self.in_flight = 0
+        self.peak = 0
+        self.closed = False
+    
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.throttle.get(chat_id):
+            self.throttle[chat_id] -= 1
+            raise too_many_requests(retry_after=0.2)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        self.sent.append((chat_id, text))
+    
+    async def send_photo(self, chat_id, photo, **kwargs):
+        if photo in self.rejected:
+            raise ApiTelegramException("sendPhoto", None, {
+                "error_code": 400,
+                "description": "Bad Request: wrong file identifier/HTTP URL specified"
+            })
+        if isinstance(photo, tuple):
+            photo = f"upload:{photo[0]}"
+        self.sent.append((chat_id, photo))
+        file_id = photo if photo.startswith("file-") else f"file-{len(self.sent)}"
+        return SimpleNamespace(photo=[SimpleNamespace(file_id="thumb"), SimpleNamespace(file_id=file_id)])
+    
+    async def send_media_group(self, chat_id, media, **kwargs):
+        if any(item.media in self.rejected for item in media):
+            raise ApiTelegramException("sendMediaGroup", None, {
+                "error_code": 400,
+                "description": "Bad Request: wrong file identifier/HTTP URL specified"
+            })
+        messages = []
+        self.sent.append((chat_id, [item.media for item in media]))
+        for number, item in enumerate(media):
+            file_id = item.media if item.media.startswith("file-") else f"file-{len(self.sent)}-{number}"
+            messages.append(SimpleNamespace(photo=[SimpleNamespace(file_id=file_id)]))
+        return messages
+    
+    async def close_session(self):
+        self.closed = True
+
+
+class FakeQuery:
+    """Query stand-in returning fixed rows, sorted like the database would."""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def options(self, *args):
+        return self
+    
+    def filter(self, *args):
+        return self
+    
+    def order_by(self, *columns):
+        self.rows = sorted(self.rows, key=lambda row: tuple(getattr(row, column.key) for column in columns))
+        return self
+    
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Database session stand-in."""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def query(self, model):
+        return FakeQuery(self.rows)
+    
+    def commit(self):
+        pass
+    
+    def close(self):
+        pass
+
+
+def too_many_requests(retry_after):
+    return ApiTelegramException("sendMessage", None, {
+        "error_code": 429,
+        "description": f"Too Many Requests: retry after {retry_after}",
+        "parameters": {"retry_after": retry_after}
+    })
+
+
+class MemoryFileCache:
+    """In-memory stand-in for FileIdCache."""
+    
+    def __init__(self):
+        self.entries = {}
+    
+    def get(self, key, media_type):
+        return self.entries.get((key, media_type))
+    
+    def put(self, key, media_type, file_id):
+        self.entries[(key, media_type)] = file_id
+    
+    def evict(self, key):
+        self.entries = {entry: file_id for entry, file_id in self.entries.items() if entry[0] != key}
+    
+    def stats(self):
+        return {}
+
+
+def make_service(posts, bot, scheduler=None, file_cache=None):
+    service = TelegramPublisherService.__new__(TelegramPublisherService)
+    service.db = FakeSession(posts)
+    service.bot = bot
+    service.scheduler = scheduler or SendScheduler(
+        messages_per_second=1000, chat_messages_per_minute=60000, chat_burst=10
+    )
+    service.file_cache = file_cache
+    service.media_cache = None
+    service.media = {}
+    return service
+
+
+def make_source(chat, album_window_seconds=None, name="source"):
+    channel = SimpleNamespace(tg_chat_id_or_username=chat, name=chat, album_window_seconds=album_window_seconds)
+    return SimpleNamespace(id=f"{chat}-{name}", our_channel=channel, last_guid=None)
+
+
+def make_post(chat, number, media_url=None, album_window_seconds=None, seconds=0, source=None):
+    source = source or make_source(chat, album_window_seconds, name=str(number))
+    # Posts are ingested together; their feed publication times differ
+    return SimpleNamespace(
+        id=f"{chat}-{number}", guid=str(number), source=source, source_id=source.id, status="ready",
+        summary_text=f"{chat} {number}", original_text=None, extra_text=None,
+        hashtags=None, media_url=media_url, media_type=None, sent_at=None,
+        created_at=datetime(2026, 1, 1),
+        published_at=datetime(2026, 1, 1) + timedelta(seconds=seconds)
+    )
+
+
+def test_publish_posts_concurrent_across_chats_ordered_within():
+    """Test that chats are sent to in parallel and each chat keeps its order."""
+    posts = [make_post(chat, number) for number in range(3) for chat in ("@a", "@b", "@c")]
+    service = make_service(posts, FakeBot())
+    
+    result = asyncio.run(service.publish_posts())
+    
+    assert result == {"published": 9, "errors": 0, "throttled": 0}
+    assert service.bot.peak == 3
+    assert service.bot.closed
+    for chat in ("@a", "@b", "@c"):
+        texts = [text for chat_id, text in service.bot.sent if chat_id == chat]
+        assert texts == [f"{chat} {number}" for number in range(3)]
+    assert all(post.status == "sent" for post in posts)
+
+
+def test_publish_posts_orders_by_publication_time():
+    """Test that posts ingested together go out in feed order, not by id."""
+    posts = [make_post("@a", number, seconds=number) for number in range(5)]
+    for post, post_id in zip(posts, "edcba"):
+        # One ingest run: same created_at, ids sorting against feed order
+        post.created_at = datetime(2026, 1, 1)
+        post.id = post_id
+    service = make_service([posts[2], posts[0], posts[4], posts[1], posts[3]], FakeBot(delay=0))
+    
+    asyncio.run(service.publish_posts())
+    
+    assert [text for _, text in service.bot.sent] == [f"@a {number}" for number in range(5)]
+
+
+def test_get_retry_after():
+    """Test that retry_after is read from 429 responses only."""
+    assert get_retry_after(too_many_requests(retry_after=7)) == 7
+    assert get_retry_after(ValueError("bad request")) is None
+
+
+def test_send_scheduler_paces_chat():
+    """Test that a chat gets its burst and then the per-minute rate."""
+    scheduler = SendScheduler(messages_per_second=1000, chat_messages_per_minute=600, chat_burst=2)
+    bot = FakeBot(delay=0)
+    
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for number in range(4):
+            await scheduler.send(bot.send_message, chat_id="@a", text=str(number))
+        return loop.time() - started
+        
+    # Two messages at once, then one every 0.1s
+    assert 0.18 < asyncio.run(run()) < 0.5
+
+
+def test_send_scheduler_counts_album_items():
+    """Test that an album takes a token per item, beyond the chat burst."""
+    scheduler = SendScheduler(messages_per_second=1000, chat_messages_per_minute=600, chat_burst=3)
+    bot = FakeBot(delay=0)
+    media = [SimpleNamespace(media=f"file-{number}") for number in range(5)]
+    
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await scheduler.send(bot.send_media_group, chat_id="@a", message_count=len(media), media=media)
+        album = loop.time() - started
+        await scheduler.send(bot.send_message, chat_id="@a", text="after")
+        return album, loop.time() - started
+        
+    # Three items from the burst, then one every 0.1s, and the next message waits its turn
+    album, total = asyncio.run(run())
+    assert 0.18 < album < 0.4
+    assert 0.28 < total < 0.6
+
+
+def test_send_scheduler_pauses_only_throttled_chat():
+    """Test that a 429 delays its own chat and is retried, while other chats go on."""
+    scheduler = SendScheduler(messages_per_second=1000, chat_burst=10)
+    bot = FakeBot(delay=0, throttle={"@a": 1})
+    finished = []
+    
+    async def send(chat_id):
+        await scheduler.send(bot.send_message, chat_id=chat_id, text=chat_id)
+        finished.append(chat_id)
+        
+    async def run():
+        await asyncio.gather(send("@a"), send("@b"))
+        
+    asyncio.run(run())
+    assert finished == ["@b", "@a"]
+    assert bot.sent == [("@b", "@b"), ("@a", "@a")]
+
+
+def test_publish_posts_requeues_throttled_chat():
+    """Test that posts of a chat that stays throttled remain ready, in order."""
+    posts = [make_post("@a", number) for number in range(3)] + [make_post("@b", 0)]
+    scheduler = SendScheduler(messages_per_second=1000, chat_burst=10, max_retries=1)
+    service = make_service(posts, FakeBot(delay=0, throttle={"@a": 2}), scheduler)
+    
+    result = asyncio.run(service.publish_posts())
+    
+    assert result == {"published": 1, "errors": 0, "throttled": 3}
+    assert [post.status for post in posts] == ["ready", "ready", "ready", "sent"]
+    
+    scheduler.pause("@a", 3600)
+    with pytest.raises(FloodControlError):
+        asyncio.run(scheduler.acquire("@a"))
+
+
+def test_get_file_id():
+    """Test that the largest photo size or the video gives the file_id."""
+    photo = SimpleNamespace(photo=[SimpleNamespace(file_id="small"), SimpleNamespace(file_id="large")])
+    video = SimpleNamespace(photo=None, video=SimpleNamespace(file_id="clip"))
+    assert get_file_id(photo, "photo") == "large"
+    assert get_file_id(video, "video") == "clip"
+    assert get_file_id(SimpleNamespace(photo=None, animation=None), "photo") is None
+
+
+def test_send_file_reuses_and_refreshes_file_id():
+    """Test that cached file_ids are reused, and rejected ones re-uploaded by URL."""
+    bot = FakeBot(delay=0)
+    service = make_service([], bot, file_cache=MemoryFileCache())
+    url = "https://example.com/default.jpg"
+    
+    async def run():
+        await service._send_file("@a", "photo", url, "first")
+        await service._send_file("@b", "photo", url, "second")
+        bot.rejected.add("file-1")
+        await service._send_file("@c", "photo", url, "third")
+        
+    asyncio.run(run())
+    
+    assert bot.sent == [("@a", url), ("@b", "file-1"), ("@c", url)]
+    assert service.file_cache.get(url, "photo") == "file-3"
+
+
+def test_send_file_keeps_file_id_on_other_errors():
+    """Test that only file identifier rejections evict a cached file_id."""
+    bot = FakeBot(delay=0)
+    file_cache = MemoryFileCache()
+    file_cache.put("https://example.com/a.jpg", "photo", "file-1")
+    service = make_service([], bot, file_cache=file_cache)
+    
+    async def fail(chat_id, photo, **kwargs):
+        raise ConnectionError("connection reset")
+        
+    bot.send_photo = fail
+    with pytest.raises(ConnectionError):
+        asyncio.run(service._send_file("@a", "photo", "https://example.com/a.jpg", "caption"))
+        
+    assert file_cache.get("https://example.com/a.jpg", "photo") == "file-1"
+    assert not is_rejected_file_id(too_many_requests(retry_after=5))
+    assert is_rejected_file_id(ApiTelegramException("sendPhoto", None, {
+        "error_code": 400,
+        "description": "Bad Request: wrong remote file identifier specified: Wrong padding in the string"
+    }))
+
+
+def test_send_file_uploads_prepared_media(tmp_path):
+    """Test that prepared media is uploaded from disk and cached by content hash."""
+    path = tmp_path / "abc.jpg"
+    path.write_bytes(b"jpeg")
+    prepared = CachedMedia("photo", "abc", path)
+    bot = FakeBot(delay=0)
+    service = make_service([], bot, file_cache=MemoryFileCache())
+    
+    async def run():
+        await service._send_file("@a", "photo", "https://example.com/a.jpg", "first", prepared)
+        await service._send_file("@b", "photo", "https://example.com/b.jpg", "second", prepared)
+        
+    asyncio.run(run())
+    
+    assert bot.sent == [("@a", "upload:abc.jpg"), ("@b", "file-1")]
+    assert service.file_cache.get("sha256:abc", "photo") == "file-1"
+
+
+def test_publish_posts_uploads_media_prepared_by_media_job(tmp_path):
+    """Test that media prepared by the media job is uploaded from the disk cache."""
+    media_cache = MediaCache(str(tmp_path), max_bytes=1024 * 1024)
+    cached = media_cache.put("https://example.com/photo", b"jpeg", "photo", "jpg")
+    posts = [
+        make_post("@a", 0, "https://example.com/photo", seconds=0),
+        make_post("@a", 1, "https://example.com/page.jpg", seconds=1),
+        make_post("@a", 2, "https://example.com/unprepared.jpg", seconds=2)
+    ]
+    posts[0].media_type = "photo"
+    posts[1].media_type = "unknown"
+    service = make_service(posts, FakeBot(delay=0))
+    service.media_cache = media_cache
+    
+    result = asyncio.run(service.publish_posts())
+    
+    assert result["published"] == 3
+    assert service.bot.sent == [
+        ("@a", f"upload:{cached.file_name}"),
+        ("@a", "@a 1\n\nhttps://example.com/page.jpg"),
+        ("@a", "https://example.com/unprepared.jpg")
+    ]
+
+
+def test_publish_posts_sends_media_bursts_as_albums():
+    """Test that media posts of a source within the album window go out as albums of up to 10."""
+    source = make_source("@a", album_window_seconds=60)
+    other = make_source("@a", album_window_seconds=60, name="other")
+    posts = [
+        make_post("@a", number, f"https://example.com/{number}.jpg", seconds=number, source=source)
+        for number in range(12)
+    ]
+    # A text post breaks the burst, a late photo starts a new one, and a
+    # photo of another source feeding the channel is never grouped with it
+    posts.append(make_post("@a", 12, seconds=12, source=source))
+    posts.append(make_post("@a", 13, "https://example.com/13.jpg", seconds=13, source=source))
+    posts.append(make_post("@a", 14, "https://example.com/14.jpg", seconds=200, source=source))
+    posts.append(make_post("@a", 15, "https://example.com/15.jpg", seconds=201, source=other))
+    service = make_service(posts, FakeBot(delay=0), file_cache=MemoryFileCache())
+    
+    assert [len(group) for group in service._group_albums(posts)] == [10, 2, 1, 1, 1, 1]
+    
+    result = asyncio.run(service.publish_posts())
+    
+    assert result["published"] == 16
+    assert [media for _, media in service.bot.sent[:2]] == [
+        [f"https://example.com/{number}.jpg" for number in range(10)],
+        [f"https://example.com/{number}.jpg" for number in (10, 11)]
+    ]
+    assert len(service.bot.sent) == 6
+    assert all(post.status == "sent" for post in posts)
+    assert source.last_guid == "14" and other.last_guid == "15"
+    assert service.file_cache.get("https://example.com/10.jpg", "photo") == "file-2-0"
+
+
+def test_publish_album_falls_back_on_rejected_file_id():
+    """Test that rejected cached file_ids are evicted and the album uploaded again."""
+    source = make_source("@a", album_window_seconds=60)
+    posts = [make_post("@a", number, f"https://example.com/{number}.jpg", source=source) for number in range(2)]
+    file_cache = MemoryFileCache()
+    file_cache.put("https://example.com/0.jpg", "photo", "file-stale")
+    bot = FakeBot(delay=0)
+    bot.rejected.add("file-stale")
+    service = make_service(posts, bot, file_cache=file_cache)
+    
+    assert asyncio.run(service.publish_album(posts))
+    
+    assert bot.sent == [("@a", ["https://example.com/0.jpg", "https://example.com/1.jpg"])]
+    assert file_cache.get("https://example.com/0.jpg", "photo") == "file-1-0"
+
+
+def test_publish_album_keeps_file_ids_on_other_errors():
+    """Test that an album failing for another reason keeps its cached file_ids."""
+    source = make_source("@a", album_window_seconds=60)
+    posts = [make_post("@a", number, f"https://example.com/{number}.jpg", source=source) for number in range(2)]
+    file_cache = MemoryFileCache()
+    file_cache.put("https://example.com/0.jpg", "photo", "file-0")
+    bot = FakeBot(delay=0)
+    
+    async def send_media_group(chat_id, media, **kwargs):
+        raise ApiTelegramException("sendMediaGroup", None, {
+            "error_code": 400,
+            "description": "Bad Request: message caption is too long"
+        })
+        
+    bot.send_media_group = send_media_group
+    service = make_service(posts, bot, file_cache=file_cache)
+    
+    assert not asyncio.run(service.publish_album(posts))
+    
+    assert file_cache.get("https://example.com/0.jpg", "photo") == "file-0"
@@ -0,0 +1,162 @@
+"""
+Tests for transform worker claims.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.config import config
+from app.db import Base
+from app.models import OurChannel, Post, Source
+from app.services.nlp_transform.base import BaseNLPProvider
+from app.services.nlp_transform.concurrency import AIMDLimiter, CircuitBreaker
+from app.services.nlp_transform.service import NLPTransformService
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(type_, compiler, **kwargs):
+    return "JSON"
+
+
+class RecordingQuery:
+    """Query stand-in recording the calls made on it."""
+    
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+    
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, kwargs))
+            return self
+        return call
+    
+    def all(self):
+        return self.rows
+
+
+class RecordingSession:
+    """Database session stand-in returning fixed rows."""
+    
+    def __init__(self, rows):
+        self.last_query = RecordingQuery(rows)
+        self.commits = 0
+    
+    def query(self, model):
+        return self.last_query
+    
+    def commit(self):
+        self.commits += 1
+
+
+def make_service(rows):
+    service = NLPTransformService.__new__(NLPTransformService)
+    service.db = RecordingSession(rows)
+    return service
+
+
+def test_claim_posts_locks_and_marks_processing():
+    """Test that claims skip locked rows and lease the claimed posts."""
+    posts = [SimpleNamespace(id=i, status="new", claimed_at=None) for i in range(3)]
+    service = make_service(posts)
+    
+    claimed = service._claim_posts()
+    
+    assert claimed == posts
+    assert all(post.status == "processing" and post.claimed_at for post in posts)
+    assert ("with_for_update", {"skip_locked": True}) in service.db.last_query.calls
+    assert service.db.commits == 1
+
+
+def test_release_claims_returns_unfinished_posts():
+    """Test that only posts still being processed go back to "new"."""
+    posts = [
+        SimpleNamespace(id=1, status="processing", claimed_at=1),
+        SimpleNamespace(id=2, status="ready", claimed_at=1),
+        SimpleNamespace(id=3, status="batched", claimed_at=1)
+    ]
+    service = make_service([])
+    
+    service._release_claims(posts)
+    
+    assert [post.status for post in posts] == ["new", "ready", "batched"]
+    assert posts[0].claimed_at is None
+
+
+class SlowProvider(BaseNLPProvider):
+    """Provider whose calls outlive the lease, while another worker looks for expired claims."""
+    
+    def __init__(self, other_worker):
+        self.other_worker = other_worker
+        self.texts = []
+        self.seen_statuses = []
+    
+    @property
+    def model_id(self):
+        return "test:slow"
+    
+    async def summarize(self, text, template):
+        self.texts.append(text)
+        await asyncio.sleep(0.3)
+        self.other_worker._release_expired_claims()
+        self.seen_statuses.append(
+            self.other_worker.db.query(Post.status).filter(Post.original_text == text).scalar()
+        )
+        return f"Summary: {text}", ["#test"]
+
+
+def test_transform_posts_claims_expired_and_keeps_live_leases(monkeypatch):
+    """Test a run over new, expired and live claims, with leases renewed during slow calls."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[OurChannel.__table__, Source.__table__, Post.__table__])
+    Session = sessionmaker(bind=engine)
+    
+    db = Session()
+    channel = OurChannel(name="channel", tg_chat_id_or_username="@channel")
+    source = Source(our_channel=channel, name="source", username="source")
+    now = datetime.now(timezone.utc)
+    db.add_all([
+        Post(source=source, guid="new", original_text="new", status="new", published_at=now),
+        Post(source=source, guid="expired", original_text="expired", status="processing",
+             claimed_at=now - timedelta(hours=2), published_at=now + timedelta(seconds=1)),
+        Post(source=source, guid="live", original_text="live", status="processing",
+             claimed_at=now, published_at=now + timedelta(seconds=2))
+    ])
+    db.commit()
+    
+    # A lease of 0.12s is renewed every 0.04s during the 0.3s calls
+    monkeypatch.setattr(config, "nlp_claim_lease_minutes", 0.002)
+    monkeypatch.setattr(config, "dedup_enabled", False)
+    monkeypatch.setattr(config, "nlp_packing_enabled", False)
+    monkeypatch.setattr(config, "nlp_preprocess_enabled", False)
+    monkeypatch.setattr(config, "nlp_source_type_providers", {})
+    
+    other_worker = make_service([])
+    other_worker.db = Session()
+    service = NLPTransformService.__new__(NLPTransformService)
+    service.db = db
+    service.provider = SlowProvider(other_worker)
+    service.batch_provider = None
+    service.hedged_provider = None
+    service.routed_providers = {}
+    service.limiter = AIMDLimiter(initial=4)
+    service.breaker = CircuitBreaker()
+    
+    # The live lease of a third worker must outlast this run
+    live_claim = Session()
+    live_claim.query(Post).filter(Post.guid == "live").update({Post.claimed_at: now + timedelta(hours=1)})
+    live_claim.commit()
+    
+    result = asyncio.run(service.transform_posts())
+    
+    check = Session()
+    statuses = {post.guid: post.status for post in check.query(Post).all()}
+    assert statuses == {"new": "ready", "expired": "ready", "live": "processing"}
+    assert result["transformed"] == 2
+    assert sorted(service.provider.texts) == ["expired", "new"]
+    assert service.provider.seen_statuses == ["processing", "processing"]
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Ingest benchmark CLI tool.
+Runs RSSIngestService against a local fake RSSHub and synthetic sources.
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import random
+import resource
+import statistics
+import time
+from email.utils import formatdate
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark RSS ingest against a local fake RSSHub")
+    parser.add_argument("--sources", type=int, default=1000, help="Number of synthetic sources")
+    parser.add_argument("--entries", type=int, default=20, help="Entries per feed")
+    parser.add_argument("--entry-bytes", type=int, default=2000, help="Approximate HTML size per entry")
+    parser.add_argument("--latency-ms", type=float, default=200, help="Mean response latency of the fake RSSHub")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--not-modified-rate", type=float, default=0.0,
+                        help="Share of conditional requests answered with 304")
+    parser.add_argument("--port", type=int, default=18080, help="Port of the fake RSSHub")
+    parser.add_argument("--runs", type=int, default=1, help="Ingest runs over the same sources")
+    parser.add_argument("--database-url", required=True,
+                        help="Scratch database to benchmark against; never the app's database")
+    parser.add_argument("--keep", action="store_true", help="Keep synthetic sources and posts afterwards")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+
+def build_feed(username: str, entries: int, entry_bytes: int) -> bytes:
+    """
+    Build a Telegram-channel feed as RSSHub renders it.
+    
+    Args:
+        username: Channel username
+        entries: Number of entries
+        entry_bytes: Approximate HTML size per entry
+        
+    Returns:
+        RSS document
+    """
+    # New posts appear every run, so the newest ids move with the clock
+    newest = int(time.time() // 60)
+    filler = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+    body = (filler * (entry_bytes // len(filler) + 1))[:entry_bytes]
+    
+    items = []
+    for offset in range(entries):
+        post_id = newest - offset
+        published = formatdate(post_id * 60, usegmt=True)
+        items.append(
+            f"<item><title>{username} #{post_id}</title>"
+            f"<link>https://t.me/{username}/{post_id}</link>"
+            f"<guid>https://t.me/{username}/{post_id}</guid>"
+            f"<pubDate>{published}</pubDate>"
+            f"<description><![CDATA[<p>{body}</p>"
+            f"<img src=\"https://cdn.example.com/{username}/{post_id}.jpg\">"
+            f"<a href=\"https://example.com/{post_id}\">link</a>]]></description></item>"
+        )
+        
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{username}</title><link>https://t.me/s/{username}</link>"
+        + "".join(items)
+        + "</channel></rss>"
+    ).encode("utf-8")
+
+
+def run_fake_rsshub(port: int, entries: int, entry_bytes: int, latency_ms: float,
+                    error_rate: float, not_modified_rate: float):
+    """
+    Serve generated feeds on /telegram/channel/{username}.
+    
+    Runs in its own process so the server does not compete with the
+    ingest under test for the event loop or CPU accounting.
+    """
+    from aiohttp import web
+    
+    async def channel(request):
+        await asyncio.sleep(random.expovariate(1000 / latency_ms) if latency_ms > 0 else 0)
+        
+        if random.random() < error_rate:
+            return web.Response(status=503)
+            
+        if request.headers.get("If-None-Match") and random.random() < not_modified_rate:
+            return web.Response(status=304)
+            
+        body = build_feed(request.match_info["username"], entries, entry_bytes)
+        return web.Response(
+            body=body,
+            content_type="application/rss+xml",
+            headers={"ETag": f'"{len(body)}-{int(time.time() // 60)}"'}
+        )
+        
+    app = web.Application()
+    app.router.add_get("/telegram/channel/{username}", channel)
+    web.run_app(app, host="127.0.0.1", port=port, print=None, access_log=None)
+
+
+def create_sources(db, count: int):
+    """
+    Create a benchmark channel with synthetic sources.
+    
+    Args:
+        db: Database session
+        count: Number of sources
+        
+    Returns:
+        Tuple of (OurChannel instance, ids of the synthetic sources)
+    """
+    from app.models import OurChannel, Source
+    
+    channel = OurChannel(name="bench", tg_chat_id_or_username="@bench")
+    db.add(channel)
+    db.flush()
+    
+    db.add_all([
+        Source(
+            our_channel_id=channel.id,
+            name=f"bench_{number:06d}",
+            username=f"bench_{number:06d}",
+            source_type="news",
+            enabled=True
+        )
+        for number in range(count)
+    ])
+    db.commit()
+    source_ids = [source_id for source_id, in db.query(Source.id).filter(Source.our_channel_id == channel.id)]
+    return channel, source_ids
+
+
+def delete_sources(db, channel) -> None:
+    """
+    Remove the benchmark channel with its sources and posts.
+    
+    Args:
+        db: Database session
+        channel: OurChannel created by create_sources
+    """
+    from app.models import Source, Post
+    
+    source_ids = db.query(Source.id).filter(Source.our_channel_id == channel.id)
+    db.query(Post).filter(Post.source_id.in_(source_ids.scalar_subquery())).delete(synchronize_session=False)
+    db.query(Source).filter(Source.our_channel_id == channel.id).delete(synchronize_session=False)
+    db.delete(channel)
+    db.commit()
+
+
+def percentile(values, share: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(share * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_ingest(latencies, source_ids):
+    """
+    Run one ingest over the synthetic sources, timing each source.
+    
+    Other sources in the database are left alone, so their feeds are never
+    fetched from the fake RSSHub.
+    
+    Args:
+        latencies: List receiving per-source latencies in seconds
+        source_ids: Ids of the synthetic sources
+        
+    Returns:
+        Ingest result dictionary
+    """
+    from app.services.rss_ingest import RSSIngestService
+    
+    class TimedIngestService(RSSIngestService):
+        async def ingest_source(self, source, session=None):
+            started = time.perf_counter()
+            try:
+                return await super().ingest_source(source, session)
+            finally:
+                latencies.append(time.perf_counter() - started)
+                
+    return await TimedIngestService().ingest_all_sources(source_ids=source_ids)
+
+
+def main():
+    """Main function for CLI."""
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    
+    os.environ["DATABASE_URL"] = args.database_url
+        
+    from app.config import config
+    from app.db import SessionLocal
+    from app.services.utils.rss import shutdown_parse_executor
+    
+    # Point every fetch at the fake RSSHub
+    base = f"http://127.0.0.1:{args.port}"
+    config.rsshub_bases = [base]
+    config.rsshub_base = base
+    config.polling_enabled = False
+    
+    server = multiprocessing.get_context("spawn").Process(
+        target=run_fake_rsshub,
+        args=(args.port, args.entries, args.entry_bytes, args.latency_ms,
+              args.error_rate, args.not_modified_rate),
+        daemon=True
+    )
+    server.start()
+    time.sleep(1.0)
+    
+    db = SessionLocal()
+    channel, source_ids = create_sources(db, args.sources)
+    
+    runs = []
+    try:
+        for run in range(args.runs):
+            latencies = []
+            cpu_started = time.process_time()
+            started = time.perf_counter()
+            
+            result = asyncio.run(run_ingest(latencies, source_ids))
+            
+            elapsed = time.perf_counter() - started
+            processed = result.get("processed", 0)
+            runs.append({
+                "run": run + 1,
+                "sources": processed,
+                "elapsed_seconds": round(elapsed, 3),
+                "sources_per_second": round(processed / elapsed, 1),
+                "p50_latency_ms": round(percentile(latencies, 0.50) * 1000, 1),
+                "p95_latency_ms": round(percentile(latencies, 0.95) * 1000, 1),
+                "mean_latency_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+                "cpu_seconds": round(time.process_time() - cpu_started, 3),
+                "new_posts": result.get("new_posts", 0),
+                "errors": result.get("errors", 0)
+            })
+            
+        # Parse workers only show up in RUSAGE_CHILDREN once they have exited
+        shutdown_parse_executor()
+        self_usage = resource.getrusage(resource.RUSAGE_SELF)
+        child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        report = {
+            "config": vars(args),
+            "runs": runs,
+            "worker_cpu_seconds": round(child_usage.ru_utime + child_usage.ru_stime, 3),
+            "peak_rss_mb": round(self_usage.ru_maxrss / 1024, 1),
+            "worker_peak_rss_mb": round(child_usage.ru_maxrss / 1024, 1)
+        }
+    finally:
+        server.terminate()
+        server.join()
+        if not args.keep:
+            delete_sources(db, channel)
+        db.close()
+        
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+        return
+        
+    print(f"Ingest benchmark: {args.sources} sources, {args.entries} entries/feed, "
+          f"{args.latency_ms:.0f} ms latency, {args.error_rate:.0%} errors")
+    for run in runs:
+        print(f"  run {run['run']}: {run['elapsed_seconds']:.2f}s, "
+              f"{run['sources_per_second']:.1f} sources/s, "
+              f"p50 {run['p50_latency_ms']:.0f} ms, p95 {run['p95_latency_ms']:.0f} ms, "
+              f"cpu {run['cpu_seconds']:.2f}s, {run['new_posts']} new posts, {run['errors']} errors")
+    print(f"  parse workers cpu: {report['worker_cpu_seconds']:.2f}s")
+    print(f"  peak RSS: {report['peak_rss_mb']:.1f} MB (workers {report['worker_peak_rss_mb']:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -95,7 +95,8 @@ def import_sources_from_excel(excel_file: str):
                 description=row['description'] if pd.notna(row['description']) else None,
                 default_image_url=row['default_image_url'] if pd.notna(row['default_image_url']) else None,
                 source_type=row['source_type'] if pd.notna(row['source_type']) else None,
-                enabled=bool(row['enabled']) if pd.notna(row['enabled']) else True
+                enabled=bool(row['enabled']) if pd.notna(row['enabled']) else True,
+                nlp_provider=row['nlp_provider'] if 'nlp_provider' in df.columns and pd.notna(row['nlp_provider']) else None
             )
             
             db.add(source)